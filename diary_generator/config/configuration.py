@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-from diary_generator.config import env, filenames, paginate
+from diary_generator.config import env, filenames, notion, oembed, paginate
 
 
 @dataclass(frozen=True)
@@ -27,11 +27,32 @@ class Config:
     USE_CACHE: bool = False
     USE_TOPIC_SLUG_CACHE: bool = False
     MAX_OGP_LEN: int = 90
+    # リンクカード・埋め込みの先読みで並行して取得する数と、同じホストへの同時リクエスト数の上限
+    LINKCARD_FETCH_WORKERS: int = 8
+    LINKCARD_PER_HOST_LIMIT: int = 2
+    # リンクカード・埋め込みの取得に失敗した URL は、この間隔を空けてから取得し直す（失敗が続くごとに倍、最大 MAX まで）
+    LINKCARD_RETRY_INTERVAL: int = 60 * 60  # 1時間
+    LINKCARD_RETRY_MAX_INTERVAL: int = 7 * 24 * 60 * 60  # 7日
+    # 取得できたリンクカード・埋め込みを、この時間が経ったら裏で取り直す（None なら取り直さない）
+    LINKCARD_REFRESH_INTERVAL: int | None = None
+    # 本文から参照されなくなったリンクカード・埋め込みを、この間隔が経ったらキャッシュから消す
+    LINKCARD_EVICT_AFTER: int = 30 * 24 * 60 * 60  # 30日
     TOPIC_PENDING_TIME: int = 1 * 60  # 1分
+    # 差分同期で拾えない削除・非公開化を回収するため、この間隔で日記一覧を全件取得する
+    INDEX_FULL_SYNC_INTERVAL: int = 24 * 60 * 60  # 1日
+    FORCE_FULL_INDEX_SYNC: bool = False
+    # トピックスラッグも差分同期し、この間隔で全件取得して削除を反映する
+    TOPIC_SLUG_FULL_SYNC_INTERVAL: int = 24 * 60 * 60  # 1日
+    # キャッシュファイルの符号化（"json" / "gzip" / "zstd" / "pickle"、diary_generator.util.codec）
+    CACHE_CODEC: str = "json"
+    # Notion から取得した生のブロックツリーを保存する（スキーマ移行時に取得し直さずに済む）
+    ARCHIVE_RAW_BLOCKS: bool = False
     FILE_NAMES: filenames.FileName = filenames.FileName()
     PAGINATE: paginate.Paginte = paginate.Paginte()
     ENV: env.Env = env.Env()
     THUMBNAIL: ThumbnailConfig = ThumbnailConfig()
+    NOTION_API: notion.NotionApi = notion.NotionApi()  # noqa: RUF009 frozen なので共有してよい
+    OEMBED: oembed.OEmbed = oembed.OEmbed()  # noqa: RUF009
 
     def set_use_cache(self, val: bool):
         object.__setattr__(self, "USE_CACHE", val)
@@ -39,6 +60,15 @@ class Config:
     def set_use_topic_slug_cache(self, val: bool):
         object.__setattr__(self, "USE_TOPIC_SLUG_CACHE", val)
 
+    def set_force_full_index_sync(self, val: bool):
+        object.__setattr__(self, "FORCE_FULL_INDEX_SYNC", val)
+
+    def set_cache_codec(self, val: str):
+        object.__setattr__(self, "CACHE_CODEC", val)
+
+    def set_archive_raw_blocks(self, val: bool):
+        object.__setattr__(self, "ARCHIVE_RAW_BLOCKS", val)
+
 
 config = Config()
 
@@ -49,3 +79,15 @@ def set_use_cache(val: bool):
 
 def set_use_topic_slug_cache(val: bool):
     config.set_use_topic_slug_cache(val)
+
+
+def set_force_full_index_sync(val: bool):
+    config.set_force_full_index_sync(val)
+
+
+def set_cache_codec(val: str):
+    config.set_cache_codec(val)
+
+
+def set_archive_raw_blocks(val: bool):
+    config.set_archive_raw_blocks(val)
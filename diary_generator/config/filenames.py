@@ -8,6 +8,11 @@ class FileName:
 
     CACHE_DIARY_INDEX_PATH: str = f"{CACHE_DIR_NAME}diary_index.json"
     CACHE_DIARY_DETAIL_PATH: str = f"{CACHE_DIR_NAME}diary_detail.json"
+    CACHE_DIARY_MANIFEST_PATH: str = f"{CACHE_DIR_NAME}diary_cache.manifest.json"
+    CACHE_DIARY_DETAIL_SHARD_DIR: str = f"{CACHE_DIR_NAME}diary_detail/"
+    CACHE_RAW_BLOCKS_DIR: str = f"{CACHE_DIR_NAME}raw_blocks/"
+    CACHE_DIARY_DETAIL_JOURNAL_PATH: str = f"{CACHE_DIR_NAME}diary_detail.journal.jsonl"
+    CACHE_RENDERED_TOPICS_PATH: str = f"{CACHE_DIR_NAME}rendered_topics.json"
     CACHE_OGP_PATH: str = f"{CACHE_DIR_NAME}ogp.json"
     CACHE_TWITTER_PATH: str = f"{CACHE_DIR_NAME}twitter.json"
 
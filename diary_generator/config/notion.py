@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class NotionApi:
+    """Notion API 接続設定"""
+
+    POOL_CONNECTIONS: int = 1  # 接続先ホストは api.notion.com のみ
+    TIMEOUT: int = 30  # 秒
+
+    # ページ詳細を同時に取得するワーカー数（全体のレートはトークンバケットで守る）
+    PAGE_FETCH_CONCURRENCY: int = 4
+    # 同じ深さの子ブロック一覧を同時に取得するワーカー数（1ページあたり）
+    BLOCK_FETCH_CONCURRENCY: int = 4
+
+    # Notion のレート制限は平均 3 リクエスト/秒（バーストは多少許容される）
+    RATE_LIMIT_PER_SEC: float = 3.0
+    RATE_LIMIT_BURST: int = 3
+
+    # 429 / 5xx / 通信エラー時の再試行
+    MAX_RETRIES: int = 5
+    BACKOFF_BASE: float = 1.0  # 秒
+    BACKOFF_MAX: float = 30.0  # 秒
+
+    # 連続失敗でリクエストを止めるサーキットブレーカー（開いている間は待ってから再開する）
+    # MAX_RETRIES より大きくし、1件のリクエストの再試行だけでは開かないようにする
+    CIRCUIT_BREAKER_THRESHOLD: int = 10
+    CIRCUIT_BREAKER_RESET: float = 60.0  # 秒
+
+    @property
+    def pool_maxsize(self) -> int:
+        """
+        同時に保持する keep-alive 接続数。ページ × ブロックの並行数に、
+        日記と並行して取得するトピックスラッグの1本を足す。
+        """
+        return self.PAGE_FETCH_CONCURRENCY * self.BLOCK_FETCH_CONCURRENCY + 1
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class OEmbedProvider:
+    """oEmbed で埋め込む投稿の提供元"""
+
+    NAME: str  # ログに出す呼び名
+    # 埋め込む URL（URL の先頭から一致させる正規表現。グループは (?:...) で書く）
+    URL_PATTERN: str
+    ENDPOINT: str
+    TIMEOUT: int = 5  # 秒
+    PER_HOST_LIMIT: int = 2  # ENDPOINT のホストへの同時リクエスト数
+
+
+@dataclass(frozen=True)
+class OEmbed:
+    """oEmbed の提供元一覧（上から順に一致を調べる）。取得結果はすべて cache/twitter.json に入る"""
+
+    PROVIDERS: tuple[OEmbedProvider, ...] = (
+        OEmbedProvider(
+            NAME="ツイート",
+            URL_PATTERN=r"https?://(?:[\w-]+\.)*(?:twitter|x)\.com/",
+            ENDPOINT="https://publish.twitter.com/oembed",
+        ),
+        OEmbedProvider(
+            NAME="ポスト",
+            URL_PATTERN=r"https?://bsky\.app/",
+            ENDPOINT="https://embed.bsky.app/oembed",
+        ),
+        OEmbedProvider(
+            NAME="トゥート",
+            URL_PATTERN=r"https?://mstdn\.pokete\.com/",
+            ENDPOINT="https://mstdn.pokete.com/api/oembed",
+        ),
+    )
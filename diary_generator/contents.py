@@ -1,114 +1,154 @@
 import html
-import json
-import os
 import re
 import typing
 from datetime import datetime, timedelta, timezone
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import unquote, urlparse
 
-from diary_generator import notion_api
+from diary_generator import diary_cache, notion_api
 from diary_generator.config.configuration import config
 from diary_generator.logger import logger
 from diary_generator.models import DiaryEntry, IndexDirection, Topic
-from diary_generator.util import diarydiff
+from diary_generator.util import concurrency, diarydiff, journal
 from diary_generator.util.img import generate_image_tag
 from diary_generator.util.linkcard import cache, linkcard
 
 log = logger.get_logger()
 
 CACHE_SCHEMA_VERSION = 4
+# render_blocks・リンクカードの出力を変えたら上げる（描画キャッシュを作り直す）
+RENDERER_VERSION = 1
 JST = timezone(timedelta(hours=9))
+# Notion の last_edited_time は分単位に丸められるため、差分問い合わせは少し遡る
+INDEX_SYNC_MARGIN = timedelta(minutes=5)
+# index cache に必要な日記データベースのプロパティ（タイトル以外）
+DIARY_INDEX_PROPERTIES = ("日付", "公開", "収集対象")
 
 
 def get() -> list[DiaryEntry]:
-    index_path = config.FILE_NAMES.CACHE_DIARY_INDEX_PATH
-    detail_path = config.FILE_NAMES.CACHE_DIARY_DETAIL_PATH
-    use_cache = config.USE_CACHE
-    has_cache = os.path.exists(index_path) and os.path.exists(detail_path)
+    store = _open_cache_store()
+    cached = store.load()
 
-    if use_cache and has_cache and _is_valid_cache_pair(index_path, detail_path):
+    if config.USE_CACHE and cached:
         log.info("✅ キャッシュからデータを読み込みます")
-        index_cache = _read_json(index_path)
-        detail_cache = _read_json(detail_path)
+        index_cache = cached.index
+        detail_cache = cached.detail
     else:
-        old_index_cache: dict[str, Any] | None = None
-        old_detail_cache: dict[str, Any] | None = None
+        index_cache, detail_cache = _sync_caches(store, cached)
 
-        if has_cache and _is_valid_cache_pair(index_path, detail_path):
-            old_index_cache = _read_json(index_path)
-            old_detail_cache = _read_json(detail_path)
+    rendered_cache = diary_cache.RenderedTopicCache(
+        config.FILE_NAMES.CACHE_RENDERED_TOPICS_PATH
+    )
+    raw_data = _compose_raw_data_from_caches(index_cache, detail_cache, rendered_cache)
+    entries = _parse_json_to_diary_entries(raw_data, rendered_cache)
+    rendered_cache.save()
+    return entries
+
+
+def verify_cache() -> diary_cache.CacheVerifyResult | None:
+    """日記キャッシュを確かめる。キャッシュが無い・読めない形式なら None。"""
+    return _open_cache_store().verify()
+
+
+def inspect_cache() -> tuple[
+    diary_cache.DiaryCachePair | None, diary_cache.CacheVerifyResult | None
+]:
+    """日記キャッシュを1回だけ読み、内容と検査結果を返す（統計の表示用。何も書かない）。"""
+    return _open_cache_store().inspect()
 
-        now = datetime.now(JST)
-        index_entries = _fetch_diary_index_entries()
+
+def repair_cache() -> None:
+    """
+    日記キャッシュを読める範囲で読み、Notion と同期し直して書き直す。
+    壊れていたページ（と前回から編集されたページ）だけを取得する。
+    """
+    store = _open_cache_store()
+    _sync_caches(store, store.load(), notify_diff=False)
+
+
+def _sync_caches(
+    store: diary_cache.CacheStore,
+    cached: diary_cache.DiaryCachePair | None,
+    notify_diff: bool = True,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Notion と同期して index / detail cache を作り、保存する。"""
+    old_index_cache: dict[str, Any] | None = cached.index if cached else None
+    old_detail_cache: dict[str, Any] | None = cached.detail if cached else None
+
+    now = datetime.now(JST)
+    index_sync = _sync_diary_index(old_index_cache, now)
+    index_entries = index_sync["entries"]
+    detail_journal = journal.JsonlJournal(
+        config.FILE_NAMES.CACHE_DIARY_DETAIL_JOURNAL_PATH
+    )
+    try:
         detail_entries = _build_detail_entries(
             index_entries=index_entries,
             old_index_cache=old_index_cache,
             old_detail_cache=old_detail_cache,
             now=now,
+            detail_journal=detail_journal,
         )
+    finally:
+        detail_journal.close()
+
+    generated_at = _now_iso()
+    index_cache = {
+        "schema_version": CACHE_SCHEMA_VERSION,
+        "generated_at": generated_at,
+        **index_sync,
+    }
+    current_warnings = _collect_unsupported_nested_block_warnings(detail_entries)
+    previous_warnings = (
+        old_detail_cache.get("unsupported_nested_block_warnings", [])
+        if old_detail_cache
+        else []
+    )
+    _log_new_unsupported_nested_block_warnings(current_warnings, previous_warnings)
+    detail_cache = {
+        "schema_version": CACHE_SCHEMA_VERSION,
+        "generated_at": generated_at,
+        "entries": detail_entries,
+        "unsupported_nested_block_warnings": current_warnings,
+    }
 
-        generated_at = _now_iso()
-        index_cache = {
-            "schema_version": CACHE_SCHEMA_VERSION,
-            "generated_at": generated_at,
-            "entries": index_entries,
-        }
-        current_warnings = _collect_unsupported_nested_block_warnings(detail_entries)
-        previous_warnings = (
-            old_detail_cache.get("unsupported_nested_block_warnings", [])
-            if old_detail_cache
-            else []
+    store.save(diary_cache.DiaryCachePair(index=index_cache, detail=detail_cache))
+    detail_journal.remove()  # キャッシュに反映済み
+    if config.ARCHIVE_RAW_BLOCKS:
+        _raw_block_archive().prune(
+            {entry["page_id"] for entry in index_entries if entry.get("page_id")}
         )
-        _log_new_unsupported_nested_block_warnings(current_warnings, previous_warnings)
-        detail_cache = {
-            "schema_version": CACHE_SCHEMA_VERSION,
-            "generated_at": generated_at,
-            "entries": detail_entries,
-            "unsupported_nested_block_warnings": current_warnings,
-        }
-
-        _write_json(index_path, index_cache)
-        _write_json(detail_path, detail_cache)
 
+    if notify_diff:
         old_entries = old_detail_cache.get("entries", []) if old_detail_cache else []
         diarydiff.diff_detail_entries(old_entries, detail_entries)
+    return index_cache, detail_cache
 
-    raw_data = _compose_raw_data_from_caches(index_cache, detail_cache)
-    return _parse_json_to_diary_entries(raw_data)
-
-
-def _is_valid_cache_pair(index_path: str, detail_path: str) -> bool:
-    try:
-        index_cache = _read_json(index_path)
-        detail_cache = _read_json(detail_path)
-    except Exception as e:
-        log.warning("⚠️ キャッシュ読み込み失敗のため再取得します: %s", e)
-        return False
 
-    if index_cache.get("schema_version") != CACHE_SCHEMA_VERSION:
-        return False
-    if detail_cache.get("schema_version") != CACHE_SCHEMA_VERSION:
-        return False
-    return True
-
-
-def _read_json(json_path: str) -> Any:
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def _write_json(json_path: str, content: Any):
-    tmp_path = f"{json_path}.tmp"
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(content, f, ensure_ascii=False, indent=4)
-    os.replace(tmp_path, json_path)
-    log.info("✅ キャッシュ更新: %s", json_path)
+def _open_cache_store() -> diary_cache.CacheStore:
+    return diary_cache.CacheStore(
+        index_path=config.FILE_NAMES.CACHE_DIARY_INDEX_PATH,
+        detail_path=config.FILE_NAMES.CACHE_DIARY_DETAIL_PATH,
+        manifest_path=config.FILE_NAMES.CACHE_DIARY_MANIFEST_PATH,
+        schema_version=CACHE_SCHEMA_VERSION,
+        shard_dir=config.FILE_NAMES.CACHE_DIARY_DETAIL_SHARD_DIR,
+    )
 
 
-def _parse_json_to_diary_entries(raw_data: list[dict[str, Any]]) -> list[DiaryEntry]:
+def _parse_json_to_diary_entries(
+    raw_data: list[dict[str, Any]],
+    rendered_cache: diary_cache.RenderedTopicCache | None = None,
+) -> list[DiaryEntry]:
     entries = []
     cache.initialize()
+    # 描画キャッシュに無いトピックのリンクカード・埋め込みを、描画の前にまとめて取得する
+    linkcard.prefetch(
+        content
+        for entry_data in raw_data
+        for topic_data in entry_data["topics"]
+        if "content_html" not in topic_data
+        for content in topic_data["content"]
+    )
 
     for entry_data in raw_data:
         topics = [
@@ -116,7 +156,7 @@ def _parse_json_to_diary_entries(raw_data: list[dict[str, Any]]) -> list[DiaryEn
                 title=topic_data["title"],
                 id=topic_data["id"],
                 content=topic_data["content"],
-                content_html=linkcard.create(topic_data["content"]),
+                content_html=_topic_content_html(topic_data, rendered_cache),
                 hashtags=topic_data["hashtags"],
             )
             for topic_data in entry_data["topics"]
@@ -132,46 +172,171 @@ def _parse_json_to_diary_entries(raw_data: list[dict[str, Any]]) -> list[DiaryEn
         entries.append(entry)
 
     # OGP用キャッシュ再書き込み
-    cache.save_cache()
+    linkcard.wait_for_refreshes()
+    cache.save_cache(
+        url
+        for entry_data in raw_data
+        for topic_data in entry_data["topics"]
+        for content in topic_data["content"]
+        for url in linkcard.find_urls(content)
+    )
     return entries
 
 
-def _fetch_diary_index_entries() -> list[dict[str, Any]]:
+def _sync_diary_index(
+    old_index_cache: dict[str, Any] | None, now: datetime
+) -> dict[str, Any]:
+    """
+    日記一覧を取得し、index cache の entries と同期時刻を返す。
+    前回の同期時刻があれば、それ以降に編集されたページだけを問い合わせて前回の一覧にマージする。
+    削除・ゴミ箱移動は差分問い合わせでは返らないため、INDEX_FULL_SYNC_INTERVAL ごとに全件取得する。
+    """
+    synced_at = now.isoformat()
+    property_ids = _diary_index_property_ids()
+    if _needs_full_index_sync(old_index_cache, now):
+        return {
+            "entries": _fetch_diary_index_entries(property_ids),
+            "synced_at": synced_at,
+            "full_synced_at": synced_at,
+        }
+
+    since = _parse_iso_datetime(old_index_cache["synced_at"]) - INDEX_SYNC_MARGIN
+    return {
+        "entries": _fetch_updated_diary_index_entries(
+            old_index_cache.get("entries", []), since, property_ids
+        ),
+        "synced_at": synced_at,
+        "full_synced_at": old_index_cache["full_synced_at"],
+    }
+
+
+def _diary_index_property_ids() -> list[str]:
+    """
+    index cache の組み立てに使うプロパティ（タイトルを含む）のIDを返す。
+    API が返すIDは URL エンコード済みなので、クエリ文字列に載せる前に戻しておく。
+    """
+    database = notion_api.retrieve_database(config.ENV.NOTION_DATABASE_ID)
+    return [
+        unquote(prop["id"])
+        for name, prop in database.get("properties", {}).items()
+        if name in DIARY_INDEX_PROPERTIES or prop.get("type") == "title"
+    ]
+
+
+def _needs_full_index_sync(
+    old_index_cache: dict[str, Any] | None, now: datetime
+) -> bool:
+    if config.FORCE_FULL_INDEX_SYNC or not old_index_cache:
+        return True
+    if not old_index_cache.get("synced_at") or not old_index_cache.get(
+        "full_synced_at"
+    ):
+        return True
+    full_synced_at = _parse_iso_datetime(old_index_cache["full_synced_at"])
+    return full_synced_at + timedelta(seconds=config.INDEX_FULL_SYNC_INTERVAL) <= now
+
+
+def _fetch_diary_index_entries(property_ids: list[str]) -> list[dict[str, Any]]:
     log.info("🔄 Notion API から日記一覧を取得中...")
+    # 下書きはサーバー側で除外する（_index_entry_from_page でも同じ条件を確認する）
+    public_filter = notion_api.filters.all_of(
+        notion_api.filters.checkbox_equals("公開", True),
+        notion_api.filters.select_is_not_empty("収集対象"),
+        notion_api.filters.date_is_not_empty("日付"),
+    )
     entries = []
+    for item in _query_diary_pages(public_filter, property_ids=property_ids):
+        entry = _index_entry_from_page(item)
+        if entry:
+            entries.append(entry)
+
+    _sort_index_entries(entries)
+    log.info("✅ Notion一覧取得完了: %d 件", len(entries))
+    return entries
+
+
+def _fetch_updated_diary_index_entries(
+    old_entries: list[dict[str, Any]], since: datetime, property_ids: list[str]
+) -> list[dict[str, Any]]:
+    """
+    since 以降に編集されたページだけを取得し、前回の一覧に反映する。
+    非公開化されたページを一覧から外すため、公開フラグでは絞り込まない。
+    """
+    log.info("🔄 Notion API から更新された日記を取得中... (%s 以降)", since.isoformat())
+    items = _query_diary_pages(
+        notion_api.filters.last_edited_on_or_after(since.isoformat()),
+        sorts=[{"timestamp": "last_edited_time", "direction": "ascending"}],
+        property_ids=property_ids,
+    )
+
+    entries_by_page_id = {
+        entry["page_id"]: entry for entry in old_entries if entry.get("page_id")
+    }
+    for item in items:
+        page_id = item.get("id", "")
+        entry = _index_entry_from_page(item)
+        if entry is None:
+            entries_by_page_id.pop(page_id, None)  # 非公開化・ゴミ箱移動
+        else:
+            entries_by_page_id[page_id] = entry
+
+    entries = list(entries_by_page_id.values())
+    _sort_index_entries(entries)
+    log.info(
+        "✅ Notion一覧差分取得完了: 更新 %d 件 / 全 %d 件", len(items), len(entries)
+    )
+    return entries
+
+
+def _query_diary_pages(
+    filter: dict[str, Any] | None = None,
+    sorts: list[dict[str, Any]] | None = None,
+    property_ids: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    pages: list[dict[str, Any]] = []
     cursor = None
 
     while True:
         data = notion_api.query_database(
-            config.ENV.NOTION_DATABASE_ID, start_cursor=cursor
+            config.ENV.NOTION_DATABASE_ID,
+            start_cursor=cursor,
+            filter=filter,
+            sorts=sorts,
+            filter_properties=property_ids,
         )
-        results = data.get("results", [])
-        for item in results:
-            properties = item.get("properties", {})
-            date = properties.get("日付", {}).get("date", {}).get("start", "")
-            page_id = item.get("id", "")
-            is_public = properties.get("公開", {}).get("checkbox", False)
-            can_index = properties.get("収集対象", {}).get("select", {})
-
-            if not date or not is_public or not can_index:
-                continue  # 非公開ページはスキップ
-
-            page_last_edited = item.get("last_edited_time", "")
-            entries.append(
-                {
-                    "page_id": page_id,
-                    "page_name": _extract_page_name(properties, date),
-                    "entry_date": date,
-                    "index_direction": can_index.get("name", "noindex"),
-                    "last_edited_time": page_last_edited,
-                    "source_last_edited_time": page_last_edited,
-                }
-            )
+        pages.extend(data.get("results", []))
         if not data.get("has_more"):
             break
 
         cursor = data.get("next_cursor")
+    return pages
+
 
+def _index_entry_from_page(item: dict[str, Any]) -> dict[str, Any] | None:
+    """データベースの1行を index cache の entry にする。公開対象外なら None。"""
+    if item.get("in_trash") or item.get("archived"):
+        return None
+    properties = item.get("properties", {})
+    date = (properties.get("日付", {}).get("date") or {}).get("start", "")
+    page_id = item.get("id", "")
+    is_public = properties.get("公開", {}).get("checkbox", False)
+    can_index = properties.get("収集対象", {}).get("select") or {}
+
+    if not date or not is_public or not can_index:
+        return None  # 非公開ページはスキップ
+
+    page_last_edited = item.get("last_edited_time", "")
+    return {
+        "page_id": page_id,
+        "page_name": _extract_page_name(properties, date),
+        "entry_date": date,
+        "index_direction": can_index.get("name", "noindex"),
+        "last_edited_time": page_last_edited,
+        "source_last_edited_time": page_last_edited,
+    }
+
+
+def _sort_index_entries(entries: list[dict[str, Any]]) -> None:
     entries.sort(
         key=lambda entry: (
             entry.get("entry_date", ""),
@@ -179,8 +344,6 @@ def _fetch_diary_index_entries() -> list[dict[str, Any]]:
         ),
         reverse=True,
     )
-    log.info("✅ Notion一覧取得完了: %d 件", len(entries))
-    return entries
 
 
 def _extract_page_name(properties: dict[str, Any], entry_date: str) -> str:
@@ -199,7 +362,15 @@ def _build_detail_entries(
     old_index_cache: dict[str, Any] | None,
     old_detail_cache: dict[str, Any] | None,
     now: datetime,
+    detail_journal: journal.JsonlJournal | None = None,
 ) -> list[dict[str, Any]]:
+    """
+    index の各ページの detail entry を作る。変更のないページは前回のキャッシュを使い、
+    それ以外は Notion から取得する。
+    detail_journal を渡すと、取得できたページを1件ずつ記録していく。前回の実行が途中で
+    止まっていた場合は、記録済みで last_edited_time が同じページを取得せずに使う。
+    """
+    resumed_by_page_id = _load_detail_journal(detail_journal) if detail_journal else {}
     old_index_by_page_id: dict[str, dict[str, Any]] = {}
     old_detail_by_page_id: dict[str, dict[str, Any]] = {}
 
@@ -210,63 +381,262 @@ def _build_detail_entries(
             if entry.get("page_id")
         }
     if old_detail_cache:
+        # 移行で作り直せなかったページ（needs_refetch）は、前回の内容を使わずに取得し直す
         old_detail_by_page_id = {
             entry.get("page_id"): entry
             for entry in old_detail_cache.get("entries", [])
-            if entry.get("page_id")
+            if entry.get("page_id") and not entry.get("needs_refetch")
         }
 
-    detail_entries = []
+    detail_entries: list[dict[str, Any] | None] = []
+    fetch_targets: list[tuple[int, dict[str, Any], bool]] = []
     for index_entry in index_entries:
         page_id = index_entry["page_id"]
         old_index_entry = old_index_by_page_id.get(page_id)
         old_detail_entry = old_detail_by_page_id.get(page_id)
 
-        # has_pending_topics=True なら前回保留あり → last_edited_time が変わっていなくても強制再取得
         unchanged = (
             old_index_entry is not None
             and old_detail_entry is not None
             and old_index_entry.get("last_edited_time")
             == index_entry.get("last_edited_time")
-            and not old_detail_entry.get("has_pending_topics", False)
         )
-        if unchanged:
+        # 保留トピックがあっても、どれもまだ保留時間内なら取り直しても結果は変わらない
+        if unchanged and (
+            not old_detail_entry.get("has_pending_topics", False)
+            or _pending_topics_still_settling(old_detail_entry, now)
+        ):
             detail_entries.append(
                 {
                     **old_detail_entry,
                     "page_name": index_entry["page_name"],
                     "entry_date": index_entry["entry_date"],
+                    "index_direction": index_entry["index_direction"],
                     "last_edited_time": index_entry["last_edited_time"],
                 }
             )
             continue
 
-        topics, has_pending = _fetch_diary_page(page_id, now)
-        detail_entries.append(
+        resumed_entry = resumed_by_page_id.get(page_id)
+        if resumed_entry and resumed_entry.get("last_edited_time") == index_entry.get(
+            "last_edited_time"
+        ):
+            detail_entries.append(
+                {
+                    **resumed_entry,
+                    "page_name": index_entry["page_name"],
+                    "entry_date": index_entry["entry_date"],
+                    "index_direction": index_entry["index_direction"],
+                }
+            )
+            continue
+
+        fetch_targets.append((len(detail_entries), index_entry, unchanged))
+        detail_entries.append(None)
+
+    raw_archive = _raw_block_archive() if config.ARCHIVE_RAW_BLOCKS else None
+
+    def fetch_detail(target: tuple[int, dict[str, Any], bool]) -> dict[str, Any]:
+        _, index_entry, unchanged = target
+        page_id = index_entry["page_id"]
+        # ページが編集されていなければ（保留トピックの再確認）、確定済みトピックの子ツリーは前回のものと同じ。
+        # 編集されたページは、入れ子の中だけの編集でも親ブロックの last_edited_time が
+        # 変わらないことがあるので、子ツリーもすべて取り直す
+        previous = old_detail_by_page_id.get(page_id) if unchanged else None
+        blocks, block_manifest = _fetch_page_blocks(page_id, previous)
+        if raw_archive:
+            raw_archive.save(page_id, index_entry["last_edited_time"], blocks)
+        topics, pending_topics = _build_topics(blocks, now)
+        log.debug("- 日付データ(%s) の詳細取得完了", index_entry["entry_date"])
+        detail_entry = {
+            "page_id": page_id,
+            "page_name": index_entry["page_name"],
+            "entry_date": index_entry["entry_date"],
+            "index_direction": index_entry["index_direction"],
+            "last_edited_time": index_entry["last_edited_time"],
+            "topics": topics,
+            "has_pending_topics": bool(pending_topics),
+            "pending_topics": pending_topics,
+            "block_manifest": block_manifest,
+        }
+        # 保留トピックのあるページは再開時の時刻で判定し直すので記録しない
+        if detail_journal and not pending_topics:
+            detail_journal.append(
+                {"schema_version": CACHE_SCHEMA_VERSION, "entry": detail_entry}
+            )
+        return detail_entry
+
+    if resumed_by_page_id:
+        log.info(
+            "♻️ 前回中断した取得を再開します（記録済み %d 件）", len(resumed_by_page_id)
+        )
+    if fetch_targets:
+        log.info("🔄 ページ詳細を取得中... %d 件", len(fetch_targets))
+    fetched = concurrency.map_ordered(
+        fetch_detail, fetch_targets, config.NOTION_API.PAGE_FETCH_CONCURRENCY
+    )
+    for (position, _, _), detail_entry in zip(fetch_targets, fetched):
+        detail_entries[position] = detail_entry
+
+    return detail_entries
+
+
+def rederive_detail_entries(
+    detail_cache: dict[str, Any], now: datetime | None = None
+) -> dict[str, Any]:
+    """
+    生ブロックのアーカイブから detail entry を作り直す（正規化を変えるスキーマ移行用）。
+    アーカイブが無い・last_edited_time が違う・子が欠けているページは、前回の entry に
+    needs_refetch を付けて残す。それらは次回の取得で Notion から取り直す。
+    """
+    archive = _raw_block_archive()
+    now = now or datetime.now(JST)
+    entries = []
+    for entry in detail_cache.get("entries", []):
+        archived = archive.load(entry.get("page_id", ""))
+        if (
+            not archived
+            or not archived.get("complete")
+            or archived.get("last_edited_time") != entry.get("last_edited_time")
+        ):
+            entries.append({**entry, "needs_refetch": True})
+            continue
+        blocks = archived["blocks"]
+        topics, pending_topics = _build_topics(blocks, now)
+        entries.append(
             {
-                "page_id": page_id,
-                "page_name": index_entry["page_name"],
-                "entry_date": index_entry["entry_date"],
-                "last_edited_time": index_entry["last_edited_time"],
+                **{
+                    key: value for key, value in entry.items() if key != "needs_refetch"
+                },
                 "topics": topics,
-                "has_pending_topics": has_pending,
+                "has_pending_topics": bool(pending_topics),
+                "pending_topics": pending_topics,
+                "block_manifest": {
+                    block.get("id", ""): _block_manifest_entry(block)
+                    for block in blocks
+                    if block.get("has_children")
+                },
             }
         )
-        log.debug("- 日付データ(%s) の詳細取得完了", index_entry["entry_date"])
+    refetch = sum(1 for entry in entries if entry.get("needs_refetch"))
+    log.info(
+        "🔄 生ブロックから detail entry を作り直しました（%d 件 / 要再取得 %d 件）",
+        len(entries) - refetch,
+        refetch,
+    )
+    return {**detail_cache, "entries": entries}
 
-    return detail_entries
+
+def _raw_block_archive() -> diary_cache.RawBlockArchive:
+    return diary_cache.RawBlockArchive(config.FILE_NAMES.CACHE_RAW_BLOCKS_DIR)
+
+
+def _load_detail_journal(
+    detail_journal: journal.JsonlJournal,
+) -> dict[str, dict[str, Any]]:
+    resumed: dict[str, dict[str, Any]] = {}
+    for record in detail_journal.load():
+        if record.get("schema_version") != CACHE_SCHEMA_VERSION:
+            continue
+        entry = record.get("entry") or {}
+        if entry.get("page_id"):
+            resumed[entry["page_id"]] = entry  # 同じページが複数あれば後の記録を使う
+    return resumed
+
+
+def _pending_topics_still_settling(detail_entry: dict[str, Any], now: datetime) -> bool:
+    """前回保留したトピックがすべて、まだ TOPIC_PENDING_TIME を過ぎていなければ True。"""
+    pending_topics = detail_entry.get("pending_topics")
+    if not pending_topics:
+        return False  # 旧形式のキャッシュはどのトピックか分からないので取り直す
+    return all(
+        _parse_iso_datetime(last_edited_time)
+        + timedelta(seconds=config.TOPIC_PENDING_TIME)
+        > now
+        for last_edited_time in pending_topics.values()
+    )
 
 
-def _fetch_diary_page(page_id: str, now: datetime) -> tuple[list[dict[str, Any]], bool]:
-    """ページのブロックを取得してトピックに変換する。
-    戻り値: (topics, has_pending_topics)
-    has_pending_topics が True の場合、5分未満フィルタで除外されたトピックが存在する。
+def _fetch_page_blocks(
+    page_id: str, previous: dict[str, Any] | None = None
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, str]]]:
     """
-    all_blocks = _fetch_block_children_recursive(page_id)
+    ページのブロックツリーを取得する。
+    戻り値: (blocks, block_manifest)
+    block_manifest は子を持つ最上位ブロックごとの last_edited_time と子ツリーの最終更新日時。
+    previous（前回の detail entry）を渡すと、last_edited_time が前回と同じブロックは
+    子ツリーを取得せず、前回の正規化済みブロックを "_cached_children" に入れて返す。
+    """
+    blocks = _fetch_block_children_list(page_id)
+    previous_manifest = (previous or {}).get("block_manifest", {})
+    cached_children = _cached_children_by_block_id(previous) if previous else {}
 
+    block_manifest: dict[str, dict[str, str]] = {}
+    frontier: list[dict[str, Any]] = []
+    for block in blocks:
+        if not block.get("has_children"):
+            continue
+        block_id = block.get("id", "")
+        manifest_entry = previous_manifest.get(block_id)
+        children = cached_children.get(block_id)
+        if (
+            children
+            and manifest_entry
+            and manifest_entry.get("last_edited_time") == block.get("last_edited_time")
+        ):
+            subtree_time = manifest_entry.get("subtree_last_edited_time", "")
+            block["_cached_children"] = [
+                {**child, "_last_edited_time": subtree_time} for child in children
+            ]
+            block_manifest[block_id] = manifest_entry
+        else:
+            frontier.append(block)
+
+    if block_manifest:
+        log.debug(
+            "- ページ(%s) の子ツリー %d 件をキャッシュから再利用",
+            page_id,
+            len(block_manifest),
+        )
+
+    _expand_block_children(frontier)
+    for block in frontier:
+        block_manifest[block.get("id", "")] = _block_manifest_entry(block)
+    return blocks, block_manifest
+
+
+def _block_manifest_entry(block: dict[str, Any]) -> dict[str, str]:
+    """子を取得済みの（生の）ブロックの last_edited_time と、子ツリーの最終更新日時。"""
+    return {
+        "last_edited_time": block.get("last_edited_time", ""),
+        "subtree_last_edited_time": _latest_block_last_edited_time(
+            block.get("children", []), key="last_edited_time"
+        ),
+    }
+
+
+def _cached_children_by_block_id(
+    detail_entry: dict[str, Any],
+) -> dict[str, list[dict[str, Any]]]:
+    """detail entry のトピック直下のブロックのうち、子を持つものの子一覧を block_id で引けるようにする。"""
+    return {
+        block["block_id"]: block["children"]
+        for topic in detail_entry.get("topics", [])
+        for block in topic.get("blocks", [])
+        if block.get("block_id") and block.get("children")
+    }
+
+
+def _build_topics(
+    all_blocks: list[dict[str, Any]], now: datetime
+) -> tuple[list[dict[str, Any]], dict[str, str]]:
+    """ページ直下のブロック列を heading_3 ごとのトピックに分ける。
+    戻り値: (topics, pending_topics)
+    pending_topics は保留したトピックの topic_id（見出しブロックID）と last_edited_time。
+    """
     topics: list[dict[str, Any]] = []
     current_topic = _new_topic()
-    has_pending = False
+    pending_topics: dict[str, str] = {}
 
     for block in all_blocks:
         block_type = block.get("type")
@@ -276,8 +646,10 @@ def _fetch_diary_page(page_id: str, now: datetime) -> tuple[list[dict[str, Any]]
         if block_type == "heading_3":  # Notionの「見出し3」がトピック名に相当
             if not text_content:
                 continue  # 空の見出しは無視
-            pending = _finalize_topic(topics, current_topic, now)
-            has_pending = has_pending or pending
+            if _finalize_topic(topics, current_topic, now):
+                pending_topics[current_topic["topic_id"]] = current_topic[
+                    "last_edited_time"
+                ]
             current_topic = _new_topic(
                 title=text_content,
                 topic_id=block.get("id", ""),
@@ -295,22 +667,39 @@ def _fetch_diary_page(page_id: str, now: datetime) -> tuple[list[dict[str, Any]]
             if normalized_block:
                 current_topic["blocks"].append(normalized_block)
 
-    pending = _finalize_topic(topics, current_topic, now)
-    has_pending = has_pending or pending
-    return topics, has_pending
+    if _finalize_topic(topics, current_topic, now):
+        pending_topics[current_topic["topic_id"]] = current_topic["last_edited_time"]
+    return topics, pending_topics
+
+
+def _expand_block_children(frontier: list[dict[str, Any]]) -> None:
+    """
+    frontier の各ブロック配下の子孫を取得し、"children" に入れる。
+    同じ深さで has_children を持つブロックをまとめ、その子一覧を並行して取得する。
+    """
+    while frontier:
+        children_lists = concurrency.map_ordered(
+            lambda parent: _fetch_block_children_list(parent.get("id", "")),
+            frontier,
+            config.NOTION_API.BLOCK_FETCH_CONCURRENCY,
+        )
+        next_frontier: list[dict[str, Any]] = []
+        for parent, children in zip(frontier, children_lists):
+            parent["children"] = children
+            next_frontier.extend(
+                child for child in children if child.get("has_children")
+            )
+        frontier = next_frontier
 
 
-def _fetch_block_children_recursive(block_id: str) -> list[dict[str, Any]]:
+def _fetch_block_children_list(block_id: str) -> list[dict[str, Any]]:
+    """block_id 直下の子ブロックを next_cursor をたどって全件取得する（孫は取得しない）。"""
     blocks: list[dict[str, Any]] = []
     cursor = None
 
     while True:
         data = notion_api.get_block_children(block_id, start_cursor=cursor)
-        results = data.get("results", [])
-        for block in results:
-            if block.get("has_children"):
-                block["children"] = _fetch_block_children_recursive(block.get("id", ""))
-            blocks.append(block)
+        blocks.extend(data.get("results", []))
 
         if not data.get("has_more"):
             break
@@ -386,13 +775,15 @@ def _is_empty_paragraph_block(block: dict[str, Any]) -> bool:
     return block.get("type") == "paragraph" and not block.get("plain_text", "").strip()
 
 
-def _latest_block_last_edited_time(blocks: list[dict[str, Any]]) -> str:
+def _latest_block_last_edited_time(
+    blocks: list[dict[str, Any]], key: str = "_last_edited_time"
+) -> str:
     latest = ""
     for block in blocks:
-        candidates = [block.get("_last_edited_time", "")]
+        candidates = [block.get(key, "")]
         children = block.get("children")
         if isinstance(children, list):
-            candidates.append(_latest_block_last_edited_time(children))
+            candidates.append(_latest_block_last_edited_time(children, key))
         for candidate in candidates:
             if not candidate:
                 continue
@@ -468,6 +859,9 @@ def _normalize_block(block: dict[str, Any]) -> dict[str, Any] | None:
 def _attach_normalized_children(
     normalized: dict[str, Any], block: dict[str, Any]
 ) -> None:
+    if "_cached_children" in block:
+        normalized["children"] = block["_cached_children"]  # 正規化済み
+        return
     children = block.get("children")
     if not isinstance(children, list):
         return
@@ -537,9 +931,48 @@ def _extend_unique(tags: list[str], values: list[str]) -> None:
             tags.append(value)
 
 
+def _topic_content_html(
+    topic_data: dict[str, Any],
+    rendered_cache: diary_cache.RenderedTopicCache | None,
+) -> list[str]:
+    """描画キャッシュにあればそれを使う。リンクカードを作れた場合だけキャッシュに入れる。"""
+    if "content_html" in topic_data:
+        return topic_data["content_html"]
+    unresolved: list[str] = []
+    content_html = linkcard.create(topic_data["content"], unresolved)
+    render_key = topic_data.get("render_key")
+    # 取得に失敗した URL は次回もう一度リンクカードにしてみる
+    if rendered_cache is not None and render_key and not unresolved:
+        rendered_cache.put(
+            topic_data["id"], render_key, topic_data["content"], content_html
+        )
+    return content_html
+
+
+def _topic_render_key(topic: dict[str, Any], last_edited_time: str) -> str | None:
+    """
+    描画キャッシュのキー。画像を含むトピックは描画時に画像・サムネイルの存在を確かめるため、
+    キャッシュしない（None）。
+    古いブロックを消してもトピックの last_edited_time は変わらないので、描画元の
+    正規化済みブロックそのものもキーに含める。
+    """
+    if any(block.get("type") == "image" for block in topic.get("blocks", [])):
+        return None
+    return diary_cache.render_key(
+        RENDERER_VERSION,
+        CACHE_SCHEMA_VERSION,  # 移行で正規化が変わったトピックも描画し直す
+        topic.get("topic_id", ""),
+        last_edited_time,
+        topic.get("blocks", []),
+        config.MAX_OGP_LEN,
+        config.THUMBNAIL.sizes,
+    )
+
+
 def _compose_raw_data_from_caches(
     index_cache: dict[str, Any],
     detail_cache: dict[str, Any],
+    rendered_cache: diary_cache.RenderedTopicCache | None = None,
 ) -> list[dict[str, Any]]:
     detail_by_page_id = {
         entry.get("page_id"): entry
@@ -548,25 +981,40 @@ def _compose_raw_data_from_caches(
     }
 
     raw_data = []
+    missing_dates = []
     for index_entry in index_cache.get("entries", []):
         page_id = index_entry.get("page_id")
         detail_entry = detail_by_page_id.get(page_id)
         if not detail_entry:
+            missing_dates.append(index_entry.get("entry_date") or page_id)
             continue
 
         topics = []
         for topic in detail_entry.get("topics", []):
-            topics.append(
-                {
-                    "title": topic.get("title", ""),
-                    "id": topic.get("topic_id", ""),
-                    "content": _build_topic_content(topic),
-                    "hashtags": topic.get("tags", []),
-                    "last_edited_time": topic.get("last_edited_time")
-                    or detail_entry.get("last_edited_time")
-                    or _now_iso(),
-                }
+            last_edited_time = (
+                topic.get("last_edited_time")
+                or detail_entry.get("last_edited_time")
+                or _now_iso()
             )
+            topic_data = {
+                "title": topic.get("title", ""),
+                "id": topic.get("topic_id", ""),
+                "hashtags": topic.get("tags", []),
+                "last_edited_time": last_edited_time,
+            }
+            render_key = (
+                _topic_render_key(topic, last_edited_time) if rendered_cache else None
+            )
+            rendered = (
+                rendered_cache.get(topic_data["id"], render_key) if render_key else None
+            )
+            if rendered:
+                topic_data["content"] = rendered["content"]
+                topic_data["content_html"] = rendered["content_html"]
+            else:
+                topic_data["content"] = _build_topic_content(topic)
+                topic_data["render_key"] = render_key
+            topics.append(topic_data)
 
         raw_data.append(
             {
@@ -576,6 +1024,12 @@ def _compose_raw_data_from_caches(
             }
         )
 
+    if missing_dates:
+        log.warning(
+            "⚠️ 詳細キャッシュの無い %d ページを出力しません（scripts.cache repair で取得し直せます）: %s",
+            len(missing_dates),
+            ", ".join(missing_dates),
+        )
     raw_data.sort(key=lambda item: item.get("date", ""), reverse=True)
     return raw_data
 
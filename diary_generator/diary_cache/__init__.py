@@ -0,0 +1,14 @@
+from . import migrations
+from .raw_archive import RawBlockArchive
+from .rendered import RenderedTopicCache, render_key
+from .store import CacheStore, CacheVerifyResult, DiaryCachePair
+
+__all__ = [
+    "CacheStore",
+    "CacheVerifyResult",
+    "DiaryCachePair",
+    "RawBlockArchive",
+    "RenderedTopicCache",
+    "migrations",
+    "render_key",
+]
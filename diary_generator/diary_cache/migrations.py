@@ -0,0 +1,65 @@
+"""
+日記キャッシュのスキーマ移行。
+
+CACHE_SCHEMA_VERSION を上げるときは、N → N+1 の移行を登録する。
+読み込んだキャッシュが古い場合は、登録された移行を順にかけて現在のバージョンにする。
+途中の移行が1つでも欠けていれば、これまでどおりキャッシュを捨てて取得し直す。
+
+    @diary_cache.migrations.register(from_version=4)
+    def _rename_tags(index, detail):
+        for entry in detail["entries"]:
+            ...
+        return index, detail
+
+ブロックの正規化を変える移行は、contents.rederive_detail_entries で
+生ブロックのアーカイブ（--archive-raw-blocks）から detail entry を作り直せる。
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from diary_generator.logger import logger
+
+log = logger.get_logger()
+
+Migration = Callable[
+    [dict[str, Any], dict[str, Any]], tuple[dict[str, Any], dict[str, Any]]
+]
+
+_MIGRATIONS: dict[int, Migration] = {}
+
+
+def register(from_version: int) -> Callable[[Migration], Migration]:
+    """from_version → from_version + 1 の移行として登録する。"""
+
+    def decorator(migration: Migration) -> Migration:
+        if from_version in _MIGRATIONS:
+            raise ValueError(f"migration from version {from_version} already exists")
+        _MIGRATIONS[from_version] = migration
+        return migration
+
+    return decorator
+
+
+def can_upgrade(from_version: Any, to_version: int) -> bool:
+    if not isinstance(from_version, int) or from_version >= to_version:
+        return False
+    return all(version in _MIGRATIONS for version in range(from_version, to_version))
+
+
+def upgrade(
+    index: dict[str, Any], detail: dict[str, Any], to_version: int
+) -> tuple[dict[str, Any], dict[str, Any]] | None:
+    """index / detail cache を to_version まで移行する。移行できなければ None。"""
+    version = detail.get("schema_version")
+    if index.get("schema_version") != version or not can_upgrade(version, to_version):
+        return None
+
+    for from_version in range(version, to_version):
+        log.info(
+            "🔄 キャッシュを移行します: schema %d → %d", from_version, from_version + 1
+        )
+        index, detail = _MIGRATIONS[from_version](index, detail)
+        index = {**index, "schema_version": from_version + 1}
+        detail = {**detail, "schema_version": from_version + 1}
+    return index, detail
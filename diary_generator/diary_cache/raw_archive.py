@@ -0,0 +1,85 @@
+"""
+Notion から取得した生のブロックツリーのアーカイブ（--archive-raw-blocks 指定時のみ）。
+
+ページごとに gzip 圧縮した JSON（raw_blocks/<page_id>.json.gz）で持つ。
+正規化の仕様を変えたときに、Notion に問い合わせずに detail entry を作り直すために使う
+（contents.rederive_detail_entries）。
+"""
+
+import os
+from typing import Any
+
+from diary_generator.logger import logger
+from diary_generator.util import codec
+
+log = logger.get_logger()
+
+ARCHIVE_CODEC = "gzip"
+
+
+class RawBlockArchive:
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def load(self, page_id: str) -> dict[str, Any] | None:
+        """{"page_id", "last_edited_time", "complete", "blocks"} を返す。無ければ None。"""
+        path = self._path(page_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            return codec.load(path)
+        except Exception as e:  # noqa: BLE001
+            log.warning("⚠️ 生ブロックのアーカイブを読めません: %s (%s)", path, e)
+            return None
+
+    def save(
+        self, page_id: str, last_edited_time: str, blocks: list[dict[str, Any]]
+    ) -> None:
+        """
+        取得したブロックツリーを保存する。子ツリーをキャッシュから再利用したブロック
+        （"_cached_children"）は、前回のアーカイブに同じブロックがあればその子を使う。
+        無ければ子が欠けたアーカイブになるので complete=False にする。
+        """
+        previous = self.load(page_id)
+        previous_children = {
+            block.get("id"): block["children"]
+            for block in (previous or {}).get("blocks", [])
+            if "children" in block
+        }
+        complete = True
+        archived_blocks = []
+        for block in blocks:
+            block = {
+                key: value for key, value in block.items() if key != "_cached_children"
+            }
+            if block.get("has_children") and "children" not in block:
+                children = previous_children.get(block.get("id"))
+                if children is None:
+                    complete = False
+                else:
+                    block["children"] = children
+            archived_blocks.append(block)
+
+        os.makedirs(self._directory, exist_ok=True)
+        codec.dump(
+            {
+                "page_id": page_id,
+                "last_edited_time": last_edited_time,
+                "complete": complete,
+                "blocks": archived_blocks,
+            },
+            self._path(page_id),
+            ARCHIVE_CODEC,
+        )
+
+    def prune(self, page_ids: set[str]) -> None:
+        """page_ids にないページ（削除・非公開化されたもの）のアーカイブを消す。"""
+        if not os.path.isdir(self._directory):
+            return
+        suffix = codec.suffix(ARCHIVE_CODEC)
+        for filename in os.listdir(self._directory):
+            if filename.endswith(suffix) and filename[: -len(suffix)] not in page_ids:
+                os.remove(os.path.join(self._directory, filename))
+
+    def _path(self, page_id: str) -> str:
+        return os.path.join(self._directory, f"{page_id}{codec.suffix(ARCHIVE_CODEC)}")
@@ -0,0 +1,74 @@
+"""
+トピックの描画結果（content / content_html）のキャッシュ。
+
+トピックごとに、描画に効く値（topic の last_edited_time・描画処理のバージョン・関係する設定）
+から作ったキーと一緒に保存する。キーが同じトピックは描画もリンクカード生成もせずに使い回す。
+"""
+
+import hashlib
+import json
+from typing import Any
+
+from diary_generator.logger import logger
+from diary_generator.util import codec
+
+log = logger.get_logger()
+
+
+class RenderedTopicCache:
+    def __init__(self, path: str):
+        self._path = path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._used: set[str] = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        found = codec.find_cache(path)
+        if found:
+            try:
+                self._entries = codec.load(found)
+            except Exception as e:  # noqa: BLE001
+                log.warning("⚠️ 描画キャッシュ読み込み失敗のため作り直します: %s", e)
+
+    def get(self, topic_id: str, key: str) -> dict[str, list[str]] | None:
+        """キーが一致すれば {"content": [...], "content_html": [...]} を返す。"""
+        entry = self._entries.get(topic_id)
+        if entry is None or entry.get("key") != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add(topic_id)
+        return entry
+
+    def put(
+        self, topic_id: str, key: str, content: list[str], content_html: list[str]
+    ) -> None:
+        self._entries[topic_id] = {
+            "key": key,
+            "content": content,
+            "content_html": content_html,
+        }
+        self._used.add(topic_id)
+        self._dirty = True
+
+    def save(self) -> None:
+        """今回使わなかったトピック（削除・非公開化されたもの）を落として書く。変更がなければ書かない。"""
+        unused = set(self._entries) - self._used
+        if not self._dirty and not unused:
+            return
+        for topic_id in unused:
+            del self._entries[topic_id]
+        path = codec.dump_cache(self._entries, self._path)
+        self._dirty = False
+        log.info(
+            "✅ 描画キャッシュ更新: %s（再利用 %d / 描画 %d）",
+            path,
+            self.hits,
+            self.misses,
+        )
+
+
+def render_key(*parts: Any) -> str:
+    """描画結果に効く値を並べて、キャッシュのキーにする。"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
@@ -0,0 +1,475 @@
+"""
+diary_index.json と詳細キャッシュの読み書き。
+
+index の拡張子は codec に従う（diary_index.json.gz 等）。マニフェストだけは常に JSON。
+
+詳細キャッシュは entry_date の月ごとのシャード（diary_detail/2026-01.<sha256 先頭>.json）に分けて書く。
+符号化は util.codec に従う（拡張子も codec ごと。読み込み時は中身から判定する）。
+シャードのファイル名は内容のハッシュを含むので、内容の変わらない月は書き直さない。
+どのシャードが現在のキャッシュかはマニフェスト（diary_cache.manifest.json）だけが知っており、
+マニフェストの置き換えで新旧がまとめて切り替わる。途中で止まっても前回のマニフェストと
+そのシャードはそのまま残る。読み込み時はマニフェストのサイズ・SHA-256 で各ファイルを確かめ、
+1回だけパースする。
+
+マニフェストにはページごとのチェックサムも持つ。壊れたシャードは読めるところまで読み、
+チェックサムの合うページだけを使う。読めなかったページは読み込み結果から外れるので、
+次回の取得ではそのページだけが Notion から取り直される。
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from diary_generator.logger import logger
+from diary_generator.util import codec
+
+from . import migrations
+
+log = logger.get_logger()
+
+MANIFEST_VERSION = 2
+UNKNOWN_SHARD_KEY = "unknown"
+
+
+@dataclass(frozen=True)
+class DiaryCachePair:
+    index: dict[str, Any]
+    detail: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class CacheVerifyResult:
+    index_ok: bool = True
+    damaged_shards: list[str] = field(default_factory=list)
+    corrupt_pages: list[str] = field(default_factory=list)  # 復元できなかったページ
+    missing_pages: list[str] = field(
+        default_factory=list
+    )  # index にあって detail に無いページ
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.index_ok
+            and not self.damaged_shards
+            and not self.corrupt_pages
+            and not self.missing_pages
+        )
+
+
+class CacheStore:
+    def __init__(
+        self,
+        index_path: str,
+        detail_path: str,
+        manifest_path: str,
+        schema_version: int,
+        shard_dir: str | None = None,
+    ):
+        """
+        detail_path は分割前の単一ファイル形式の詳細キャッシュ（読み込みのみ対応）。
+        shard_dir を省略するとマニフェストと同じディレクトリの diary_detail/ に置く。
+        """
+        self._index_path = index_path
+        self._detail_path = detail_path
+        self._manifest_path = manifest_path
+        self._schema_version = schema_version
+        self._shard_dir = shard_dir or os.path.join(
+            os.path.dirname(manifest_path), "diary_detail"
+        )
+        # このインスタンスで読み書きしたシャード（月 → (entries, マニフェストの記録)）。
+        # entries が同じ月はエンコードもハッシュ計算もせずに記録を使い回す。
+        self._known_shards: dict[str, tuple[list[dict[str, Any]], dict[str, Any]]] = {}
+
+    def exists(self) -> bool:
+        return codec.find_cache(self._index_path) is not None and (
+            os.path.exists(self._manifest_path) or os.path.exists(self._detail_path)
+        )
+
+    def load(self) -> DiaryCachePair | None:
+        """
+        キャッシュを読み込む。無い・壊れている場合、スキーマが古く移行もできない場合は None。
+        マニフェストが無い、または分割前のマニフェストなら、単一ファイルの詳細キャッシュを読む。
+        """
+        pair, _ = self._load()
+        return pair
+
+    def inspect(self) -> tuple[DiaryCachePair | None, CacheVerifyResult | None]:
+        """
+        load と verify を1回の読み込みで行う（統計の表示用。何も書かない）。
+        verify の結果は、verify() が None を返す形式・スキーマでは None。
+        """
+        return self._load()
+
+    def _load(self) -> tuple[DiaryCachePair | None, CacheVerifyResult | None]:
+        if not self.exists():
+            return None, None
+        result = None
+        try:
+            manifest = self._read_manifest()
+            if manifest is not None and (
+                manifest.get("schema_version") != self._schema_version
+                and not migrations.can_upgrade(
+                    manifest.get("schema_version"), self._schema_version
+                )
+            ):
+                return None, None  # 本体をパースせずに古いスキーマと分かる
+            if (
+                manifest is not None
+                and manifest.get("manifest_version") == MANIFEST_VERSION
+            ):
+                pair, result = self._load_sharded(manifest)
+                if manifest.get("schema_version") != self._schema_version:
+                    result = None
+            else:
+                pair = self._load_single(manifest)
+        except Exception as e:  # noqa: BLE001 どう壊れていても取得し直せばよい
+            log.warning("⚠️ キャッシュ読み込み失敗のため再取得します: %s", e)
+            return None, None
+
+        if pair is None:
+            return None, result
+        return upgrade_pair(pair, self._schema_version), result
+
+    def save(self, pair: DiaryCachePair) -> None:
+        """
+        index と、内容の変わった月のシャードを書き、最後にマニフェストを置き換える。
+        その後、どこからも参照されなくなったシャードと単一ファイル形式の詳細キャッシュを消す。
+        """
+        index_raw = _encode(pair.index)
+        index_path = codec.cache_path(self._index_path)
+        _write_atomic(index_path, index_raw)
+        log.info("✅ キャッシュ更新: %s", index_path)
+
+        os.makedirs(self._shard_dir, exist_ok=True)
+        shards = []
+        written = 0
+        known_shards = {}
+        for key, entries in _group_entries_by_month(pair.detail.get("entries", [])):
+            known = self._known_shards.get(key)
+            if (
+                known
+                and known[0] == entries
+                and os.path.exists(os.path.join(self._shard_dir, known[1]["path"]))
+            ):
+                record = known[1]
+            else:
+                raw = _encode(
+                    {"schema_version": self._schema_version, "entries": entries}
+                )
+                digest = hashlib.sha256(raw).hexdigest()
+                record = {
+                    "key": key,
+                    "path": f"{key}.{digest[:16]}{codec.suffix()}",
+                    "entries": len(entries),
+                    "size": len(raw),
+                    "sha256": digest,
+                    "pages": {
+                        entry["page_id"]: _entry_checksum(entry)
+                        for entry in entries
+                        if entry.get("page_id")
+                    },
+                }
+                path = os.path.join(self._shard_dir, record["path"])
+                if not os.path.exists(path):
+                    _write_atomic(path, raw)
+                    written += 1
+            shards.append(record)
+            known_shards[key] = (entries, record)
+        log.info(
+            "✅ キャッシュ更新: %s（%d / %d シャードを書き込み）",
+            self._shard_dir,
+            written,
+            len(shards),
+        )
+
+        manifest = {
+            "manifest_version": MANIFEST_VERSION,
+            "schema_version": self._schema_version,
+            "generated_at": pair.index.get("generated_at", ""),
+            "index": _file_record(index_path, index_raw),
+            "detail": {
+                "header": {
+                    key: value for key, value in pair.detail.items() if key != "entries"
+                },
+                "shards": shards,
+            },
+        }
+        _write_atomic(
+            self._manifest_path,
+            json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+        self._known_shards = known_shards
+        self._remove_unreferenced_shards({shard["path"] for shard in shards})
+        codec.remove_stale(self._index_path)
+        if os.path.exists(self._detail_path):
+            os.remove(self._detail_path)  # 分割前の形式からの移行
+
+    def verify(self) -> CacheVerifyResult | None:
+        """
+        キャッシュを確かめる（読めないページを数えるだけで、直さない）。
+        キャッシュが無い、または分割前の形式・古いスキーマなら None。
+        """
+        if not self.exists():
+            return None
+        manifest = self._read_manifest()
+        if (
+            manifest is None
+            or manifest.get("manifest_version") != MANIFEST_VERSION
+            or manifest.get("schema_version") != self._schema_version
+        ):
+            return None
+        _, result = self._read_sharded(manifest)
+        return result
+
+    def _load_sharded(
+        self, manifest: dict[str, Any]
+    ) -> tuple[DiaryCachePair | None, CacheVerifyResult]:
+        pair, result = self._read_sharded(manifest)
+        if not result.index_ok:
+            if not _can_rebuild_index(pair.detail):
+                log.warning(
+                    "⚠️ index cache がマニフェストと一致せず、detail cache からも作り直せないため再取得します: %s",
+                    codec.cache_path(self._index_path),
+                )
+                return None, result
+            log.warning(
+                "⚠️ index cache がマニフェストと一致しないため、detail cache から作り直します: %s",
+                codec.cache_path(self._index_path),
+            )
+        if result.corrupt_pages:
+            log.warning(
+                "⚠️ 壊れたキャッシュから読めなかった %d ページを取得し直します: %s",
+                len(result.corrupt_pages),
+                ", ".join(result.corrupt_pages),
+            )
+        return pair, result
+
+    def _read_sharded(
+        self, manifest: dict[str, Any]
+    ) -> tuple[DiaryCachePair, CacheVerifyResult]:
+        detail_manifest = manifest.get("detail", {})
+        entries: list[dict[str, Any]] = []
+        known_shards = {}
+        damaged_shards = []
+        corrupt_pages = []
+        for shard in detail_manifest.get("shards", []):
+            path = os.path.join(self._shard_dir, shard["path"])
+            raw = _read_bytes(path) if os.path.exists(path) else b""
+            if _matches(shard, raw):
+                shard_entries = codec.decode(raw)["entries"]
+                known_shards[shard["key"]] = (shard_entries, shard)
+            else:
+                log.warning("⚠️ キャッシュがマニフェストと一致しません: %s", path)
+                damaged_shards.append(shard["key"])
+                shard_entries, lost = _salvage_entries(raw, shard.get("pages", {}))
+                corrupt_pages.extend(lost)
+            entries.extend(shard_entries)
+        self._known_shards = known_shards
+        detail = {**detail_manifest.get("header", {}), "entries": entries}
+
+        index_path = os.path.join(
+            os.path.dirname(self._index_path),
+            manifest.get("index", {}).get("path", ""),
+        )
+        index_raw = _read_bytes(index_path) if os.path.isfile(index_path) else b""
+        index_ok = _matches(manifest.get("index"), index_raw)
+        if index_ok:
+            index = codec.decode(index_raw)
+        else:
+            # 書きかけの index は新しすぎる可能性があるので使わない（detail と食い違う）
+            index = _index_from_detail(detail, self._schema_version)
+
+        detail_page_ids = {entry.get("page_id") for entry in entries}
+        missing_pages = [
+            entry["page_id"]
+            for entry in index.get("entries", [])
+            if entry.get("page_id")
+            and entry["page_id"] not in detail_page_ids
+            and entry["page_id"] not in corrupt_pages
+        ]
+        result = CacheVerifyResult(
+            index_ok=index_ok,
+            damaged_shards=damaged_shards,
+            corrupt_pages=corrupt_pages,
+            missing_pages=missing_pages,
+        )
+        return DiaryCachePair(index=index, detail=detail), result
+
+    def _load_single(self, manifest: dict[str, Any] | None) -> DiaryCachePair | None:
+        contents = {}
+        index_path = codec.find_cache(self._index_path) or self._index_path
+        for name, path in (("index", index_path), ("detail", self._detail_path)):
+            raw = _read_bytes(path)
+            record = (manifest or {}).get("files", {}).get(name)
+            if manifest is not None and not _matches(record, raw):
+                log.warning(
+                    "⚠️ キャッシュがマニフェストと一致しないため再取得します: %s", path
+                )
+                return None
+            contents[name] = codec.decode(raw)
+        return DiaryCachePair(index=contents["index"], detail=contents["detail"])
+
+    def _read_manifest(self) -> dict[str, Any] | None:
+        if not os.path.exists(self._manifest_path):
+            return None
+        with open(self._manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("manifest_version") not in (1, MANIFEST_VERSION):
+            raise ValueError(f"unknown manifest version: {self._manifest_path}")
+        return manifest
+
+    def _remove_unreferenced_shards(self, referenced: set[str]) -> None:
+        for filename in os.listdir(self._shard_dir):
+            if filename not in referenced:
+                os.remove(os.path.join(self._shard_dir, filename))
+
+
+def upgrade_pair(pair: DiaryCachePair, schema_version: int) -> DiaryCachePair | None:
+    """スキーマが古ければ登録済みの移行で schema_version まで上げる。上げられなければ None。"""
+    if (
+        pair.index.get("schema_version") == schema_version
+        and pair.detail.get("schema_version") == schema_version
+    ):
+        return pair
+    upgraded = migrations.upgrade(pair.index, pair.detail, schema_version)
+    if upgraded is None:
+        return None
+    return DiaryCachePair(index=upgraded[0], detail=upgraded[1])
+
+
+def _entry_checksum(entry: dict[str, Any]) -> str:
+    """detail entry のチェックサム（codec によらず、キー順をそろえた JSON の SHA-256）。"""
+    raw = json.dumps(
+        entry, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+_ENTRIES_START = re.compile(r'"entries"\s*:\s*\[')
+
+
+def _salvage_entries(
+    raw: bytes, checksums: dict[str, str]
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    壊れたシャードから、チェックサムの合う entry を取り出す。
+    戻り値: (entries, 取り出せなかった page_id)
+    チェックサムの無い古いマニフェストでは、どの entry も確かめられないので使わない。
+    """
+    entries = []
+    if checksums:
+        try:
+            candidates = codec.decode(raw)["entries"]
+        except Exception:  # noqa: BLE001 途中で切れたシャードは codec ごとに違う例外になる
+            candidates = _decode_entries_prefix(raw)
+        entries = [
+            entry
+            for entry in candidates
+            if isinstance(entry, dict)
+            and checksums.get(entry.get("page_id")) == _entry_checksum(entry)
+        ]
+    recovered = {entry["page_id"] for entry in entries}
+    return entries, [page_id for page_id in checksums if page_id not in recovered]
+
+
+def _decode_entries_prefix(raw: bytes) -> list[Any]:
+    """途中で切れた JSON のシャードから、最後まで読める entry だけを順に取り出す。"""
+    text = raw.decode("utf-8", errors="ignore")
+    match = _ENTRIES_START.search(text)
+    if not match:
+        return []
+    decoder = json.JSONDecoder()
+    entries = []
+    position = match.end()
+    while True:
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        try:
+            entry, position = decoder.raw_decode(text, position)
+        except ValueError:
+            return entries
+        entries.append(entry)
+
+
+def _index_from_detail(detail: dict[str, Any], schema_version: int) -> dict[str, Any]:
+    """
+    detail entry から最低限の index cache を作る。synced_at を持たないので、
+    次回は日記一覧を全件取得し直す（detail は last_edited_time が同じページだけ使われる）。
+    """
+    return {
+        "schema_version": schema_version,
+        "generated_at": detail.get("generated_at", ""),
+        "entries": [
+            {
+                "page_id": entry["page_id"],
+                "page_name": entry.get("page_name", ""),
+                "entry_date": entry.get("entry_date", ""),
+                "index_direction": entry.get("index_direction", "noindex"),
+                "last_edited_time": entry.get("last_edited_time", ""),
+            }
+            for entry in detail.get("entries", [])
+            if entry.get("page_id")
+        ],
+    }
+
+
+def _can_rebuild_index(detail: dict[str, Any]) -> bool:
+    """
+    detail entry だけで index entry を作り直せるか。index_direction を持たない
+    古い detail entry からは、ページが noindex かどうか分からないので作り直さない。
+    """
+    return all(
+        "page_name" in entry and "index_direction" in entry
+        for entry in detail.get("entries", [])
+        if entry.get("page_id")
+    )
+
+
+def _group_entries_by_month(
+    entries: list[dict[str, Any]],
+) -> list[tuple[str, list[dict[str, Any]]]]:
+    """
+    entry_date の年月でまとめる。シャードは entries 内で最初に現れた順に並べるので、
+    entries が日付順なら、読み込み時にシャードをつなげると元の順に戻る。
+    """
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for entry in entries:
+        entry_date = entry.get("entry_date") or ""
+        key = entry_date[:7] if len(entry_date) >= 7 else UNKNOWN_SHARD_KEY
+        groups.setdefault(key, []).append(entry)
+    return list(groups.items())
+
+
+def _encode(content: Any) -> bytes:
+    return codec.encode(content)
+
+
+def _file_record(path: str, raw: bytes) -> dict[str, Any]:
+    return {
+        "path": os.path.basename(path),
+        "size": len(raw),
+        "sha256": hashlib.sha256(raw).hexdigest(),
+    }
+
+
+def _matches(record: dict[str, Any] | None, raw: bytes) -> bool:
+    record = record or {}
+    return (
+        record.get("size") == len(raw)
+        and record.get("sha256") == hashlib.sha256(raw).hexdigest()
+    )
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_atomic(path: str, raw: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
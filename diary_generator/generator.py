@@ -1,16 +1,30 @@
-from diary_generator import contents, filemaintenance, html, json
+from concurrent.futures import ThreadPoolExecutor
+
+from diary_generator import contents, filemaintenance, html, json, notion_api
+from diary_generator.logger import logger
 from diary_generator.topic_slug import TopicSlugResolver
 from diary_generator.util import utilities
 
+log = logger.get_logger()
+
 
 def generate_all():
-    # 日記データの取得
-    diary_entries = contents.get()
+    # スラッグデータは日記データと独立しているので、並行して取得する
+    # （Notion API のレート制御は共有クライアントで全体にかかる）
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="topic-slugs"
+    ) as executor:
+        resolver_future = executor.submit(TopicSlugResolver)
+
+        # 日記データの取得
+        diary_entries = contents.get()
 
-    # スラッグデータの取得
-    resolver = TopicSlugResolver()
+        # HTML 生成にはスラッグが必要なので、ここで取得完了を待つ
+        resolver = resolver_future.result()
     utilities.set_topic_url_fn(resolver.url_for_title)
 
+    _log_notion_stats()
+
     filemaintenance.reflesh_files()
     filemaintenance.copy_static_files()
 
@@ -24,3 +38,17 @@ def generate_all():
 
     json.search.generate(diary_entries)
     json.calendar.generate(diary_entries)
+
+
+def _log_notion_stats():
+    stats = notion_api.get_client().stats
+    log.info(
+        "📊 Notion API: %d リクエスト（新規接続 %d / 接続再利用 %d）"
+        " 待機 %d / 429 %d / 再試行 %d",
+        stats.requests,
+        stats.new_connections,
+        stats.reused_connections,
+        stats.throttled,
+        stats.rate_limited,
+        stats.retried,
+    )
@@ -37,6 +37,6 @@ def generate(diary_entries: list[DiaryEntry]):
 
     # JSONファイルとして保存
     with open(f"{output_path}search_data.json", "w", encoding="utf-8") as f:
-        json.dump(search_items, f, ensure_ascii=False, indent=2)
+        json.dump(search_items, f, ensure_ascii=False, separators=(",", ":"))
 
     log.info(f"✅ search_data.json を {len(search_items)} 件生成しました！")
@@ -1,4 +1,17 @@
+from . import filters
 from .blocks import get_block_children
-from .database import query_database
+from .client import NotionClient, NotionClientStats, get_client, reset_client
+from .database import query_database, retrieve_database
+from .ratelimit import NotionApiError
 
-__all__ = ["get_block_children", "query_database"]
+__all__ = [
+    "NotionApiError",
+    "NotionClient",
+    "NotionClientStats",
+    "filters",
+    "get_block_children",
+    "get_client",
+    "query_database",
+    "reset_client",
+    "retrieve_database",
+]
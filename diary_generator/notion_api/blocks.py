@@ -1,4 +1,4 @@
-from .client import notion_request
+from .client import get_client
 
 
 def get_block_children(block_id: str, start_cursor: str = None) -> dict:
@@ -8,4 +8,4 @@ def get_block_children(block_id: str, start_cursor: str = None) -> dict:
         params["start_cursor"] = start_cursor
     params["page_size"] = 100
 
-    return notion_request("GET", endpoint, params=params)
+    return get_client().request("GET", endpoint, params=params)
@@ -1,21 +1,224 @@
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from diary_generator.config.configuration import config
+from diary_generator.logger import logger
+from diary_generator.notion_api.ratelimit import (
+    CircuitBreaker,
+    NotionApiError,
+    TokenBucket,
+    backoff_delay,
+    parse_retry_after,
+)
+
+log = logger.get_logger()
 
 NOTION_API_BASE = "https://api.notion.com/v1"
 NOTION_API_VERSION = "2022-06-28"
 
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+@dataclass(frozen=True)
+class NotionClientStats:
+    """1回の実行で発行した Notion API リクエストと接続の集計"""
+
+    requests: int = 0
+    new_connections: int = 0
+    throttled: int = 0  # レート制御で待たされたリクエスト数
+    rate_limited: int = 0  # 429 を受け取った回数
+    retried: int = 0  # 再試行した回数
+
+    @property
+    def reused_connections(self) -> int:
+        """keep-alive 済みの接続を使い回したリクエスト数"""
+        return max(self.requests - self.new_connections, 0)
+
+
+class NotionClient:
+    """
+    keep-alive の `requests.Session` を使い回す Notion API クライアント。
+    接続プールと共通ヘッダーはセッションに一度だけ設定する。
+    リクエストはトークンバケットで平均レートを守り、429 / 5xx は再試行する。
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        api_config = config.NOTION_API
+        self._api_config = api_config
+        self._timeout = api_config.TIMEOUT
+        self._sleep = sleep
+        self._session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=api_config.POOL_CONNECTIONS,
+            pool_maxsize=api_config.pool_maxsize,
+        )
+        self._session.mount("https://", self._adapter)
+        self._session.headers.update(
+            {
+                "Authorization": f"Bearer {api_key or config.ENV.NOTION_API_KEY}",
+                "Content-Type": "application/json",
+                "Notion-Version": NOTION_API_VERSION,
+            }
+        )
+        self._bucket = TokenBucket(
+            api_config.RATE_LIMIT_PER_SEC,
+            api_config.RATE_LIMIT_BURST,
+            clock=clock,
+            sleep=sleep,
+        )
+        self._breaker = CircuitBreaker(
+            api_config.CIRCUIT_BREAKER_THRESHOLD,
+            api_config.CIRCUIT_BREAKER_RESET,
+            clock=clock,
+            sleep=sleep,
+        )
+        self._counts = {"requests": 0, "throttled": 0, "rate_limited": 0, "retried": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    @property
+    def stats(self) -> NotionClientStats:
+        with self._lock:
+            counts = dict(self._counts)
+        return NotionClientStats(
+            new_connections=self._count_new_connections(),
+            **counts,
+        )
+
+    def request(self, method: str, endpoint: str, json=None, params=None) -> dict:
+        url = f"{NOTION_API_BASE}/{endpoint}"
+        max_retries = self._api_config.MAX_RETRIES
+
+        for attempt in range(max_retries + 1):
+            # 開いている間は half-open まで待つ（待っても再試行の回数には数えない）
+            waited = self._breaker.wait()
+            if waited > 0:
+                log.warning(
+                    "⏸️ Notion API の連続失敗のため %.1f 秒待ってから再開しました: %s",
+                    waited,
+                    endpoint,
+                )
+            if self._bucket.acquire() > 0:
+                self._count("throttled")
+            self._count("requests")
+
+            try:
+                response = self._session.request(
+                    method, url, json=json, params=params, timeout=self._timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._breaker.record_failure()
+                if attempt >= max_retries:
+                    raise NotionApiError(f"Notion API request failed: {e}") from e
+                self._wait_before_retry(
+                    endpoint, attempt, self._retry_delay(attempt, None), str(e)
+                )
+                continue
+            except BaseException:
+                self._breaker.record_other()
+                raise
+
+            if response.status_code == 200:
+                self._breaker.record_success()
+                return response.json()
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                self._breaker.record_success()  # サーバーは応答している
+                raise NotionApiError(
+                    f"Notion API Error {response.status_code}: {response.text}",
+                    status_code=response.status_code,
+                )
+
+            delay = self._retry_delay(
+                attempt, parse_retry_after(response.headers.get("Retry-After"))
+            )
+            if response.status_code == 429:
+                # レート超過はサーバー障害ではないのでブレーカーには数えず、全体を止める
+                self._count("rate_limited")
+                self._breaker.record_other()
+                self._bucket.pause(delay)
+            else:
+                self._breaker.record_failure()
+
+            if attempt >= max_retries:
+                raise NotionApiError(
+                    f"Notion API Error {response.status_code}: {response.text}",
+                    status_code=response.status_code,
+                )
+            self._wait_before_retry(endpoint, attempt, delay, str(response.status_code))
+
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _retry_delay(self, attempt: int, retry_after: float | None) -> float:
+        """再試行までの秒数。Retry-After があればそれ、無ければ指数バックオフ。"""
+        if retry_after is not None:
+            return retry_after
+        return backoff_delay(
+            attempt, self._api_config.BACKOFF_BASE, self._api_config.BACKOFF_MAX
+        )
+
+    def _wait_before_retry(
+        self, endpoint: str, attempt: int, delay: float, reason: str
+    ) -> None:
+        self._count("retried")
+        log.info(
+            "🔁 Notion API 再試行 (%d/%d) %s: %s（%.1f 秒待機）",
+            attempt + 1,
+            self._api_config.MAX_RETRIES,
+            endpoint,
+            reason,
+            delay,
+        )
+        self._sleep(delay)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _count_new_connections(self) -> int:
+        # urllib3 の接続プールは新規接続を作るたびに num_connections を数えている
+        pools = self._adapter.poolmanager.pools
+        total = 0
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            total += getattr(pool, "num_connections", 0) if pool else 0
+        return total
+
+
+_client: NotionClient | None = None
+_client_lock = threading.Lock()
+
 
-def notion_request(method: str, endpoint: str, json=None, params=None) -> dict:
-    url = f"{NOTION_API_BASE}/{endpoint}"
-    headers = {
-        "Authorization": f"Bearer {config.ENV.NOTION_API_KEY}",
-        "Content-Type": "application/json",
-        "Notion-Version": NOTION_API_VERSION,
-    }
-    response = requests.request(method, url, headers=headers, json=json, params=params)
+def get_client() -> NotionClient:
+    """実行中に共有する NotionClient を返す（初回呼び出し時に生成）。"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NotionClient()
+        return _client
 
-    if response.status_code != 200:
-        raise Exception(f"Notion API Error {response.status_code}: {response.text}")
 
-    return response.json()
+def reset_client() -> None:
+    """共有クライアントを破棄する。次回の get_client() で作り直される。"""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
@@ -1,11 +1,32 @@
-from diary_generator.notion_api.client import notion_request
+from diary_generator.notion_api.client import get_client
 
 
-def query_database(database_id: str, start_cursor: str = None) -> dict:
+def query_database(
+    database_id: str,
+    start_cursor: str = None,
+    filter: dict | None = None,
+    sorts: list[dict] | None = None,
+    filter_properties: list[str] | None = None,
+) -> dict:
+    """
+    filter_properties にプロパティIDを渡すと、その値だけを含むページが返る。
+    空リストや None なら全プロパティを返す。
+    """
     payload = {}
     if start_cursor:
         payload["start_cursor"] = start_cursor
+    if filter:
+        payload["filter"] = filter
+    if sorts:
+        payload["sorts"] = sorts
     payload["page_size"] = 100
 
+    params = {"filter_properties": filter_properties} if filter_properties else None
+
     endpoint = f"databases/{database_id}/query"
-    return notion_request("POST", endpoint, json=payload or {})
+    return get_client().request("POST", endpoint, json=payload or {}, params=params)
+
+
+def retrieve_database(database_id: str) -> dict:
+    endpoint = f"databases/{database_id}"
+    return get_client().request("GET", endpoint)
@@ -0,0 +1,289 @@
+"""
+ライブの Notion ワークスペースなしで取得処理を動かすための、偽の Notion API。
+
+`FakeNotionWorkspace` が合成した日記データベースとブロックツリーを、
+`FakeNotionAdapter` が requests のトランスポートとして返す。
+`NotionClient.session.mount("https://", adapter)` すれば、notion_api の実際の
+エンドポイント関数・レート制御・再試行をそのまま通せる。
+"""
+
+import json
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+
+DATABASE_ID = "fake-diary-database"
+
+PROPERTY_IDS = {
+    "名前": "title",
+    "日付": "date",
+    "公開": "public",
+    "収集対象": "index",
+}
+
+
+@dataclass(frozen=True)
+class FakeWorkspaceShape:
+    pages: int = 100
+    topics_per_page: int = 5
+    blocks_per_topic: int = 3
+    nesting_depth: int = 2  # 各トピックの最初のリストを何段ネストさせるか
+    children_per_block: int = 2
+    draft_ratio: float = 0.2  # 非公開行の割合
+
+
+class FakeNotionWorkspace:
+    """合成した日記データベース（1行1ページ）と、各ページのブロックツリー。"""
+
+    def __init__(self, shape: FakeWorkspaceShape | None = None, seed: int = 0):
+        self.shape = shape or FakeWorkspaceShape()
+        self.rows: list[dict[str, Any]] = []
+        self.children: dict[str, list[dict[str, Any]]] = {}
+        self._random = random.Random(seed)
+        self._build()
+
+    def _build(self) -> None:
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        for n in range(self.shape.pages):
+            page_id = f"page-{n:05d}"
+            entry_date = (base - timedelta(days=n)).date().isoformat()
+            edited = _iso(base - timedelta(days=n) + timedelta(hours=12))
+            is_public = self._random.random() >= self.shape.draft_ratio
+            self.rows.append(_database_row(page_id, entry_date, edited, is_public))
+            self.children[page_id] = self._page_blocks(page_id, edited)
+
+    def _page_blocks(self, page_id: str, edited: str) -> list[dict[str, Any]]:
+        blocks = []
+        for t in range(self.shape.topics_per_page):
+            topic_id = f"{page_id}-t{t}"
+            blocks.append(_block(topic_id, "heading_3", f"話題{t}", edited))
+            for b in range(self.shape.blocks_per_topic):
+                block_id = f"{topic_id}-b{b}"
+                if b == 0 and self.shape.nesting_depth > 0:
+                    blocks.append(self._list_tree(block_id, edited, depth=1))
+                else:
+                    blocks.append(_block(block_id, "paragraph", f"本文{b}", edited))
+        return blocks
+
+    def _list_tree(self, block_id: str, edited: str, depth: int) -> dict[str, Any]:
+        item = _block(block_id, "bulleted_list_item", f"項目{depth}", edited)
+        if depth > self.shape.nesting_depth:
+            return item
+        item["has_children"] = True
+        self.children[block_id] = [
+            self._list_tree(f"{block_id}-{c}", edited, depth + 1)
+            for c in range(self.shape.children_per_block)
+        ]
+        return item
+
+    def database(self) -> dict[str, Any]:
+        types = {
+            "名前": "title",
+            "日付": "date",
+            "公開": "checkbox",
+            "収集対象": "select",
+        }
+        return {
+            "object": "database",
+            "id": DATABASE_ID,
+            "properties": {
+                name: {"id": prop_id, "type": types[name]}
+                for name, prop_id in PROPERTY_IDS.items()
+            },
+        }
+
+
+class FakeNotionAdapter(BaseAdapter):
+    """
+    FakeNotionWorkspace を Notion API として返す requests のトランスポート。
+    latency 秒の応答遅延と、error_rate の割合で 429 / 5xx を返す障害を注入できる。
+    """
+
+    def __init__(
+        self,
+        workspace: FakeNotionWorkspace,
+        *,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: tuple[int, ...] = (429, 500, 503),
+        retry_after: float = 0.1,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        super().__init__()
+        self.workspace = workspace
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests += 1
+            inject_error = self._random.random() < self.error_rate
+            status = self._random.choice(self.error_statuses) if inject_error else 200
+            if inject_error:
+                self.errors += 1
+        if self.latency:
+            self._sleep(self.latency)
+
+        if status != 200:
+            headers = {"Retry-After": str(self.retry_after)} if status == 429 else {}
+            return _response(request, status, {"message": "injected"}, headers)
+
+        url = urlparse(request.url)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")[1:]  # 先頭の v1 を除く
+        body = json.loads(request.body) if request.body else {}
+
+        if parts[:1] == ["blocks"] and parts[2:] == ["children"]:
+            children = self.workspace.children.get(parts[1])
+            if children is None:
+                return _response(request, 404, {"message": "block not found"})
+            return _response(request, 200, _paginate(children, query, body))
+        if parts[:1] == ["databases"] and parts[2:] == ["query"]:
+            rows = [
+                _project(row, query.get("filter_properties"))
+                for row in self.workspace.rows
+                if _matches(row, body.get("filter"))
+            ]
+            return _response(request, 200, _paginate(rows, query, body))
+        if parts[:1] == ["databases"] and len(parts) == 2:
+            return _response(request, 200, self.workspace.database())
+        return _response(request, 404, {"message": "unknown endpoint"})
+
+    def close(self):
+        pass
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+
+def _database_row(
+    page_id: str, entry_date: str, edited: str, is_public: bool
+) -> dict[str, Any]:
+    return {
+        "object": "page",
+        "id": page_id,
+        "last_edited_time": edited,
+        "archived": False,
+        "in_trash": False,
+        "properties": {
+            "名前": {
+                "id": "title",
+                "type": "title",
+                "title": [{"plain_text": entry_date.replace("-", "")}],
+            },
+            "日付": {"id": "date", "type": "date", "date": {"start": entry_date}},
+            "公開": {"id": "public", "type": "checkbox", "checkbox": is_public},
+            "収集対象": {
+                "id": "index",
+                "type": "select",
+                "select": {"name": "index"},
+            },
+        },
+    }
+
+
+def _block(block_id: str, block_type: str, text: str, edited: str) -> dict[str, Any]:
+    return {
+        "object": "block",
+        "id": block_id,
+        "type": block_type,
+        "has_children": False,
+        "last_edited_time": edited,
+        block_type: {
+            "rich_text": [
+                {
+                    "type": "text",
+                    "plain_text": text,
+                    "text": {"content": text},
+                    "href": None,
+                    "annotations": {},
+                }
+            ]
+        },
+    }
+
+
+def _paginate(
+    items: list[dict[str, Any]], query: dict[str, list[str]], body: dict[str, Any]
+) -> dict[str, Any]:
+    cursor = (query.get("start_cursor") or [body.get("start_cursor")])[0]
+    page_size = int((query.get("page_size") or [body.get("page_size") or 100])[0])
+    start = int(cursor or 0)
+    end = start + page_size
+    has_more = end < len(items)
+    return {
+        "object": "list",
+        "results": items[start:end],
+        "has_more": has_more,
+        "next_cursor": str(end) if has_more else None,
+    }
+
+
+def _matches(row: dict[str, Any], filter: dict[str, Any] | None) -> bool:
+    """notion_api.filters で組み立てる形の filter だけを解釈する。"""
+    if not filter:
+        return True
+    if "and" in filter:
+        return all(_matches(row, sub) for sub in filter["and"])
+    if filter.get("timestamp") == "last_edited_time":
+        since = filter["last_edited_time"]["on_or_after"]
+        return _parse(row["last_edited_time"]) >= _parse(since)
+
+    prop = row["properties"].get(filter.get("property"), {})
+    if "checkbox" in filter:
+        return prop.get("checkbox") == filter["checkbox"]["equals"]
+    if "select" in filter:
+        return bool(prop.get("select"))
+    if "date" in filter:
+        return bool(prop.get("date"))
+    return True
+
+
+def _project(row: dict[str, Any], property_ids: list[str] | None) -> dict[str, Any]:
+    if not property_ids:
+        return row
+    return {
+        **row,
+        "properties": {
+            name: value
+            for name, value in row["properties"].items()
+            if value["id"] in property_ids
+        },
+    }
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def _response(
+    request: requests.PreparedRequest,
+    status: int,
+    payload: dict[str, Any],
+    headers: dict[str, str] | None = None,
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    response.headers.update(headers or {})
+    response.headers["Content-Type"] = "application/json"
+    response.request = request
+    response.url = request.url
+    return response
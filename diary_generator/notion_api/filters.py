@@ -0,0 +1,31 @@
+"""
+データベースクエリの filter を組み立てるヘルパー。
+https://developers.notion.com/reference/post-database-query-filter
+"""
+
+from typing import Any
+
+Filter = dict[str, Any]
+
+
+def checkbox_equals(property_name: str, value: bool) -> Filter:
+    return {"property": property_name, "checkbox": {"equals": value}}
+
+
+def select_is_not_empty(property_name: str) -> Filter:
+    return {"property": property_name, "select": {"is_not_empty": True}}
+
+
+def date_is_not_empty(property_name: str) -> Filter:
+    return {"property": property_name, "date": {"is_not_empty": True}}
+
+
+def last_edited_on_or_after(iso_datetime: str) -> Filter:
+    return {
+        "timestamp": "last_edited_time",
+        "last_edited_time": {"on_or_after": iso_datetime},
+    }
+
+
+def all_of(*filters: Filter) -> Filter:
+    return {"and": list(filters)}
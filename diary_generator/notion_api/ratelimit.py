@@ -0,0 +1,153 @@
+"""Notion API 向けのレート制御（トークンバケット）とサーキットブレーカー。"""
+
+import random
+import threading
+import time
+from collections.abc import Callable
+
+
+class NotionApiError(Exception):
+    """Notion API が 200 以外を返した、または通信に失敗した。"""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    平均 `rate` 件/秒、最大 `capacity` 件までのバーストを許すトークンバケット。
+    複数スレッドから呼ばれても、全体でレートを守る。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """トークンを1つ取得する。待った秒数を返す（待たなければ 0）。"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            # 足りなければ前借りして、補充されるまで待つ
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            wait = max(wait, self._paused_until - now)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Retry-After などで指示された秒数、全リクエストを止める。"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class CircuitBreaker:
+    """
+    連続 `failure_threshold` 回失敗したら `reset_timeout` 秒間リクエストを止める。
+    時間経過後は1件だけ試し（half-open）、その結果が出るまでほかのリクエストは待つ。
+    試しが成功すれば閉じ、失敗すればすぐ開き直す。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._sleep = sleep
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe: int | None = None  # half-open の試しを送ったスレッド
+        self._condition = threading.Condition()
+
+    @property
+    def is_open(self) -> bool:
+        with self._condition:
+            return self._opened_at is not None
+
+    def wait(self) -> float:
+        """
+        リクエストを送ってよくなるまで待ち、待った秒数を返す（待たなければ 0）。
+        開いていれば half-open まで待ち、最初の1件だけを試しに通す。
+        通したリクエストは、結果を record_success / record_failure / record_other で知らせる。
+        """
+        started = self._clock()
+        while True:
+            with self._condition:
+                while self._probe is not None:
+                    self._condition.wait()
+                remaining = self._remaining()
+                if remaining <= 0:
+                    if self._opened_at is not None:
+                        # half-open: このリクエストだけを通す。失敗すればすぐ開き直す
+                        self._opened_at = None
+                        self._failures = self._failure_threshold - 1
+                        self._probe = threading.get_ident()
+                    return self._clock() - started
+            self._sleep(remaining)
+
+    def record_success(self) -> None:
+        with self._condition:
+            self._failures = 0
+            self._opened_at = None
+            self._finish_probe()
+
+    def record_failure(self) -> None:
+        with self._condition:
+            self._failures += 1
+            if self._failures >= self._failure_threshold:
+                self._opened_at = self._clock()
+            self._finish_probe()
+
+    def record_other(self) -> None:
+        """成功とも失敗とも数えない結果（429 や想定外の例外）。試しのリクエストなら待っている側を通す。"""
+        with self._condition:
+            self._finish_probe()
+
+    def _remaining(self) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return self._opened_at + self._reset_timeout - self._clock()
+
+    def _finish_probe(self) -> None:
+        # 開く前に送られていたリクエストの結果では、試しを終わらせない
+        if self._probe == threading.get_ident():
+            self._probe = None
+            self._condition.notify_all()
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """full jitter の指数バックオフ（attempt は 0 始まり）。"""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After ヘッダー（秒数）を解釈する。解釈できなければ None。"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return max(seconds, 0.0)
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
-import json
-import os
+from datetime import UTC, datetime, timedelta
+from typing import Any
 
+from diary_generator import notion_api
 from diary_generator.config.configuration import config
 from diary_generator.logger import logger
 from diary_generator.models import TopicSlugEntry
@@ -15,30 +16,44 @@ from diary_generator.topic_slugs.resolve import (
     build_lookup,
     build_slug_to_display_name,
 )
+from diary_generator.util import codec
 
 log = logger.get_logger()
 
+# Notion の last_edited_time は分単位に丸められるため、差分問い合わせは少し遡る
+SYNC_MARGIN = timedelta(minutes=5)
 
-def _write_json(path: str, content: list[dict]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(content, f, ensure_ascii=False, indent=2)
+
+def _write_json(path: str, content: dict[str, Any]) -> None:
+    codec.dump_cache(content, path)
+
+
+def _read_cache(path: str) -> dict[str, Any]:
+    """
+    cache/topic_slugs.json を読む。
+    旧形式（ルールのリストのみ）は同期時刻なしの {"rules": [...]} として返す。
+    """
+    raw = codec.load_cache(path)
+    if isinstance(raw, list):
+        return {"rules": raw}
+    if isinstance(raw, dict) and isinstance(raw.get("rules"), list):
+        return raw
+    return {"rules": []}
 
 
 def _read_json(path: str) -> list[dict]:
-    with open(path, encoding="utf-8") as f:
-        raw = json.load(f)
-    return raw if isinstance(raw, list) else []
+    return _read_cache(path)["rules"]
 
 
 def load_topic_slug_rules() -> list[dict]:
     """
-    cache/topic_slugs.json 互換のリストを返す。
-    USE_TOPIC_SLUG_CACHE かつファイルがあれば読む。無ければ Notion から取得してキャッシュに書く。
+    cache/topic_slugs.json のルールのリストを返す。
+    USE_TOPIC_SLUG_CACHE かつファイルがあれば読む。無ければ Notion と同期してキャッシュに書く。
     """
     path = config.FILE_NAMES.CACHE_TOPIC_SLUGS_PATH
     use_cache = config.USE_TOPIC_SLUG_CACHE
 
-    if use_cache and os.path.exists(path):
+    if use_cache and codec.find_cache(path):
         log.info("✅ トピックスラッグをキャッシュから読み込みます")
         try:
             return _read_json(path)
@@ -51,32 +66,97 @@ def load_topic_slug_rules() -> list[dict]:
         log.warning("SLUG_DATABASE_ID が空のためトピックスラッグは読み込めません")
         return []
 
+    old_cache = None
+    if codec.find_cache(path):
+        try:
+            old_cache = _read_cache(path)
+        except Exception as e:
+            log.warning(
+                "トピックスラッグキャッシュの読み込みに失敗したため全件取得します: %s",
+                e,
+            )
+
     try:
-        pages = fetch_all_slug_database_pages(database_id)
+        cache = _sync_topic_slug_cache(database_id, old_cache)
     except Exception as e:
         log.warning("トピックスラッグの Notion 取得に失敗しました: %s", e)
-        if os.path.exists(path):
-            try:
-                log.info("既存の cache/topic_slugs.json をフォールバックとして読みます")
-                return _read_json(path)
-            except Exception as e2:
-                log.warning("フォールバック読み込みも失敗: %s", e2)
+        if old_cache is not None:
+            log.info("既存の cache/topic_slugs.json をフォールバックとして読みます")
+            return old_cache["rules"]
         return []
 
-    entries: list[TopicSlugEntry] = []
-    for p in pages:
-        ent = page_to_entry(p)
-        if ent:
-            entries.append(ent)
-
-    rules = [e.to_dict() for e in entries]
     try:
-        _write_json(path, rules)
+        _write_json(path, cache)
     except Exception as e:
         log.warning("topic_slugs.json の書き込みに失敗しました: %s", e)
 
-    log.info("✅ トピックスラッグを Notion から取得しました（%d 件）", len(rules))
-    return rules
+    log.info(
+        "✅ トピックスラッグを Notion から取得しました（%d 件）", len(cache["rules"])
+    )
+    return cache["rules"]
+
+
+def _sync_topic_slug_cache(
+    database_id: str, old_cache: dict[str, Any] | None
+) -> dict[str, Any]:
+    """
+    前回の同期時刻以降に編集された行だけを取得し、page_id ごとに前回のルールへマージする。
+    データベースの問い合わせはゴミ箱移動・削除された行を返さないので、削除は
+    TOPIC_SLUG_FULL_SYNC_INTERVAL ごと（または --full-sync 指定時）の全件取得で反映する。
+    """
+    now = datetime.now(UTC)
+    synced_at = now.isoformat()
+    if _needs_full_sync(old_cache, now):
+        pages = fetch_all_slug_database_pages(database_id)
+        return {
+            "synced_at": synced_at,
+            "full_synced_at": synced_at,
+            "rules": [rule for rule in map(_page_to_rule, pages) if rule],
+        }
+
+    since = datetime.fromisoformat(old_cache["synced_at"]) - SYNC_MARGIN
+    pages = fetch_all_slug_database_pages(
+        database_id,
+        filter=notion_api.filters.last_edited_on_or_after(since.isoformat()),
+    )
+    rules_by_page_id = {rule["page_id"]: rule for rule in old_cache["rules"]}
+    for page in pages:
+        rule = _page_to_rule(page)
+        if rule:
+            rules_by_page_id[page.get("id", "")] = rule
+        else:
+            rules_by_page_id.pop(page.get("id", ""), None)  # スラッグ・名前が空になった
+    log.info("🔄 トピックスラッグ差分同期: 更新 %d 件", len(pages))
+    return {
+        "synced_at": synced_at,
+        "full_synced_at": old_cache["full_synced_at"],
+        "rules": list(rules_by_page_id.values()),
+    }
+
+
+def _needs_full_sync(old_cache: dict[str, Any] | None, now: datetime) -> bool:
+    if config.FORCE_FULL_INDEX_SYNC or not old_cache:
+        return True
+    if not old_cache.get("synced_at") or not old_cache.get("full_synced_at"):
+        return True
+    if any(not rule.get("page_id") for rule in old_cache["rules"]):
+        return True  # 旧形式のルールは行と対応付けられない
+    full_synced_at = datetime.fromisoformat(old_cache["full_synced_at"])
+    return (
+        full_synced_at + timedelta(seconds=config.TOPIC_SLUG_FULL_SYNC_INTERVAL) <= now
+    )
+
+
+def _page_to_rule(page: dict) -> dict[str, Any] | None:
+    """Notion の行をキャッシュ用のルールにする。TopicSlugEntry.from_dict は追加キーを無視する。"""
+    entry = page_to_entry(page)
+    if not entry:
+        return None
+    return {
+        "page_id": page.get("id", ""),
+        "last_edited_time": page.get("last_edited_time", ""),
+        **entry.to_dict(),
+    }
 
 
 def load_topic_slug_lookups() -> tuple[dict[str, str], dict[str, str]]:
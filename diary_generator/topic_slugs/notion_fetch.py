@@ -11,13 +11,18 @@ def _format_database_id(database_id: str) -> str:
     return database_id.strip()
 
 
-def fetch_all_slug_database_pages(database_id: str) -> list[dict]:
-    """`query_database` をページネーションで繰り返し、ページオブジェクトのリストを返す。"""
+def fetch_all_slug_database_pages(
+    database_id: str, filter: dict | None = None
+) -> list[dict]:
+    """
+    `query_database` をページネーションで繰り返し、ページオブジェクトのリストを返す。
+    filter を渡すと条件に合うページだけを返す（差分同期用）。
+    """
     db_id = _format_database_id(database_id)
     all_pages: list[dict] = []
     cursor: str | None = None
     while True:
-        data = notion_api.query_database(db_id, start_cursor=cursor)
+        data = notion_api.query_database(db_id, start_cursor=cursor, filter=filter)
         all_pages.extend(data.get("results", []))
         if not data.get("has_more"):
             break
@@ -0,0 +1,183 @@
+"""
+キャッシュファイルの符号化（config.CACHE_CODEC で選ぶ）。
+
+- json: インデントなしの JSON（既定）
+- gzip: json を gzip で圧縮
+- zstd: json を Zstandard で圧縮（compression.zstd か zstandard がある場合のみ。無ければ gzip）
+- pickle: Python の pickle。最も速いが、このツール以外からは読めない
+
+拡張子は codec ごとに変わる（cache_path）。読み込み時は先頭バイトで形式を判定するので、
+codec を切り替えても既存のファイルはそのまま読める。ただし pickle は読み込むだけでコードを
+実行できるため、CACHE_CODEC に pickle を選んだときしか読まない。
+"""
+
+import contextlib
+import gzip
+import json
+import os
+import pickle
+from functools import cache
+from typing import Any
+
+from diary_generator.config.configuration import config
+from diary_generator.logger import logger
+
+try:
+    from compression import zstd as _zstd  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
+
+log = logger.get_logger()
+
+CODECS = ("json", "gzip", "zstd", "pickle")
+SUFFIXES = {
+    "json": ".json",
+    "gzip": ".json.gz",
+    "zstd": ".json.zst",
+    "pickle": ".pickle",
+}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_PICKLE_MAGIC = b"\x80"  # プロトコル2以降
+
+
+def available_codecs() -> list[str]:
+    return [name for name in CODECS if name != "zstd" or _zstd is not None]
+
+
+def resolve(name: str | None = None) -> str:
+    """name（省略時は config.CACHE_CODEC）を、この環境で使える codec 名にする。"""
+    name = name or config.CACHE_CODEC
+    if name not in CODECS:
+        raise ValueError(f"unknown cache codec: {name}")
+    if name == "zstd" and _zstd is None:
+        _warn_zstd_unavailable()
+        return "gzip"
+    return name
+
+
+def suffix(name: str | None = None) -> str:
+    return SUFFIXES[resolve(name)]
+
+
+def cache_path(path: str, name: str | None = None) -> str:
+    """.json で終わるキャッシュのパスの拡張子を、codec のものに付け替える。"""
+    return path.removesuffix(".json") + suffix(name)
+
+
+def find_cache(path: str) -> str | None:
+    """
+    cache_path(path) があればそれ、無ければ codec を切り替える前に書かれた同じキャッシュを返す。
+    どれも無ければ None。pickle は CACHE_CODEC が pickle のときしか探さない。
+    """
+    current = cache_path(path)
+    if os.path.exists(current):
+        return current
+    for candidate in _other_paths(path):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def load_cache(path: str) -> Any:
+    """find_cache で見つけたファイルを読む。無ければ FileNotFoundError。"""
+    found = find_cache(path)
+    if found is None:
+        raise FileNotFoundError(cache_path(path))
+    return load(found)
+
+
+def dump_cache(content: Any, path: str) -> str:
+    """cache_path(path) に書き、ほかの codec で書かれた古いファイルを消す。書いたパスを返す。"""
+    target = cache_path(path)
+    dump(content, target)
+    remove_stale(path)
+    return target
+
+
+def remove_stale(path: str) -> None:
+    """今の codec 以外の拡張子で書かれた同じキャッシュを消す（切り替え後に古い内容を読まないため）。"""
+    current = cache_path(path)
+    for candidate in {path.removesuffix(".json") + s for s in SUFFIXES.values()}:
+        if candidate != current:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(candidate)
+
+
+def encode(content: Any, name: str | None = None) -> bytes:
+    name = resolve(name)
+    if name == "pickle":
+        return pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)
+    raw = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if name == "gzip":
+        # mtime を固定して、同じ内容なら同じバイト列にする（内容アドレスのシャード名のため）
+        return gzip.compress(raw, compresslevel=6, mtime=0)
+    if name == "zstd":
+        return _zstd_compress(raw)
+    return raw
+
+
+def decode(raw: bytes, name: str | None = None) -> Any:
+    """
+    encode したバイト列か、整形された JSON（旧形式）を読む。
+    pickle は name（省略時は config.CACHE_CODEC）が pickle のときしか読まない。
+    """
+    if raw.startswith(_GZIP_MAGIC):
+        raw = gzip.decompress(raw)
+    elif raw.startswith(_ZSTD_MAGIC):
+        if _zstd is None:
+            raise ValueError(
+                "zstd で圧縮されたキャッシュを読むには zstandard が必要です"
+            )
+        raw = _zstd_decompress(raw)
+    elif raw.startswith(_PICKLE_MAGIC):
+        if resolve(name) != "pickle":
+            raise ValueError(
+                "pickle のキャッシュは CACHE_CODEC が pickle のときしか読み込みません"
+            )
+        return pickle.loads(raw)
+    return json.loads(raw)
+
+
+def dump(content: Any, path: str, name: str | None = None) -> None:
+    """一時ファイルに書いてから置き換える。"""
+    raw = encode(content, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
+
+
+def load(path: str, name: str | None = None) -> Any:
+    with open(path, "rb") as f:
+        return decode(f.read(), name)
+
+
+def _other_paths(path: str) -> list[str]:
+    base = path.removesuffix(".json")
+    allowed = [name for name in CODECS if name != "pickle" or resolve() == "pickle"]
+    current = cache_path(path)
+    paths = [base + SUFFIXES[name] for name in allowed]
+    return [candidate for candidate in dict.fromkeys(paths) if candidate != current]
+
+
+@cache
+def _warn_zstd_unavailable() -> None:
+    """resolve はファイルを書くたびに呼ばれるので、警告は1回だけ出す。"""
+    log.warning("⚠️ zstd が使えないため gzip で保存します")
+
+
+def _zstd_compress(raw: bytes) -> bytes:
+    if hasattr(_zstd, "compress"):
+        return _zstd.compress(raw)
+    return _zstd.ZstdCompressor().compress(raw)
+
+
+def _zstd_decompress(raw: bytes) -> bytes:
+    if hasattr(_zstd, "decompress"):
+        return _zstd.decompress(raw)
+    return _zstd.ZstdDecompressor().decompress(raw)
@@ -0,0 +1,26 @@
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_ordered(  # noqa: UP047
+    fn: Callable[[T], R], items: Iterable[T], max_workers: int
+) -> list[R]:
+    """
+    items の各要素に fn をスレッドプールで並行適用し、入力と同じ順で結果を返す。
+    どれかが例外を投げたら未着手の処理を取り消し、その例外をそのまま送出する。
+    max_workers が 1 以下、または要素が1件以下なら呼び出し元スレッドで順に処理する。
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    try:
+        futures = [executor.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
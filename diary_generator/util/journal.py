@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+from typing import Any
+
+from diary_generator.logger import logger
+
+log = logger.get_logger()
+
+
+class JsonlJournal:
+    """
+    1行1レコードで追記していくジャーナルファイル。
+    複数スレッドから append してよい。書き込みのたびに flush するので、
+    途中でプロセスが落ちても書き終えた行は残る（最後の1行が欠けることはある）。
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def load(self) -> list[dict[str, Any]]:
+        """記録済みのレコードを返す。読めない行（書きかけの末尾など）は飛ばす。"""
+        if not os.path.exists(self._path):
+            return []
+        records = []
+        with open(self._path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    log.warning("⚠️ ジャーナルの壊れた行を無視します: %s", self._path)
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+        return records
+
+    def append(self, record: dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                # close() まで開いたままにして、追記のたびに開き直さない
+                self._file = open(self._path, "a", encoding="utf-8")  # noqa: SIM115
+                if not _ends_with_newline(self._path):
+                    # 書きかけの末尾の行に続けて書かないよう、行を終わらせる
+                    self._file.write("\n")
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+
+def _ends_with_newline(path: str) -> bool:
+    """空のファイルか、末尾が改行で終わっていれば True。"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
@@ -1,2 +1,5 @@
-ogp_cache: dict[str, dict] = {}
-oembed_cache: dict[str, dict] = {}
+from collections.abc import MutableMapping
+
+# cache.initialize で LinkCardStore に置き換わる
+ogp_cache: MutableMapping[str, dict] = {}
+oembed_cache: MutableMapping[str, dict] = {}
@@ -1,28 +1,166 @@
-import json
-import os
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, MutableMapping
+from datetime import UTC, datetime, timedelta
 
 from diary_generator.config.configuration import config
 from diary_generator.logger import logger
 from diary_generator.util import linkcard
+from diary_generator.util.linkcard.store import LinkCardStore
 
 log = logger.get_logger()
 
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+HIT = "hit"
+STALE = "stale"  # 使えるが、取り直す時期を過ぎている
+NEGATIVE = "negative"  # 取得に失敗したのを覚えていて、まだ再試行しない
+MISS = "miss"
+
+# 今回の実行でのキャッシュの使われ方（URL ごとに最初の lookup だけ数える）
+counters: Counter[str] = Counter()
+_counted: set[str] = set()
+# lookup / record はどのスレッドから呼ばれてもよいように、カウンターとキャッシュの更新をまとめて守る
+_lock = threading.Lock()
+
 
 def initialize():
-    if os.path.exists(config.FILE_NAMES.CACHE_OGP_PATH):
-        with open(config.FILE_NAMES.CACHE_OGP_PATH, "r", encoding="utf-8") as f:
-            linkcard.ogp_cache = json.load(f)
-    if os.path.exists(config.FILE_NAMES.CACHE_TWITTER_PATH):
-        with open(config.FILE_NAMES.CACHE_TWITTER_PATH, "r", encoding="utf-8") as f:
-            linkcard.oembed_cache = json.load(f)
+    linkcard.ogp_cache = LinkCardStore(config.FILE_NAMES.CACHE_OGP_PATH)
+    linkcard.oembed_cache = LinkCardStore(config.FILE_NAMES.CACHE_TWITTER_PATH)
+    with _lock:
+        counters.clear()
+        _counted.clear()
 
     log.info("📁OGPキャッシュロード完了")
     return
 
 
-def save_cache():
-    with open(config.FILE_NAMES.CACHE_OGP_PATH, "w", encoding="utf-8") as f:
-        json.dump(linkcard.ogp_cache, f, ensure_ascii=False, indent=2)
-    with open(config.FILE_NAMES.CACHE_TWITTER_PATH, "w", encoding="utf-8") as f:
-        json.dump(linkcard.oembed_cache, f, ensure_ascii=False, indent=2)
-    log.info("📝OGPキャッシュセーブ完了")
+def save_cache(referenced_urls: Iterable[str] = ()):
+    """
+    本文から参照された URL の last_used を更新し、長く参照されていないエントリーを消してから、
+    変更のあったキャッシュだけを書く。
+    """
+    referenced_urls = set(referenced_urls)
+    today = datetime.now(UTC).date()
+    evicted = 0
+    written = False
+    for store in (linkcard.ogp_cache, linkcard.oembed_cache):
+        store.touch(referenced_urls, today)
+        evicted += store.evict(today, timedelta(seconds=config.LINKCARD_EVICT_AFTER))
+        written = store.save() or written
+    if evicted:
+        log.info(f"🧹 使われなくなったリンクカードを削除: {evicted}件")
+    if written:
+        log.info("📝OGPキャッシュセーブ完了")
+    log.info(
+        f"📊 リンクカード: ヒット {counters[HIT] + counters[STALE]}"
+        f" / ミス {counters[MISS]}（うち取得失敗 {counters['failed']}）"
+        f" / 取得失敗を記憶 {counters[NEGATIVE]}"
+        f" / 取り直し {counters['refreshed']}"
+    )
+
+
+def lookup(
+    cache: MutableMapping[str, dict], url: str, now: datetime | None = None
+) -> tuple[str, dict | None]:
+    """
+    キャッシュを引き、(状態, データ) を返す。データは HIT / STALE のときだけ。
+    失敗したエントリーは、再試行の時刻を過ぎていれば MISS（取得し直す）。
+    """
+    now = now or datetime.now(UTC)
+    entry = cache.get(url)
+    if entry is None:
+        state = MISS
+    elif entry.get("status") == STATUS_ERROR:
+        state = MISS if now >= _retry_at(entry) else NEGATIVE
+    elif _is_stale(entry, now):
+        state = STALE
+    else:
+        state = HIT
+
+    with _lock:
+        if url not in _counted:
+            _counted.add(url)
+            counters[state] += 1
+    return state, entry if state in (HIT, STALE) else None
+
+
+def fetch(
+    cache: MutableMapping[str, dict],
+    url: str,
+    fetch_data: Callable[[str], dict | None],
+    now: datetime | None = None,
+) -> dict | None:
+    """取得してキャッシュに記録する。失敗すれば None。取得の間はロックを持たない。"""
+    return record(cache, url, fetch_data(url), now)
+
+
+def record(
+    cache: MutableMapping[str, dict],
+    url: str,
+    data: dict | None,
+    now: datetime | None = None,
+) -> dict | None:
+    """
+    取得結果をキャッシュに記録し、使えるエントリーを返す。
+    失敗は、続けて失敗するほど再試行までの間隔を延ばして記録する。
+    取り直しに失敗した場合は、前のデータをそのまま使う。
+    """
+    now = now or datetime.now(UTC)
+    with _lock:
+        return _record(cache, url, data, now)
+
+
+def count(name: str) -> None:
+    """counters[name] を1増やす。"""
+    with _lock:
+        counters[name] += 1
+
+
+def _record(
+    cache: MutableMapping[str, dict], url: str, data: dict | None, now: datetime
+) -> dict | None:
+    previous = cache.get(url)
+    if data:
+        cache[url] = {**data, "status": STATUS_OK, "fetched_at": now.isoformat()}
+        return cache[url]
+    counters["failed"] += 1
+    if previous is not None and previous.get("status") != STATUS_ERROR:
+        return previous
+
+    failures = (previous or {}).get("failures", 0) + 1
+    ttl = min(
+        config.LINKCARD_RETRY_INTERVAL * 2 ** (failures - 1),
+        config.LINKCARD_RETRY_MAX_INTERVAL,
+    )
+    cache[url] = {
+        "status": STATUS_ERROR,
+        "fetched_at": now.isoformat(),
+        "failures": failures,
+        "ttl": ttl,
+    }
+    return None
+
+
+def _retry_at(entry: dict) -> datetime:
+    fetched_at = _parse_time(entry.get("fetched_at"))
+    if fetched_at is None:
+        return datetime.min.replace(tzinfo=UTC)
+    return fetched_at + timedelta(seconds=entry.get("ttl", 0))
+
+
+def _is_stale(entry: dict, now: datetime) -> bool:
+    if config.LINKCARD_REFRESH_INTERVAL is None:
+        return False
+    fetched_at = _parse_time(entry.get("fetched_at"))
+    return fetched_at is None or now - fetched_at >= timedelta(
+        seconds=config.LINKCARD_REFRESH_INTERVAL
+    )
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
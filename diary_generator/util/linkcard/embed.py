@@ -1,12 +1,45 @@
 import re
+from functools import lru_cache
 
-import requests
-
+from diary_generator.config.configuration import config
+from diary_generator.config.oembed import OEmbedProvider
 from diary_generator.logger import logger
 from diary_generator.util import linkcard
+from diary_generator.util.linkcard import cache, http
 
 log = logger.get_logger()
 
+# その場で iframe を作る動画（oEmbed は使わない）
+YOUTUBE_URL_PATTERN = r"https?://(?:[\w-]+\.)*(?:youtube\.com|youtu\.be)/"
+NICONICO_URL_PATTERN = r"https?://(?:[\w-]+\.)*nicovideo\.jp/"
+
+
+def render(url: str) -> str | None:
+    """埋め込みにする URL なら HTML を返す。リンクカード（OGP）にする URL なら None。"""
+    matched = match(url)
+    if matched is None:
+        return None
+    kind, provider = matched
+    if kind == "youtube":
+        return youtube(url)
+    elif kind == "niconico":
+        return niconico(url)
+    return oembed(url, provider)
+
+
+def match(url: str) -> tuple[str, OEmbedProvider | None] | None:
+    """
+    URL を1つの正規表現で振り分け、("youtube" / "niconico" / "oembed", oEmbed の提供元) を返す。
+    埋め込まない URL は None。
+    """
+    pattern, providers = _dispatcher(config.OEMBED.PROVIDERS)
+    matched = pattern.match(url)
+    if matched is None:
+        return None
+    if matched.lastgroup in ("youtube", "niconico"):
+        return matched.lastgroup, None
+    return "oembed", providers[int(matched.lastgroup.removeprefix("provider_"))]
+
 
 def youtube(url: str):
     youtube_id_match = re.search(r"(?:v=|youtu.be/)([\w\-]+)", url)
@@ -42,80 +75,56 @@ def niconico(url: str):
     """
 
 
-def twitter(url: str):
-    if url in linkcard.oembed_cache:
-        log.debug(f"✅ ツイートキャッシュヒット: {url}")
-        return linkcard.oembed_cache.get(url).get(
-            "html", f'<a href="{url}" target="_blank">{url}</a>'
+def oembed(url: str, provider: OEmbedProvider):
+    state, oembed_data = cache.lookup(linkcard.oembed_cache, url)
+    if state in (cache.HIT, cache.STALE):
+        log.debug(f"✅ {provider.NAME}キャッシュヒット: {url}")
+    elif state == cache.MISS:
+        oembed_data = cache.fetch(
+            linkcard.oembed_cache, url, lambda url: fetch_oembed(url, provider)
         )
 
-    oembed_url = f"https://publish.twitter.com/oembed?url={url}"
-    try:
-        response = requests.get(oembed_url, timeout=5)
-
-        if response.status_code != 200:
-            return f'<a href="{url}" target="_blank">{url}</a>'
-
-        oembed_data = response.json()
-        linkcard.oembed_cache[url] = oembed_data
-        log.info(f"✅ ツイート取得: {url}")
-        return oembed_data.get("html", f'<a href="{url}" target="_blank">{url}</a>')
-
-    except Exception as _:
-        log.warning(f"⚠️ ツイート取得失敗: {url}", exc_info=True)
-
-    return f'<a href="{url}" target="_blank">{url}</a>'
+    if oembed_data is None:
+        return f'<a href="{url}" target="_blank">{url}</a>'
+    return oembed_data.get("html", f'<a href="{url}" target="_blank">{url}</a>')
 
 
-def bluesky(url: str):
-    if url in linkcard.oembed_cache:
-        log.debug(f"✅ ポストキャッシュヒット: {url}")
-        return linkcard.oembed_cache.get(url).get(
-            "html", f'<a href="{url}" target="_blank">{url}</a>'
-        )
-
-    oembed_url = f"https://embed.bsky.app/oembed?url={url}"
+def fetch_oembed(url: str, provider: OEmbedProvider) -> dict | None:
+    """
+    oEmbed を取得する。失敗すれば None（キャッシュへの記録は呼び出し側で cache.record する）。
+    """
     try:
-        response = requests.get(oembed_url, timeout=5)
-
-        if response.status_code != 200:
-            return f'<a href="{url}" target="_blank">{url}</a>'
-
-        oembed_data = response.json()
-        linkcard.oembed_cache[url] = oembed_data
-        log.info(f"✅ ポスト取得: {url}")
-        return oembed_data.get("html", f'<a href="{url}" target="_blank">{url}</a>')
-
-    except Exception as _:
-        log.warning(f"⚠️ ポスト取得失敗: {url}", exc_info=True)
-
-    return f'<a href="{url}" target="_blank">{url}</a>'
-
-
-def poketedon(url: str):
-    if url in linkcard.oembed_cache:
-        log.debug(f"✅ トゥートキャッシュヒット: {url}")
-        return linkcard.oembed_cache.get(url).get(
-            "html", f'<a href="{url}" target="_blank">{url}</a>'
+        response = http.get(
+            provider.ENDPOINT,
+            params={"url": url},
+            timeout=provider.TIMEOUT,
+            limit=provider.PER_HOST_LIMIT,
         )
 
-    oembed_url = f"https://mstdn.pokete.com/api/oembed?url={url}"
-    try:
-        response = requests.get(oembed_url, timeout=5)
-
         if response.status_code != 200:
-            return f'<a href="{url}" target="_blank">{url}</a>'
+            return None
 
         oembed_data = response.json()
-        linkcard.oembed_cache[url] = oembed_data
-        log.info(f"✅ トゥート取得: {url}")
-        return oembed_data.get("html", f'<a href="{url}" target="_blank">{url}</a>')
+        log.info(f"✅ {provider.NAME}取得: {url}")
+        return oembed_data
 
     except Exception as _:
-        log.warning(f"⚠️ トゥート取得失敗: {url}", exc_info=True)
-
-    return f'<a href="{url}" target="_blank">{url}</a>'
-
-
-# TODO: https://oembed.com/providers.json みたいなのを作ったらいい
-# (そのまま読み込んでも絶対無駄が多い＆Mastodonが無いので、configあたりにお手製で作ったほうがいい)
+        log.warning(f"⚠️ {provider.NAME}取得失敗: {url}", exc_info=True)
+
+    return None
+
+
+@lru_cache
+def _dispatcher(
+    providers: tuple[OEmbedProvider, ...],
+) -> tuple[re.Pattern[str], tuple[OEmbedProvider, ...]]:
+    """動画と oEmbed の提供元の URL を、名前付きグループの選択にまとめて1つにコンパイルする。"""
+    patterns = [
+        f"(?P<youtube>{YOUTUBE_URL_PATTERN})",
+        f"(?P<niconico>{NICONICO_URL_PATTERN})",
+        *(
+            f"(?P<provider_{index}>{provider.URL_PATTERN})"
+            for index, provider in enumerate(providers)
+        ),
+    ]
+    return re.compile("|".join(patterns), re.IGNORECASE), providers
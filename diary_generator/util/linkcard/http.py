@@ -0,0 +1,69 @@
+"""
+リンクカード・埋め込みの取得に使う HTTP クライアント。
+
+プロセス内で1つのセッションを共有して接続を使い回す。
+並行して取得するときも、同じホストへの同時リクエストは config.LINKCARD_PER_HOST_LIMIT
+（oEmbed の提供元は config.OEMBED の PER_HOST_LIMIT）までにする。
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from diary_generator.config.configuration import config
+
+TIMEOUT = 5
+
+_session: requests.Session | None = None
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_lock = threading.Lock()
+
+
+def get(
+    url: str,
+    params: dict[str, str] | None = None,
+    timeout: float = TIMEOUT,
+    limit: int | None = None,
+) -> requests.Response:
+    """limit は url のホストへの同時リクエスト数（省略時は config.LINKCARD_PER_HOST_LIMIT）。"""
+    with _host_slot(urlsplit(url).hostname or "", limit):
+        return _get_session().get(url, params=params, timeout=timeout)
+
+
+@contextmanager
+def stream(url: str, timeout: float = TIMEOUT) -> Iterator[requests.Response]:
+    """本文を少しずつ読む GET。抜けるまで同じホストの枠を使い、最後に応答を閉じる。"""
+    with (
+        _host_slot(urlsplit(url).hostname or "", None),
+        _get_session().get(url, timeout=timeout, stream=True) as response,
+    ):
+        yield response
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_maxsize=max(
+                    config.LINKCARD_PER_HOST_LIMIT,
+                    *(provider.PER_HOST_LIMIT for provider in config.OEMBED.PROVIDERS),
+                )
+            )
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def _host_slot(host: str, limit: int | None) -> threading.BoundedSemaphore:
+    with _lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(
+                limit or config.LINKCARD_PER_HOST_LIMIT
+            )
+        return _host_slots[host]
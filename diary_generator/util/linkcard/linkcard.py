@@ -1,15 +1,108 @@
 import re
+from collections.abc import Callable, Iterable, MutableMapping
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
+from diary_generator.config.configuration import config
+from diary_generator.logger import logger
 from diary_generator.util import linkcard
-from diary_generator.util.linkcard import embed
+from diary_generator.util.linkcard import cache, embed
 from diary_generator.util.linkcard.ogp import fetch_data, generate_card
 
+log = logger.get_logger()
 
-def create(contents: list[str]) -> list[str]:
-    return [_sub_link_card(content) for content in contents]
+URL_PATTERN = re.compile(r'(https?://[^\s<>"\'\)\]]+)')
 
+# prefetch が裏で始めた取り直し（Future → (URL, キャッシュ)）
+_refreshes: dict[Future, tuple[str, MutableMapping[str, dict]]] = {}
 
-def _sub_link_card(text: str) -> str:
+
+def create(contents: list[str], unresolved: list[str] | None = None) -> list[str]:
+    """
+    本文中の URL をリンクカード・埋め込みに置き換える。
+    unresolved を渡すと、取得に失敗してただのリンクになった URL をそこに追加する。
+    """
+    return [_sub_link_card(content, unresolved) for content in contents]
+
+
+def prefetch(contents: Iterable[str]) -> None:
+    """
+    本文中の URL のうちキャッシュに無いものを、描画の前にまとめて並行取得してキャッシュに入れる。
+    取り直す時期を過ぎたもの（config.LINKCARD_REFRESH_INTERVAL）は、描画には今のデータを使い、
+    裏で取り直す（wait_for_refreshes で待ってキャッシュに入れる）。
+    """
+    misses: dict[
+        str, tuple[MutableMapping[str, dict], Callable[[str], dict | None]]
+    ] = {}
+    stales: dict[
+        str, tuple[MutableMapping[str, dict], Callable[[str], dict | None]]
+    ] = {}
+    for content in contents:
+        for url in find_urls(content):
+            target = _fetch_target(url)
+            if target is None:
+                continue
+            state, _ = cache.lookup(target[0], url)
+            if state == cache.MISS:
+                misses[url] = target
+            elif state == cache.STALE:
+                stales[url] = target
+    if not misses and not stales:
+        return
+
+    log.info(
+        f"🌐 リンクカードを並行取得します: {len(misses)}件（取り直し {len(stales)}件）"
+    )
+    executor = ThreadPoolExecutor(max_workers=config.LINKCARD_FETCH_WORKERS)
+    futures = {
+        executor.submit(fetch, url): (url, store)
+        for url, (store, fetch) in misses.items()
+    }
+    _refreshes.update(
+        {
+            executor.submit(fetch, url): (url, store)
+            for url, (store, fetch) in stales.items()
+        }
+    )
+    executor.shutdown(wait=False)
+    for future in as_completed(futures):
+        url, store = futures[future]
+        cache.record(store, url, future.result())
+
+
+def wait_for_refreshes() -> None:
+    """prefetch が裏で始めた取り直しを待ち、取れたものをキャッシュに入れる。"""
+    for future, (url, store) in _refreshes.items():
+        data = future.result()
+        cache.record(store, url, data)
+        if data:
+            cache.count("refreshed")
+    _refreshes.clear()
+
+
+def find_urls(text: str) -> list[str]:
+    """リンクカード・埋め込みに置き換える URL（HTML タグの外に書かれたもの）。"""
+    preserved_text, _ = _preserve_html(text)
+    return URL_PATTERN.findall(preserved_text)
+
+
+def _sub_link_card(text: str, unresolved: list[str] | None = None) -> str:
+    preserved_text, preserved_html = _preserve_html(text)
+
+    def replace_url(match):
+        url = match.group(0)
+        replaced = _replace_url(url)
+        if unresolved is not None and replaced == _plain_link(url):
+            unresolved.append(url)
+        return replaced
+
+    rendered = URL_PATTERN.sub(replace_url, preserved_text)
+    for index, html in enumerate(preserved_html):
+        rendered = rendered.replace(f"<!--DIARY_GENERATOR_HTML_{index}-->", html)
+    return rendered
+
+
+def _preserve_html(text: str) -> tuple[str, list[str]]:
+    """HTML タグ（とリンク）をプレースホルダーに置き換え、中の URL を変換しないようにする。"""
     preserved_html: list[str] = []
 
     def preserve_html(match):
@@ -22,34 +115,38 @@ def _sub_link_card(text: str) -> str:
         text,
         flags=re.IGNORECASE | re.DOTALL,
     )
-    url_pattern = re.compile(r'(https?://[^\s<>"\'\)\]]+)')
+    return preserved_text, preserved_html
 
-    def replace_url(match):
-        url = match.group(0)
-        if "youtube.com" in url or "youtu.be" in url:
-            return embed.youtube(url)
-        elif "nicovideo.jp" in url:
-            return embed.niconico(url)
-        elif "twitter.com" in url:
-            return embed.twitter(url)
-        elif "x.com" in url:
-            return embed.twitter(url)
-        elif "bsky.app" in url:
-            return embed.bluesky(url)
-        elif "mstdn.pokete.com" in url:
-            return embed.poketedon(url)
-        else:
-            if url in linkcard.ogp_cache:
-                return generate_card(url, linkcard.ogp_cache[url])
-            else:
-                ogp_data = fetch_data(url)
-                if ogp_data:
-                    linkcard.ogp_cache[url] = ogp_data
-                    return generate_card(url, ogp_data)
-                else:
-                    return f'<a href="{url}" target="_blank">{url}</a>'
-
-    rendered = url_pattern.sub(replace_url, preserved_text)
-    for index, html in enumerate(preserved_html):
-        rendered = rendered.replace(f"<!--DIARY_GENERATOR_HTML_{index}-->", html)
-    return rendered
+
+def _replace_url(url: str) -> str:
+    embedded = embed.render(url)
+    if embedded is not None:
+        return embedded
+
+    state, ogp_data = cache.lookup(linkcard.ogp_cache, url)
+    if state == cache.MISS:
+        ogp_data = cache.fetch(linkcard.ogp_cache, url, fetch_data)
+    if ogp_data:
+        return generate_card(url, ogp_data)
+    else:
+        return _plain_link(url)
+
+
+def _fetch_target(
+    url: str,
+) -> tuple[MutableMapping[str, dict], Callable[[str], dict | None]] | None:
+    """
+    URL の取得結果を入れるキャッシュと取得関数（_replace_url と同じ振り分け）。
+    取得の要らない URL（動画の埋め込み）は None。
+    """
+    matched = embed.match(url)
+    if matched is None:
+        return linkcard.ogp_cache, fetch_data
+    _, provider = matched
+    if provider is None:
+        return None
+    return linkcard.oembed_cache, lambda url: embed.fetch_oembed(url, provider)
+
+
+def _plain_link(url: str) -> str:
+    return f'<a href="{url}" target="_blank">{url}</a>'
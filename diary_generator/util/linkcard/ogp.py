@@ -1,11 +1,30 @@
-import requests
-from bs4 import BeautifulSoup
+import codecs
+import re
+from collections.abc import Iterable
+from html.parser import HTMLParser
 
 from diary_generator.config.configuration import config
 from diary_generator.logger import logger
+from diary_generator.util.linkcard import http
 
 log = logger.get_logger()
 
+# <head> を探すのにこれより多くは読まない
+MAX_HEAD_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+OGP_PROPERTIES = {"og:title", "og:description", "og:image"}
+META_CHARSET_PATTERN = re.compile(
+    rb"<meta[^>]+charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE
+)
+# ブラウザと同じく、Shift_JIS は Windows の拡張（機種依存文字）を含めて読む
+ENCODING_ALIASES = {
+    "shift_jis": "cp932",
+    "shift-jis": "cp932",
+    "sjis": "cp932",
+    "x-sjis": "cp932",
+    "windows-31j": "cp932",
+}
+
 
 def generate_card(url: str, ogp_data: dict) -> str:
     image_html = f'<img src="{ogp_data["image"]}" alt="">' if ogp_data["image"] else ""
@@ -32,32 +51,121 @@ def generate_card(url: str, ogp_data: dict) -> str:
 def fetch_data(url: str) -> dict | None:
     """
     指定URLからOGP情報（タイトル, 説明, 画像URL）を取得
+    本文は </head> まで（最大 MAX_HEAD_BYTES）しか読まない
     """
     try:
-        response = requests.get(url, timeout=5)
+        with http.stream(url) as response:
+            if response.status_code != 200:
+                return None
 
-        if response.status_code != 200:
-            return None
+            ogp = extract(
+                response.iter_content(chunk_size=CHUNK_SIZE),
+                response.headers.get("Content-Type"),
+            )
+        log.info(f"✅ OGP取得成功: {url}")
 
-        # 文字コード推測
-        response.encoding = response.apparent_encoding
+        return ogp
+    except Exception as e:
+        log.info(f"⚠️ OGP取得失敗: {url} - {e}")
+        return None
 
-        soup = BeautifulSoup(response.text, "html.parser")
 
-        ogp = {
-            "title": soup.find("meta", property="og:title") or soup.find("title"),
-            "description": soup.find("meta", property="og:description"),
-            "image": soup.find("meta", property="og:image"),
-        }
-        log.info(f"✅ OGP取得成功: {url}")
+def extract(chunks: Iterable[bytes], content_type: str | None = None) -> dict:
+    """
+    HTML を先頭から読み、<head> の OGP（無ければ <title>）を取り出す。
+    </head> か <body> が来るか、MAX_HEAD_BYTES を読んだところで止める。
+    文字コードは Content-Type、無ければ先頭の BOM・<meta charset> から決める（どれも無ければ UTF-8）。
+    """
+    parser = _OgpParser()
+    charset = _charset_from_content_type(content_type)
+    decoder = None
+    buffered = b""
+    read = 0
+    for chunk in chunks:
+        read += len(chunk)
+        if decoder is None:
+            # <meta charset> は先頭 1024 バイト以内に書く決まり
+            buffered += chunk
+            if charset is None and len(buffered) < 1024 and read < MAX_HEAD_BYTES:
+                continue
+            decoder = _decoder(charset or _charset_from_prefix(buffered))
+            chunk, buffered = buffered, b""
+        parser.feed(decoder.decode(chunk))
+        if parser.done or read >= MAX_HEAD_BYTES:
+            break
+
+    if decoder is None:
+        decoder = _decoder(charset or _charset_from_prefix(buffered))
+        parser.feed(decoder.decode(buffered))
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser.result()
+
+
+class _OgpParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self._meta: dict[str, str] = {}
+        self._title: str | None = None
+        self._title_parts: list[str] | None = None
 
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "meta":
+            attributes = dict(attrs)
+            key = attributes.get("property") or attributes.get("name")
+            if key in OGP_PROPERTIES and key not in self._meta:
+                self._meta[key] = attributes.get("content") or ""
+        elif tag == "title" and self._title is None:
+            self._title_parts = []
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._title_parts is not None:
+            self._title = "".join(self._title_parts)
+            self._title_parts = None
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def result(self) -> dict:
+        title = self._meta.get("og:title")
+        if title is None:
+            title = (
+                self._title
+                if self._title is not None
+                else "".join(self._title_parts or [])
+            )
         return {
-            "title": ogp["title"]["content"]
-            if ogp["title"] and ogp["title"].has_attr("content")
-            else (ogp["title"].text if ogp["title"] else ""),
-            "description": ogp["description"]["content"] if ogp["description"] else "",
-            "image": ogp["image"]["content"] if ogp["image"] else "",
+            "title": title,
+            "description": self._meta.get("og:description", ""),
+            "image": self._meta.get("og:image", ""),
         }
-    except Exception as e:
-        log.info(f"⚠️ OGP取得失敗: {url} - {e}")
+
+
+def _charset_from_content_type(content_type: str | None) -> str | None:
+    if not content_type:
         return None
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def _charset_from_prefix(prefix: bytes) -> str:
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = META_CHARSET_PATTERN.search(prefix[:1024])
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def _decoder(charset: str) -> codecs.IncrementalDecoder:
+    charset = ENCODING_ALIASES.get(charset.lower(), charset)
+    try:
+        return codecs.getincrementaldecoder(charset)(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
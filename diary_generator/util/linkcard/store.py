@@ -0,0 +1,82 @@
+"""
+リンクカード・埋め込みのキャッシュファイル（URL → エントリー）。
+
+変更があったときだけ書き、書くときは一時ファイルから置き換える（codec.dump）。
+符号化と拡張子は config.CACHE_CODEC（json / gzip / zstd / pickle）に従い、読むときは中身から判別する。
+本文から参照された日を各エントリーの last_used に持ち、参照されなくなって
+config.LINKCARD_EVICT_AFTER 経ったエントリーを消す。
+"""
+
+from collections.abc import Iterable, Iterator, MutableMapping
+from datetime import date, timedelta
+
+from diary_generator.logger import logger
+from diary_generator.util import codec
+
+log = logger.get_logger()
+
+
+class LinkCardStore(MutableMapping[str, dict]):
+    def __init__(self, path: str):
+        self._path = path
+        self._entries: dict[str, dict] = {}
+        self._dirty = False
+        found = codec.find_cache(path)
+        if found:
+            try:
+                self._entries = codec.load(found)
+            except Exception as e:  # noqa: BLE001
+                log.warning(
+                    f"⚠️ リンクカードキャッシュ読み込み失敗のため作り直します: {e}"
+                )
+
+    def __getitem__(self, url: str) -> dict:
+        return self._entries[url]
+
+    def __setitem__(self, url: str, entry: dict) -> None:
+        previous = self._entries.get(url)
+        if previous is not None and "last_used" in previous:
+            entry = {**entry, "last_used": previous["last_used"]}
+        self._entries[url] = entry
+        self._dirty = True
+
+    def __delitem__(self, url: str) -> None:
+        del self._entries[url]
+        self._dirty = True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def touch(self, urls: Iterable[str], today: date) -> None:
+        """本文から参照された URL の last_used を今日にする（日付が変わったときだけ書き換わる）。"""
+        used = today.isoformat()
+        for url in urls:
+            entry = self._entries.get(url)
+            if entry is not None and entry.get("last_used") != used:
+                entry["last_used"] = used
+                self._dirty = True
+
+    def evict(self, today: date, max_age: timedelta) -> int:
+        """last_used が max_age より古い（無いものは今日を last_used にする）エントリーを消す。"""
+        threshold = (today - max_age).isoformat()
+        evicted = 0
+        for url, entry in list(self._entries.items()):
+            if "last_used" not in entry:
+                entry["last_used"] = today.isoformat()
+                self._dirty = True
+            elif entry["last_used"] < threshold:
+                del self._entries[url]
+                self._dirty = True
+                evicted += 1
+        return evicted
+
+    def save(self) -> bool:
+        """変更があれば書く。書いたら True。"""
+        if not self._dirty:
+            return False
+        codec.dump_cache(self._entries, self._path)
+        self._dirty = False
+        return True
@@ -0,0 +1,56 @@
+"""
+キャッシュの codec ごとのファイルサイズと書き込み・読み込み時間を測るベンチマーク（手動実行用）
+比較のため、従来の整形 JSON（detail は indent=4）も測る。
+
+使用方法:
+    uv run -m scripts.bench_cache_codec --pages 2000
+"""
+
+import argparse
+import json
+
+from diary_generator.logger import logger
+from diary_generator.util import codec
+from scripts.bench_cache_load import _best_of, _synthetic_pair
+
+log = logger.get_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=2000, help="日記ページ数")
+    parser.add_argument("--topics", type=int, default=5, help="1ページのトピック数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    detail = _synthetic_pair(args.pages, args.topics).detail
+    candidates = {
+        "indent=4": lambda: json.dumps(detail, ensure_ascii=False, indent=4).encode(
+            "utf-8"
+        ),
+        **{
+            name: (lambda name=name: codec.encode(detail, name))
+            for name in codec.available_codecs()
+        },
+    }
+
+    log.info("📊 %d ページの detail cache", args.pages)
+    for name, encode in candidates.items():
+        raw = encode()
+        store = _best_of(args.repeat, encode)
+        # pickle は codec を明示しないと読まない
+        codec_name = name if name in codec.CODECS else "json"
+        load = _best_of(
+            args.repeat, lambda raw=raw, name=codec_name: codec.decode(raw, name)
+        )
+        log.info(
+            "📊 %-8s: %7.2f MB / 書き込み %.3f 秒 / 読み込み %.3f 秒",
+            name,
+            len(raw) / 1024 / 1024,
+            store,
+            load,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+日記キャッシュの読み書きの時間をキャッシュサイズごとに測るベンチマーク（手動実行用）
+従来の単一ファイル（妥当性確認で1回、本読み込みで1回の計2回パース／毎回全体を書き直し）と
+CacheStore（1回パース／変わった月のシャードだけ書き直し）を比べる。
+
+使用方法:
+    uv run -m scripts.bench_cache_load --pages 500,2000,5000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from diary_generator.contents import CACHE_SCHEMA_VERSION
+from diary_generator.diary_cache import CacheStore, DiaryCachePair
+from diary_generator.logger import logger
+
+log = logger.get_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--pages", default="500,2000,5000", help="日記ページ数（カンマ区切り）"
+    )
+    parser.add_argument("--topics", type=int, default=5, help="1ページのトピック数")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = CacheStore(
+            index_path=os.path.join(tmp_dir, "diary_index.json"),
+            detail_path=os.path.join(tmp_dir, "diary_detail.json"),
+            manifest_path=os.path.join(tmp_dir, "diary_cache.manifest.json"),
+            schema_version=CACHE_SCHEMA_VERSION,
+        )
+        legacy_paths = (
+            os.path.join(tmp_dir, "legacy_index.json"),
+            os.path.join(tmp_dir, "legacy_detail.json"),
+        )
+        for pages in [int(value) for value in args.pages.split(",")]:
+            pair = _synthetic_pair(pages, args.topics)
+            legacy_save = _best_of(
+                args.repeat, lambda pair=pair: _legacy_save(legacy_paths, pair)
+            )
+            legacy_load = _best_of(args.repeat, lambda: _legacy_load(legacy_paths))
+
+            store.save(pair)
+            # 最新の1ページだけ編集した状態を保存する（通常の日次更新）
+            edited = _edit_latest_entry(pair)
+            store_save = (
+                _best_of(
+                    args.repeat,
+                    lambda pair=pair, edited=edited: (
+                        store.save(pair),
+                        store.save(edited),
+                    ),
+                )
+                / 2
+            )
+            store_load = _best_of(args.repeat, store.load)
+
+            size = os.path.getsize(legacy_paths[1])
+            log.info(
+                "📊 %5d ページ（detail %.1f MB）: 読み込み 従来 %.3f 秒 / CacheStore %.3f 秒"
+                "  書き込み 従来 %.3f 秒 / CacheStore %.3f 秒",
+                pages,
+                size / 1024 / 1024,
+                legacy_load,
+                store_load,
+                legacy_save,
+                store_save,
+            )
+
+
+def _legacy_save(paths, pair):
+    for path, content in zip(paths, (pair.index, pair.detail)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(content, f, ensure_ascii=False, indent=4)
+
+
+def _legacy_load(paths):
+    for _ in range(2):
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                json.load(f)
+
+
+def _edit_latest_entry(pair):
+    entries = list(pair.detail["entries"])
+    entries[0] = {**entries[0], "last_edited_time": "2026-01-02T00:00:00.000Z"}
+    return DiaryCachePair(index=pair.index, detail={**pair.detail, "entries": entries})
+
+
+def _best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def _synthetic_pair(pages, topics_per_page):
+    index_entries = []
+    detail_entries = []
+    for n in range(pages):
+        page_id = f"page-{n:05d}"
+        entry_date = (date(2026, 1, 1) - timedelta(days=n)).isoformat()
+        index_entries.append(
+            {
+                "page_id": page_id,
+                "page_name": entry_date.replace("-", ""),
+                "entry_date": entry_date,
+                "index_direction": "index",
+                "last_edited_time": "2026-01-01T00:00:00.000Z",
+                "source_last_edited_time": "2026-01-01T00:00:00.000Z",
+            }
+        )
+        detail_entries.append(
+            {
+                "page_id": page_id,
+                "page_name": entry_date.replace("-", ""),
+                "entry_date": entry_date,
+                "last_edited_time": "2026-01-01T00:00:00.000Z",
+                "has_pending_topics": False,
+                "topics": [
+                    _synthetic_topic(page_id, t) for t in range(topics_per_page)
+                ],
+            }
+        )
+    return DiaryCachePair(
+        index={
+            "schema_version": CACHE_SCHEMA_VERSION,
+            "generated_at": "2026-01-01T00:00:00+09:00",
+            "entries": index_entries,
+        },
+        detail={
+            "schema_version": CACHE_SCHEMA_VERSION,
+            "generated_at": "2026-01-01T00:00:00+09:00",
+            "entries": detail_entries,
+        },
+    )
+
+
+def _synthetic_topic(page_id, t):
+    text = "今日は技術書を読んで、少しだけコードを書いた。" * 3
+    block = {
+        "block_id": f"{page_id}-b{t}",
+        "type": "paragraph",
+        "plain_text": text,
+        "rich_text": [
+            {
+                "type": "text",
+                "text": text,
+                "href": None,
+                "annotations": {
+                    "bold": False,
+                    "italic": False,
+                    "strikethrough": False,
+                    "underline": False,
+                    "code": False,
+                    "color": "default",
+                },
+            }
+        ],
+    }
+    return {
+        "topic_id": f"{page_id}-t{t}",
+        "title": f"話題{t}",
+        "last_edited_time": "2026-01-01T00:00:00.000Z",
+        "tags": ["日記"],
+        "blocks": [block, {**block, "block_id": f"{page_id}-b{t}-2"}],
+        "plain_text": text,
+    }
+
+
+if __name__ == "__main__":
+    main()
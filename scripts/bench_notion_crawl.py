@@ -0,0 +1,130 @@
+"""
+偽の Notion API（diary_generator.notion_api.fake）に対して日記の取得処理を走らせ、
+並行数ごとのスループットを測るベンチマーク（手動実行用）
+
+使用方法:
+    uv run -m scripts.bench_notion_crawl --pages 200 --latency 0.15 --concurrency 1,2,4,8
+"""
+
+import argparse
+import time
+from dataclasses import replace
+from datetime import UTC, datetime
+
+from diary_generator import contents, notion_api
+from diary_generator.config.configuration import config
+from diary_generator.logger import logger
+from diary_generator.notion_api.fake import (
+    DATABASE_ID,
+    FakeNotionAdapter,
+    FakeNotionWorkspace,
+    FakeWorkspaceShape,
+)
+
+log = logger.get_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100, help="日記ページ数")
+    parser.add_argument("--topics", type=int, default=5, help="1ページのトピック数")
+    parser.add_argument("--depth", type=int, default=2, help="リストのネストの深さ")
+    parser.add_argument("--fanout", type=int, default=2, help="1ブロックの子の数")
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="1リクエストの応答遅延（秒）"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="429 / 5xx を返す割合"
+    )
+    parser.add_argument(
+        "--concurrency",
+        default="1,2,4,8",
+        help="試すページ並行数（カンマ区切り）",
+    )
+    parser.add_argument(
+        "--block-concurrency", type=int, default=None, help="子ブロックの並行数"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=config.NOTION_API.RATE_LIMIT_PER_SEC,
+        help="1秒あたりのリクエスト数の上限",
+    )
+    parser.add_argument(
+        "--backoff-base", type=float, default=0.1, help="5xx 再試行の待機の基準（秒）"
+    )
+    args = parser.parse_args()
+
+    workspace = FakeNotionWorkspace(
+        FakeWorkspaceShape(
+            pages=args.pages,
+            topics_per_page=args.topics,
+            nesting_depth=args.depth,
+            children_per_block=args.fanout,
+        )
+    )
+    object.__setattr__(config.ENV, "NOTION_DATABASE_ID", DATABASE_ID)
+    original_api_config = config.NOTION_API
+
+    log.info(
+        "🚀 ベンチマーク開始: %d ページ / 遅延 %.2f 秒 / 障害率 %.0f%% / 上限 %.1f req/s",
+        args.pages,
+        args.latency,
+        args.error_rate * 100,
+        args.rate_limit,
+    )
+    try:
+        for concurrency in [int(value) for value in args.concurrency.split(",")]:
+            _run_once(workspace, args, concurrency, original_api_config)
+    finally:
+        object.__setattr__(config, "NOTION_API", original_api_config)
+        notion_api.reset_client()
+
+
+def _run_once(workspace, args, concurrency, original_api_config):
+    object.__setattr__(
+        config,
+        "NOTION_API",
+        replace(
+            original_api_config,
+            PAGE_FETCH_CONCURRENCY=concurrency,
+            BLOCK_FETCH_CONCURRENCY=args.block_concurrency or concurrency,
+            RATE_LIMIT_PER_SEC=args.rate_limit,
+            RATE_LIMIT_BURST=max(int(args.rate_limit), 1),
+            BACKOFF_BASE=args.backoff_base,
+        ),
+    )
+    notion_api.reset_client()
+    adapter = FakeNotionAdapter(
+        workspace, latency=args.latency, error_rate=args.error_rate
+    )
+    client = notion_api.get_client()
+    client.session.mount("https://", adapter)
+
+    now = datetime.now(UTC)
+    started = time.perf_counter()
+    index = contents._sync_diary_index(None, now)
+    detail_entries = contents._build_detail_entries(
+        index_entries=index["entries"],
+        old_index_cache=None,
+        old_detail_cache=None,
+        now=now,
+    )
+    elapsed = time.perf_counter() - started
+
+    stats = client.stats
+    log.info(
+        "📊 並行数 %2d: %6.2f 秒 / %6.1f ページ/秒 / %5d リクエスト（%.1f req/s）"
+        " 注入障害 %d / 再試行 %d",
+        concurrency,
+        elapsed,
+        len(detail_entries) / elapsed,
+        stats.requests,
+        stats.requests / elapsed,
+        adapter.errors,
+        stats.retried,
+    )
+
+
+if __name__ == "__main__":
+    main()
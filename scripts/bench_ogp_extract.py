@@ -0,0 +1,97 @@
+"""
+OGP の取り出しにかかる時間を、従来の方法（本文を全部読み、文字コードを推測して
+BeautifulSoup でパース）と </head> までしか読まない ogp.extract で比べるベンチマーク（手動実行用）
+ネットワークは使わず、大きな本文を持つ HTML を作って測る。
+
+使用方法:
+    uv run -m scripts.bench_ogp_extract --body-kb 2048
+"""
+
+import argparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from diary_generator.logger import logger
+from diary_generator.util.linkcard import ogp
+from scripts.bench_cache_load import _best_of
+
+log = logger.get_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--body-kb", type=int, default=2048, help="本文の大きさ（KB）")
+    parser.add_argument("--repeat", type=int, default=5, help="計測の繰り返し回数")
+    args = parser.parse_args()
+
+    for encoding in ("utf-8", "shift_jis"):
+        page = _synthetic_page(args.body_kb, encoding)
+        content_type = "text/html"  # charset なし（<meta charset> から決める）
+        expected = _extract_with_beautifulsoup(page)
+        actual = ogp.extract(_chunks(page), content_type)
+        if actual != expected:
+            log.warning("⚠️ 結果が一致しません: %s / %s", expected, actual)
+
+        before = _best_of(
+            args.repeat, lambda page=page: _extract_with_beautifulsoup(page)
+        )
+        after = _best_of(
+            args.repeat,
+            lambda page=page, content_type=content_type: ogp.extract(
+                _chunks(page), content_type
+            ),
+        )
+        log.info(
+            "📊 %-9s %6.0f KB: 従来 %.3f 秒 / ogp.extract %.4f 秒（%.0f 倍）",
+            encoding,
+            len(page) / 1024,
+            before,
+            after,
+            before / after,
+        )
+
+
+def _synthetic_page(body_kb: int, encoding: str) -> bytes:
+    head = (
+        "<!DOCTYPE html><html><head>"
+        f'<meta charset="{encoding}">'
+        "<title>日記のページ</title>"
+        '<meta property="og:title" content="今日の日記 &amp; 散歩">'
+        '<meta property="og:description" content="公園まで歩いた。桜が咲いていた。">'
+        '<meta property="og:image" content="https://example.com/ogp.png">'
+        + '<link rel="stylesheet" href="/style.css">' * 20
+        + "<script>var x = '<body>';</script>" * 20
+        + "</head>"
+    )
+    paragraph = "<p>公園まで歩いた。<a href='https://example.com/'>リンク</a></p>"
+    body = paragraph * (body_kb * 1024 // len(paragraph.encode(encoding)))
+    return f"{head}<body>{body}</body></html>".encode(encoding)
+
+
+def _chunks(page: bytes):
+    for start in range(0, len(page), ogp.CHUNK_SIZE):
+        yield page[start : start + ogp.CHUNK_SIZE]
+
+
+def _extract_with_beautifulsoup(page: bytes) -> dict:
+    """変更前の ogp.fetch_data と同じ処理（取得部分を除く）。"""
+    response = requests.Response()
+    response._content = page
+    response.encoding = response.apparent_encoding
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    title = soup.find("meta", property="og:title") or soup.find("title")
+    description = soup.find("meta", property="og:description")
+    image = soup.find("meta", property="og:image")
+    return {
+        "title": title["content"]
+        if title and title.has_attr("content")
+        else (title.text if title else ""),
+        "description": description["content"] if description else "",
+        "image": image["content"] if image else "",
+    }
+
+
+if __name__ == "__main__":
+    main()
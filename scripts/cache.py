@@ -0,0 +1,65 @@
+"""
+日記キャッシュの検査と修復（手動実行用）
+
+verify: マニフェストのチェックサムで各シャード・各ページを確かめる（Notion には問い合わせない）
+repair: 読めるページはそのまま使い、壊れた・欠けたページだけを Notion から取得し直して書き直す
+
+使用方法:
+    uv run -m scripts.cache verify
+    uv run -m scripts.cache repair
+"""
+
+import argparse
+import sys
+
+from diary_generator import contents
+from diary_generator.logger import logger
+
+log = logger.get_logger()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=("verify", "repair"))
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        return verify()
+    return repair()
+
+
+def verify() -> int:
+    result = contents.verify_cache()
+    if result is None:
+        log.error(
+            "❌ 検査できるキャッシュがありません（未作成・古い形式・古いスキーマ）"
+        )
+        return 1
+    if result.ok:
+        log.info("✅ キャッシュに問題はありません")
+        return 0
+    if not result.index_ok:
+        log.warning("⚠️ index cache が壊れています")
+    if result.damaged_shards:
+        log.warning("⚠️ 壊れたシャード: %s", ", ".join(result.damaged_shards))
+    if result.corrupt_pages:
+        log.warning("⚠️ 読めないページ: %s", ", ".join(result.corrupt_pages))
+    if result.missing_pages:
+        log.warning("⚠️ 詳細の無いページ: %s", ", ".join(result.missing_pages))
+    log.info("💡 scripts.cache repair で壊れたページだけを取得し直せます")
+    return 1
+
+
+def repair() -> int:
+    log.info("🚀 キャッシュの修復を開始")
+    try:
+        contents.repair_cache()
+    except Exception as e:  # noqa: BLE001
+        log.error("❌ キャッシュの修復を中断しました: %s", e)
+        return 1
+    log.info("✅ キャッシュの修復完了")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
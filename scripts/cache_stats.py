@@ -0,0 +1,281 @@
+"""
+cache/ と画像・サムネイルの統計を表示する（手動実行用）
+件数・ファイルサイズ・最終更新からの経過時間・保留ページ数・リンクカードの取得済み率・
+サムネイルの作成率などを見て、シャード化・圧縮・キャッシュ破棄の判断に使う。
+
+使用方法:
+    uv run -m scripts.cache_stats
+    uv run -m scripts.cache_stats --json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any
+
+from diary_generator import contents
+from diary_generator.config.configuration import config as current_config
+from diary_generator.logger import logger
+from diary_generator.util import codec
+from diary_generator.util.linkcard import embed, linkcard
+
+log = logger.get_logger()
+
+THUMBNAIL_SIZES = ("small", "medium", "large")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json", action="store_true", help="JSON で標準出力に書く")
+    args = parser.parse_args()
+
+    stats = collect()
+    if args.json:
+        json.dump(stats, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        _log_stats(stats)
+    return 0
+
+
+def collect() -> dict[str, Any]:
+    file_names = current_config.FILE_NAMES
+    diary = _diary_stats()
+    ogp_cache = _load_or_empty(file_names.CACHE_OGP_PATH)
+    oembed_cache = _load_or_empty(file_names.CACHE_TWITTER_PATH)
+    return {
+        "files": _file_stats(file_names.CACHE_DIR_NAME),
+        "diary": diary,
+        "linkcards": _linkcard_stats(diary.pop("_urls", []), ogp_cache, oembed_cache),
+        "rendered_topics": {
+            "entries": len(_load_or_empty(file_names.CACHE_RENDERED_TOPICS_PATH))
+        },
+        "topic_slugs": _topic_slug_stats(file_names.CACHE_TOPIC_SLUGS_PATH),
+        "images": _image_stats(
+            file_names.OUTPUT_IMAGE_DIR_NAME, file_names.OUTPUT_THUMBNAILS_DIR_NAME
+        ),
+    }
+
+
+def _file_stats(cache_dir: str) -> list[dict[str, Any]]:
+    """cache/ 直下のファイルとディレクトリごとのサイズ・件数・経過時間。"""
+    now = time.time()
+    stats = []
+    if not os.path.isdir(cache_dir):
+        return stats
+    for name in sorted(os.listdir(cache_dir)):
+        path = os.path.join(cache_dir, name)
+        paths = (
+            [os.path.join(path, child) for child in os.listdir(path)]
+            if os.path.isdir(path)
+            else [path]
+        )
+        paths = [p for p in paths if os.path.isfile(p)]
+        mtimes = [os.path.getmtime(p) for p in paths]
+        stats.append(
+            {
+                "name": f"{name}/" if os.path.isdir(path) else name,
+                "files": len(paths),
+                "bytes": sum(os.path.getsize(p) for p in paths),
+                "age_hours": round((now - max(mtimes)) / 3600, 1) if mtimes else None,
+            }
+        )
+    return stats
+
+
+def _diary_stats() -> dict[str, Any]:
+    # 読み込みは1回だけ（load と verify で2回パースしない）
+    pair, verify_result = contents.inspect_cache()
+    if pair is None:
+        return {"available": False}
+
+    index_entries = pair.index.get("entries", [])
+    detail_entries = pair.detail.get("entries", [])
+    topics = [topic for entry in detail_entries for topic in entry.get("topics", [])]
+    edited_times = sorted(
+        entry["last_edited_time"]
+        for entry in detail_entries
+        if entry.get("last_edited_time")
+    )
+    # 生成時と同じく、描画した本文からリンクカード・埋め込みになる URL を拾う
+    urls = [
+        url
+        for topic in topics
+        for content in contents.render_blocks(topic.get("blocks", []))
+        for url in linkcard.find_urls(content)
+    ]
+    return {
+        "available": True,
+        "schema_version": pair.index.get("schema_version"),
+        "generated_at": pair.index.get("generated_at"),
+        "synced_at": pair.index.get("synced_at"),
+        "full_synced_at": pair.index.get("full_synced_at"),
+        "index_pages": len(index_entries),
+        "detail_pages": len(detail_entries),
+        "topics": len(topics),
+        "blocks": sum(1 for topic in topics for _ in _walk_blocks(topic["blocks"])),
+        "oldest_last_edited_time": edited_times[0] if edited_times else None,
+        "newest_last_edited_time": edited_times[-1] if edited_times else None,
+        "pending_pages": sum(
+            1 for entry in detail_entries if entry.get("has_pending_topics")
+        ),
+        "needs_refetch_pages": sum(
+            1 for entry in detail_entries if entry.get("needs_refetch")
+        ),
+        "verify_ok": verify_result.ok if verify_result else None,
+        "_urls": urls,
+    }
+
+
+def _walk_blocks(blocks: list[dict[str, Any]]):
+    for block in blocks:
+        yield block
+        yield from _walk_blocks(block.get("children", []))
+
+
+def _linkcard_stats(
+    urls: list[str], ogp_cache: dict[str, Any], oembed_cache: dict[str, Any]
+) -> dict[str, Any]:
+    ogp_urls = set()
+    oembed_urls = set()
+    for url in urls:
+        matched = embed.match(url)
+        if matched is None:
+            ogp_urls.add(url)
+        elif matched[1] is not None:
+            oembed_urls.add(url)
+    return {
+        "ogp": _coverage(ogp_urls, ogp_cache),
+        "oembed": _coverage(oembed_urls, oembed_cache),
+    }
+
+
+def _coverage(urls: set[str], cache: dict[str, Any]) -> dict[str, Any]:
+    """本文中の URL のうち、キャッシュ済み（次回の生成で取得しない）ものの割合。"""
+    failed = {url for url, entry in cache.items() if entry.get("status") == "error"}
+    cached = sum(1 for url in urls if url in cache and url not in failed)
+    return {
+        "entries": len(cache),
+        "failed_entries": len(failed),
+        "referenced_urls": len(urls),
+        "cached_urls": cached,
+        "coverage": round(cached / len(urls), 3) if urls else None,
+        "unreferenced_entries": len(set(cache) - urls),
+    }
+
+
+def _topic_slug_stats(path: str) -> dict[str, Any]:
+    if not codec.find_cache(path):
+        return {"available": False}
+    raw = codec.load_cache(path)
+    rules = raw if isinstance(raw, list) else raw.get("rules", [])
+    return {
+        "available": True,
+        "rules": len(rules),
+        "synced_at": raw.get("synced_at") if isinstance(raw, dict) else None,
+        "full_synced_at": raw.get("full_synced_at") if isinstance(raw, dict) else None,
+    }
+
+
+def _image_stats(images_dir: str, thumbnails_dir: str) -> dict[str, Any]:
+    images = (
+        [name for name in os.listdir(images_dir) if not name.startswith(".")]
+        if os.path.isdir(images_dir)
+        else []
+    )
+    image_ids = {os.path.splitext(name)[0] for name in images}
+    thumbnails = {}
+    for size in THUMBNAIL_SIZES:
+        size_dir = os.path.join(thumbnails_dir, size)
+        names = os.listdir(size_dir) if os.path.isdir(size_dir) else []
+        thumbnails[size] = {os.path.splitext(name)[0] for name in names}
+    complete = sum(
+        1
+        for image_id in image_ids
+        if all(image_id in ids for ids in thumbnails.values())
+    )
+    return {
+        "images": len(images),
+        "bytes": sum(
+            os.path.getsize(os.path.join(images_dir, name)) for name in images
+        ),
+        "thumbnails": {size: len(ids) for size, ids in thumbnails.items()},
+        "thumbnail_coverage": round(complete / len(image_ids), 3)
+        if image_ids
+        else None,
+    }
+
+
+def _load_or_empty(path: str) -> dict[str, Any]:
+    if not codec.find_cache(path):
+        return {}
+    try:
+        return codec.load_cache(path)
+    except Exception as e:  # noqa: BLE001
+        log.warning("⚠️ 読み込めません: %s (%s)", path, e)
+        return {}
+
+
+def _log_stats(stats: dict[str, Any]) -> None:
+    log.info("📊 cache/ のファイル")
+    for file in stats["files"]:
+        log.info(
+            "  %-32s %5d ファイル %10.1f KB  %s 時間前",
+            file["name"],
+            file["files"],
+            file["bytes"] / 1024,
+            file["age_hours"],
+        )
+
+    diary = stats["diary"]
+    if diary["available"]:
+        log.info(
+            "📊 日記: index %d / detail %d ページ、%d トピック、%d ブロック",
+            diary["index_pages"],
+            diary["detail_pages"],
+            diary["topics"],
+            diary["blocks"],
+        )
+        log.info(
+            "  最古 %s / 最新 %s の編集、保留 %d ページ、要再取得 %d ページ、検査 %s",
+            diary["oldest_last_edited_time"],
+            diary["newest_last_edited_time"],
+            diary["pending_pages"],
+            diary["needs_refetch_pages"],
+            {True: "OK", False: "NG", None: "-"}[diary["verify_ok"]],
+        )
+        log.info("  同期 %s（全件 %s）", diary["synced_at"], diary["full_synced_at"])
+    else:
+        log.info("📊 日記: キャッシュなし")
+
+    for name, label in (("ogp", "OGP"), ("oembed", "oEmbed")):
+        linkcard = stats["linkcards"][name]
+        log.info(
+            "📊 %s: %d 件（うち取得失敗 %d 件）、本文中の URL %d 件のうち取得済み %d 件、未参照 %d 件",
+            label,
+            linkcard["entries"],
+            linkcard["failed_entries"],
+            linkcard["referenced_urls"],
+            linkcard["cached_urls"],
+            linkcard["unreferenced_entries"],
+        )
+    log.info("📊 描画キャッシュ: %d トピック", stats["rendered_topics"]["entries"])
+    slugs = stats["topic_slugs"]
+    if slugs["available"]:
+        log.info(
+            "📊 トピックスラッグ: %d 件（同期 %s）", slugs["rules"], slugs["synced_at"]
+        )
+    images = stats["images"]
+    log.info(
+        "📊 画像: %d 枚（%.1f MB）、サムネイル %s、全サイズ作成済み %s",
+        images["images"],
+        images["bytes"] / 1024 / 1024,
+        images["thumbnails"],
+        images["thumbnail_coverage"],
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,10 +14,29 @@ def main():
         action="store_true",
         help="トピックスラッグキャッシュを使用する",
     )
+    parser.add_argument(
+        "--full-sync",
+        action="store_true",
+        help="日記一覧とトピックスラッグを差分ではなく全件取得し直す",
+    )
+    parser.add_argument(
+        "--cache-codec",
+        choices=("json", "gzip", "zstd", "pickle"),
+        default="json",
+        help="キャッシュファイルの符号化と拡張子（既存のファイルは形式を判定して読む。pickle は指定時のみ読む）",
+    )
+    parser.add_argument(
+        "--archive-raw-blocks",
+        action="store_true",
+        help="取得した生のブロックを保存し、スキーマ移行時に Notion から取り直さずに済むようにする",
+    )
     args = parser.parse_args()
 
     config.configuration.set_use_cache(args.use_cache)
     config.configuration.set_use_topic_slug_cache(args.use_topic_slug_cache)
+    config.configuration.set_force_full_index_sync(args.full_sync)
+    config.configuration.set_cache_codec(args.cache_codec)
+    config.configuration.set_archive_raw_blocks(args.archive_raw_blocks)
 
     try:
         generator.generate_all()
@@ -1,6 +1,8 @@
 from datetime import datetime, timezone
 from typing import Any
 
+from diary_generator import contents
+
 
 def rich_text(text: str) -> list[dict[str, Any]]:
     return [
@@ -27,7 +29,7 @@ def block(
         last_edited_time = last_edited_time.isoformat()
 
     return {
-        "id": block_id or f"{block_type}-{abs(hash((block_type, text))) & 0xffff:x}",
+        "id": block_id or f"{block_type}-{abs(hash((block_type, text))) & 0xFFFF:x}",
         "type": block_type,
         "last_edited_time": last_edited_time,
         block_type: {"rich_text": rich_text(text)},
@@ -36,3 +38,12 @@ def block(
 
 def notion_children_response(blocks: list[dict[str, Any]]) -> dict[str, Any]:
     return {"results": blocks, "has_more": False, "next_cursor": None}
+
+
+def fetch_page_topics(page_id: str, now: datetime) -> tuple[list[dict[str, Any]], bool]:
+    """fetch_detail と同じ手順でページのブロックを取得し、トピックに分ける。
+    戻り値: (topics, has_pending_topics)
+    """
+    blocks, _ = contents._fetch_page_blocks(page_id)
+    topics, pending_topics = contents._build_topics(blocks, now)
+    return topics, bool(pending_topics)
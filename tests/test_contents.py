@@ -1,10 +1,16 @@
 import logging
+import sys
+import threading
+import time
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 
 from diary_generator import contents, notion_api
 from diary_generator.config.configuration import config
+from diary_generator.config.oembed import OEmbedProvider
+from diary_generator.util.journal import JsonlJournal
 
-from .helpers import block, notion_children_response
+from .helpers import block, fetch_page_topics, notion_children_response
 
 NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
 OLD = NOW - timedelta(minutes=10)
@@ -16,7 +22,7 @@ def fetch_topics(monkeypatch, blocks, *, now=NOW):
         "get_block_children",
         lambda page_id, start_cursor=None: notion_children_response(blocks),
     )
-    topics, has_pending = contents._fetch_diary_page("page-1", now)
+    topics, has_pending = fetch_page_topics("page-1", now)
     return topics, has_pending
 
 
@@ -447,6 +453,252 @@ def test_linkcard_handles_mixed_html_tag_and_plain_urls(monkeypatch):
     ]
 
 
+def test_linkcard_prefetch_fetches_missing_urls_before_rendering(monkeypatch):
+    ogp_cache = {
+        "https://example.com/cached": {"title": "C", "description": "", "image": ""}
+    }
+    monkeypatch.setattr(contents.linkcard.linkcard, "ogp_cache", ogp_cache)
+    fetched = []
+    running = []
+    overlapped = threading.Event()
+
+    def fake_fetch_data(url):
+        fetched.append(url)
+        running.append(url)
+        if len(running) > 1:
+            overlapped.set()
+        overlapped.wait(timeout=1)
+        running.remove(url)
+        if url.endswith("missing"):
+            return None
+        return {"title": url, "description": "", "image": ""}
+
+    monkeypatch.setattr(contents.linkcard, "fetch_data", fake_fetch_data)
+    content = [
+        "https://example.com/cached https://example.com/a",
+        '<a href="https://example.com/anchor">x</a> https://example.com/missing',
+        "https://www.youtube.com/watch?v=abc",
+    ]
+
+    contents.linkcard.prefetch(content)
+
+    assert sorted(fetched) == ["https://example.com/a", "https://example.com/missing"]
+    assert overlapped.is_set()
+    assert "https://example.com/a" in ogp_cache
+
+    # 描画はキャッシュを読むだけで、先読みで取得できなかった URL も取得し直さない
+    fetched.clear()
+    unresolved = []
+    contents.linkcard.create(content, unresolved)
+    assert fetched == []
+    assert unresolved == ["https://example.com/missing"]
+
+
+def test_linkcard_failures_are_cached_with_backoff(monkeypatch):
+    ogp_cache = {}
+    monkeypatch.setattr(contents.linkcard.linkcard, "ogp_cache", ogp_cache)
+    cache = contents.linkcard.cache
+    url = "https://example.com/dead"
+    failed_at = NOW
+    cache.record(ogp_cache, url, None, failed_at)
+    assert ogp_cache[url]["status"] == "error"
+    assert ogp_cache[url]["ttl"] == config.LINKCARD_RETRY_INTERVAL
+
+    # 再試行の時刻まではネットワークに出ない
+    assert cache.lookup(ogp_cache, url, failed_at + timedelta(minutes=59)) == (
+        cache.NEGATIVE,
+        None,
+    )
+    retry_at = failed_at + timedelta(seconds=config.LINKCARD_RETRY_INTERVAL)
+    assert cache.lookup(ogp_cache, url, retry_at)[0] == cache.MISS
+
+    # 続けて失敗すると間隔が倍になる
+    cache.record(ogp_cache, url, None, retry_at)
+    assert ogp_cache[url]["failures"] == 2
+    assert ogp_cache[url]["ttl"] == config.LINKCARD_RETRY_INTERVAL * 2
+
+    data = {"title": "T", "description": "", "image": ""}
+    cache.record(ogp_cache, url, data, retry_at)
+    assert cache.lookup(ogp_cache, url, retry_at)[1]["title"] == "T"
+
+    # 取り直しに失敗しても、取得済みのデータは残す
+    cache.record(ogp_cache, url, None, retry_at)
+    assert ogp_cache[url]["status"] == "ok"
+
+
+def test_linkcard_cache_records_from_many_threads_without_losing_updates(
+    monkeypatch,
+):
+    cache = contents.linkcard.cache
+    monkeypatch.setattr(cache, "counters", type(cache.counters)())
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # スレッドの切り替えを増やして競合を起こしやすくする
+    ogp_cache = {}
+    url = "https://example.com/dead"
+
+    def record_failures():
+        for _ in range(100):
+            cache.record(ogp_cache, url, None, NOW)
+
+    try:
+        threads = [threading.Thread(target=record_failures) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert cache.counters["failed"] == 800
+    assert ogp_cache[url]["failures"] == 800
+
+
+def test_linkcard_refreshes_stale_entries_in_background(monkeypatch):
+    url = "https://example.com/old"
+    ogp_cache = {url: {"title": "old", "description": "", "image": ""}}
+    monkeypatch.setattr(contents.linkcard.linkcard, "ogp_cache", ogp_cache)
+    monkeypatch.setattr(
+        contents.linkcard,
+        "fetch_data",
+        lambda url: {"title": "new", "description": "", "image": ""},
+    )
+    object.__setattr__(config, "LINKCARD_REFRESH_INTERVAL", 60)
+    try:
+        contents.linkcard.prefetch([url])
+        # 描画には今のデータを使う
+        assert '<div class="title">old</div>' in contents.linkcard.create([url])[0]
+        contents.linkcard.wait_for_refreshes()
+    finally:
+        object.__setattr__(config, "LINKCARD_REFRESH_INTERVAL", None)
+
+    assert ogp_cache[url]["title"] == "new"
+    assert ogp_cache[url]["status"] == "ok"
+
+
+def test_ogp_extract_reads_only_head(monkeypatch):
+    ogp = contents.linkcard.linkcard.ogp
+    page = (
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">'
+        "<title>タイトル</title>"
+        '<meta property="og:description" content="説明 &amp; 補足">'
+        '<meta property="og:image" content="https://example.com/a.png">'
+        "</head><body>" + "本文" * 10000 + "</body></html>"
+    ).encode("shift_jis")
+    chunk_size = 256
+    read = []
+
+    def chunks():
+        for start in range(0, len(page), chunk_size):
+            read.append(start)
+            yield page[start : start + chunk_size]
+
+    assert ogp.extract(chunks(), "text/html") == {
+        "title": "タイトル",
+        "description": "説明 & 補足",
+        "image": "https://example.com/a.png",
+    }
+    assert len(read) * chunk_size < 1024 + chunk_size
+
+    # Content-Type の charset を優先し、og:title があれば <title> より優先する
+    page = '<head><meta property="og:title" content="OGP"><title>T</title>'
+    assert (
+        ogp.extract([page.encode("euc_jp")], "text/html; charset=EUC-JP")["title"]
+        == "OGP"
+    )
+
+
+def test_oembed_providers_are_dispatched_from_config(monkeypatch):
+    embed = contents.linkcard.embed
+    assert embed.match("https://www.youtube.com/watch?v=abc") == ("youtube", None)
+    assert embed.match("https://x.com/user/status/1")[1].NAME == "ツイート"
+    assert embed.match("https://bsky.app/profile/a/post/1")[1].NAME == "ポスト"
+    # ホスト名で判定する（パスやクエリに含まれるだけでは埋め込まない）
+    assert embed.match("https://example.com/?from=x.com/") is None
+    assert embed.match("https://inbox.com/page") is None
+
+    provider = OEmbedProvider(
+        NAME="動画",
+        URL_PATTERN=r"https?://video\.example\.com/",
+        ENDPOINT="https://video.example.com/oembed",
+    )
+    oembed = replace(config.OEMBED, PROVIDERS=(*config.OEMBED.PROVIDERS, provider))
+    requested = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {"html": "<iframe></iframe>"}
+
+    monkeypatch.setattr(
+        embed.http,
+        "get",
+        lambda url, params=None, timeout=None, limit=None: (
+            requested.append((url, params)) or Response()
+        ),
+    )
+    monkeypatch.setattr(contents.linkcard.linkcard, "oembed_cache", {})
+    original_oembed = config.OEMBED
+    object.__setattr__(config, "OEMBED", oembed)
+    try:
+        url = "https://video.example.com/v/1"
+        assert contents.linkcard.create([url]) == ["<iframe></iframe>"]
+    finally:
+        object.__setattr__(config, "OEMBED", original_oembed)
+
+    assert requested == [("https://video.example.com/oembed", {"url": url})]
+
+
+def test_linkcard_store_writes_only_changes_and_evicts_unused(tmp_path):
+    LinkCardStore = contents.linkcard.cache.LinkCardStore
+    path = tmp_path / "ogp.json"
+    today = NOW.date()
+    max_age = timedelta(days=30)
+    data = {"title": "T", "description": "", "image": ""}
+
+    store = LinkCardStore(str(path))
+    store["https://example.com/a"] = data
+    store["https://example.com/b"] = data
+    store.touch({"https://example.com/a"}, today)
+    assert store.evict(today, max_age) == 0
+    assert store.save() is True
+
+    # 同じ日にもう一度使っても書き換えない
+    store = LinkCardStore(str(path))
+    store.touch({"https://example.com/a"}, today)
+    assert store.evict(today, max_age) == 0
+    assert store.save() is False
+    assert store["https://example.com/b"]["last_used"] == today.isoformat()
+
+    # 参照されないまま max_age を過ぎたものだけ消す
+    later = today + timedelta(days=31)
+    store.touch({"https://example.com/a"}, later)
+    assert store.evict(later, max_age) == 1
+    assert store.save() is True
+    assert list(LinkCardStore(str(path))) == ["https://example.com/a"]
+
+
+def test_linkcard_store_file_extension_follows_cache_codec(tmp_path):
+    LinkCardStore = contents.linkcard.cache.LinkCardStore
+    path = tmp_path / "ogp.json"
+    data = {"title": "T", "description": "", "image": ""}
+    store = LinkCardStore(str(path))
+    store["https://example.com/a"] = data
+    store.save()
+
+    original = config.CACHE_CODEC
+    object.__setattr__(config, "CACHE_CODEC", "gzip")
+    try:
+        store = LinkCardStore(str(path))  # codec を切り替える前の ogp.json を読む
+        assert list(store) == ["https://example.com/a"]
+        store["https://example.com/b"] = data
+        store.save()
+    finally:
+        object.__setattr__(config, "CACHE_CODEC", original)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ogp.json.gz"]
+
+
 def test_render_callout_icon_falls_back_for_unknown_icon_format():
     assert (
         contents.render_block(
@@ -511,7 +763,7 @@ def test_fetch_page_recursively_normalizes_child_blocks(monkeypatch):
 
     monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
 
-    topics, has_pending = contents._fetch_diary_page("page-1", NOW)
+    topics, has_pending = fetch_page_topics("page-1", NOW)
 
     assert has_pending is False
     assert calls == [("page-1", None), ("parent", None)]
@@ -544,7 +796,7 @@ def test_fetch_children_paginates_child_blocks(monkeypatch):
 
     monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
 
-    topics, _ = contents._fetch_diary_page("page-1", NOW)
+    topics, _ = fetch_page_topics("page-1", NOW)
 
     assert [child["plain_text"] for child in topics[0]["blocks"][0]["children"]] == [
         "2段目-1",
@@ -565,7 +817,7 @@ def test_fetch_page_skips_child_api_when_has_children_is_false(monkeypatch):
 
     monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
 
-    contents._fetch_diary_page("page-1", NOW)
+    fetch_page_topics("page-1", NOW)
 
     assert calls == [("page-1", None)]
 
@@ -595,7 +847,7 @@ def test_child_last_edited_time_controls_pending(monkeypatch):
     object.__setattr__(config, "TOPIC_PENDING_TIME", 5 * 60)
     try:
         monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
-        topics, has_pending = contents._fetch_diary_page("page-1", NOW)
+        topics, has_pending = fetch_page_topics("page-1", NOW)
     finally:
         object.__setattr__(config, "TOPIC_PENDING_TIME", original_pending_time)
 
@@ -708,7 +960,7 @@ def test_unknown_child_block_does_not_break_rendering(monkeypatch, caplog):
     monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
     caplog.set_level(logging.WARNING, logger="diary_system")
 
-    topics, _ = contents._fetch_diary_page("page-1", NOW)
+    topics, _ = fetch_page_topics("page-1", NOW)
 
     assert contents._build_topic_content(topics[0]) == ["<ul><li>1段目</li></ul>"]
     assert caplog.text == ""
@@ -928,3 +1180,521 @@ def test_nested_normal_bulleted_and_numbered_lists_do_not_warn():
         )
         == []
     )
+
+
+def _index_entry(page_id, entry_date, last_edited_time="2026-01-01T00:00:00.000Z"):
+    return {
+        "page_id": page_id,
+        "page_name": entry_date.replace("-", ""),
+        "entry_date": entry_date,
+        "index_direction": "index",
+        "last_edited_time": last_edited_time,
+        "source_last_edited_time": last_edited_time,
+    }
+
+
+def test_build_detail_entries_fetches_changed_pages_concurrently_in_order(
+    monkeypatch,
+):
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def fake_get_block_children(block_id, start_cursor=None):
+        nonlocal active, max_active
+        with lock:
+            active += 1
+            max_active = max(max_active, active)
+        # 後ろのページほど早く返して、完了順と出力順をずらす
+        time.sleep(0.02 * (4 - int(block_id[-1])))
+        with lock:
+            active -= 1
+        return notion_children_response(
+            [
+                block(
+                    "heading_3",
+                    f"話題{block_id}",
+                    block_id=f"t-{block_id}",
+                    last_edited_time=OLD,
+                ),
+                block("paragraph", "本文", last_edited_time=OLD),
+            ]
+        )
+
+    monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
+    index_entries = [
+        _index_entry("page-3", "2026-01-03"),
+        _index_entry("page-2", "2026-01-02"),
+        _index_entry("page-1", "2026-01-01"),
+    ]
+    cached = {
+        "page_id": "page-2",
+        "page_name": "20260102",
+        "entry_date": "2026-01-02",
+        "last_edited_time": index_entries[1]["last_edited_time"],
+        "topics": [{"topic_id": "cached", "title": "キャッシュ"}],
+        "has_pending_topics": False,
+    }
+
+    detail_entries = contents._build_detail_entries(
+        index_entries=index_entries,
+        old_index_cache={"entries": [index_entries[1]]},
+        old_detail_cache={"entries": [cached]},
+        now=NOW,
+    )
+
+    assert [entry["page_id"] for entry in detail_entries] == [
+        "page-3",
+        "page-2",
+        "page-1",
+    ]
+    assert detail_entries[1]["topics"] == cached["topics"]
+    assert detail_entries[0]["topics"][0]["topic_id"] == "t-page-3"
+    assert detail_entries[2]["topics"][0]["topic_id"] == "t-page-1"
+    assert max_active == 2
+
+
+def test_block_tree_is_expanded_breadth_first_by_depth(monkeypatch):
+    def list_item(text, block_id, has_children=False):
+        item = block(
+            "bulleted_list_item", text, block_id=block_id, last_edited_time=OLD
+        )
+        item["has_children"] = has_children
+        return item
+
+    tree = {
+        "page-1": [
+            block("heading_3", "リスト", last_edited_time=OLD),
+            list_item("A", "a", has_children=True),
+            list_item("B", "b", has_children=True),
+        ],
+        "a": [list_item("A-1", "a-1", has_children=True)],
+        "b": [list_item("B-1", "b-1"), list_item("B-2", "b-2")],
+        "a-1": [list_item("A-1-i", "a-1-i")],
+    }
+    calls = []
+
+    def fake_get_block_children(block_id, start_cursor=None):
+        calls.append(block_id)
+        children = tree[block_id]
+        if block_id == "b" and start_cursor is None:
+            return {"results": children[:1], "has_more": True, "next_cursor": "c"}
+        if block_id == "b":
+            return notion_children_response(children[1:])
+        return notion_children_response(children)
+
+    monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
+
+    blocks, _ = contents._fetch_page_blocks("page-1")
+
+    assert calls[0] == "page-1"
+    assert sorted(calls[1:4]) == ["a", "b", "b"]
+    assert calls[4:] == ["a-1"]
+    assert [child["id"] for child in blocks[1]["children"]] == ["a-1"]
+    assert [child["id"] for child in blocks[1]["children"][0]["children"]] == ["a-1-i"]
+    assert [child["id"] for child in blocks[2]["children"]] == ["b-1", "b-2"]
+
+
+def _database_row(page_id, entry_date, *, public=True, last_edited_time=None):
+    return {
+        "id": page_id,
+        "last_edited_time": last_edited_time or "2026-01-01T11:58:00.000Z",
+        "properties": {
+            "日付": {"date": {"start": entry_date}},
+            "公開": {"checkbox": public},
+            "収集対象": {"select": {"name": "index"}},
+            "名前": {"title": []},
+        },
+    }
+
+
+DIARY_DATABASE = {
+    "properties": {
+        "名前": {"id": "title", "type": "title"},
+        "日付": {"id": "d%3F", "type": "date"},
+        "公開": {"id": "p%21", "type": "checkbox"},
+        "収集対象": {"id": "s%40", "type": "select"},
+        "メモ": {"id": "memo", "type": "rich_text"},
+    }
+}
+
+
+def use_diary_database(monkeypatch, results):
+    queries = []
+
+    def fake_query_database(
+        database_id, start_cursor=None, filter=None, sorts=None, filter_properties=None
+    ):
+        queries.append({"filter": filter, "filter_properties": filter_properties})
+        return {"results": results, "has_more": False}
+
+    monkeypatch.setattr(notion_api, "query_database", fake_query_database)
+    monkeypatch.setattr(notion_api, "retrieve_database", lambda _: DIARY_DATABASE)
+    return queries
+
+
+def test_index_sync_queries_only_pages_edited_since_last_sync(monkeypatch):
+    queries = use_diary_database(
+        monkeypatch,
+        [
+            _database_row("page-2", "2026-01-02", public=False),
+            _database_row("page-4", "2026-01-04"),
+        ],
+    )
+    old_index_cache = {
+        "synced_at": (NOW - timedelta(hours=1)).isoformat(),
+        "full_synced_at": (NOW - timedelta(hours=2)).isoformat(),
+        "entries": [
+            _index_entry("page-3", "2026-01-03"),
+            _index_entry("page-2", "2026-01-02"),
+            _index_entry("page-1", "2026-01-01"),
+        ],
+    }
+
+    synced = contents._sync_diary_index(old_index_cache, NOW)
+
+    since = NOW - timedelta(hours=1) - contents.INDEX_SYNC_MARGIN
+    assert queries == [
+        {
+            "filter": {
+                "timestamp": "last_edited_time",
+                "last_edited_time": {"on_or_after": since.isoformat()},
+            },
+            "filter_properties": ["title", "d?", "p!", "s@"],
+        }
+    ]
+    assert [entry["page_id"] for entry in synced["entries"]] == [
+        "page-4",
+        "page-3",
+        "page-1",
+    ]
+    assert synced["synced_at"] == NOW.isoformat()
+    assert synced["full_synced_at"] == old_index_cache["full_synced_at"]
+
+
+def test_full_index_sync_filters_public_rows_on_server(monkeypatch):
+    queries = use_diary_database(monkeypatch, [_database_row("page-1", "2026-01-01")])
+    old_index_cache = {
+        "synced_at": (NOW - timedelta(hours=1)).isoformat(),
+        "full_synced_at": (
+            NOW - timedelta(seconds=config.INDEX_FULL_SYNC_INTERVAL)
+        ).isoformat(),
+        "entries": [_index_entry("page-9", "2026-01-09")],
+    }
+
+    synced = contents._sync_diary_index(old_index_cache, NOW)
+
+    assert queries[0]["filter"] == {
+        "and": [
+            {"property": "公開", "checkbox": {"equals": True}},
+            {"property": "収集対象", "select": {"is_not_empty": True}},
+            {"property": "日付", "date": {"is_not_empty": True}},
+        ]
+    }
+    assert queries[0]["filter_properties"] == ["title", "d?", "p!", "s@"]
+    assert [entry["page_id"] for entry in synced["entries"]] == ["page-1"]
+    assert synced["full_synced_at"] == NOW.isoformat()
+
+
+def test_edited_page_refetches_subtrees_even_if_parent_is_unchanged(monkeypatch):
+    def list_item(text, block_id, *, has_children=False, edited=OLD):
+        item = block(
+            "bulleted_list_item", text, block_id=block_id, last_edited_time=edited
+        )
+        item["has_children"] = has_children
+        return item
+
+    tree = {
+        "page-1": [
+            block("heading_3", "リスト", block_id="topic-1", last_edited_time=OLD),
+            list_item("A", "a", has_children=True),
+        ],
+        "a": [list_item("A-1", "a-1")],
+    }
+    calls = []
+
+    def fake_get_block_children(block_id, start_cursor=None):
+        calls.append(block_id)
+        return notion_children_response(tree[block_id])
+
+    monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
+    index_entry = _index_entry("page-1", "2026-01-01")
+    first = contents._build_detail_entries(
+        index_entries=[index_entry],
+        old_index_cache=None,
+        old_detail_cache=None,
+        now=NOW,
+    )[0]
+
+    # Notion は子の編集で親ブロック "a" の last_edited_time を更新しないことがある
+    tree["a"] = [list_item("A-1 改", "a-1", edited=OLD + timedelta(minutes=1))]
+    calls.clear()
+    second = contents._build_detail_entries(
+        index_entries=[
+            _index_entry("page-1", "2026-01-01", "2026-01-01T11:51:00.000Z")
+        ],
+        old_index_cache={"entries": [index_entry]},
+        old_detail_cache={"entries": [first]},
+        now=NOW,
+    )[0]
+
+    assert calls == ["page-1", "a"]
+    blocks = second["topics"][0]["blocks"]
+    assert blocks[0]["children"][0]["plain_text"] == "A-1 改"
+
+
+def test_pending_topics_are_repolled_without_refetching_settled_subtrees(monkeypatch):
+    def list_item(text, block_id, *, has_children=False, edited=OLD):
+        item = block(
+            "bulleted_list_item", text, block_id=block_id, last_edited_time=edited
+        )
+        item["has_children"] = has_children
+        return item
+
+    recent = NOW - timedelta(seconds=30)
+    tree = {
+        "page-1": [
+            block("heading_3", "確定", block_id="topic-1", last_edited_time=OLD),
+            list_item("A", "a", has_children=True),
+            block("heading_3", "書きかけ", block_id="topic-2", last_edited_time=OLD),
+            list_item("B", "b", has_children=True, edited=recent),
+        ],
+        "a": [list_item("A-1", "a-1")],
+        "b": [list_item("B-1", "b-1", edited=recent)],
+    }
+    calls = []
+
+    def fake_get_block_children(block_id, start_cursor=None):
+        calls.append(block_id)
+        return notion_children_response(tree[block_id])
+
+    monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
+    index_entry = _index_entry("page-1", "2026-01-01")
+
+    def build(old_detail_entry, now):
+        return contents._build_detail_entries(
+            index_entries=[index_entry],
+            old_index_cache={"entries": [index_entry]} if old_detail_entry else None,
+            old_detail_cache={"entries": [old_detail_entry]}
+            if old_detail_entry
+            else None,
+            now=now,
+        )[0]
+
+    first = build(None, NOW)
+    assert [topic["topic_id"] for topic in first["topics"]] == ["topic-1"]
+    assert first["pending_topics"] == {"topic-2": recent.isoformat()}
+
+    # 保留時間内: ページが編集されていなければ取得しない
+    calls.clear()
+    assert build(first, NOW + timedelta(seconds=10)) == first
+    assert calls == []
+
+    # 保留時間経過後: 保留トピックの子ツリーだけ取得する
+    second = build(first, NOW + timedelta(minutes=5))
+    assert calls == ["page-1", "b"]
+    assert [topic["topic_id"] for topic in second["topics"]] == ["topic-1", "topic-2"]
+    assert second["topics"][0] == first["topics"][0]
+    assert second["has_pending_topics"] is False
+    assert second["pending_topics"] == {}
+
+
+def test_journal_append_after_torn_tail_starts_a_new_line(tmp_path):
+    path = tmp_path / "diary_detail.journal.jsonl"
+    path.write_text('{"entry": {"page_id": "page-1"}}\n{"entry": {"page_', "utf-8")
+    journal = JsonlJournal(str(path))
+
+    journal.append({"entry": {"page_id": "page-2"}})
+    journal.close()
+
+    assert [record["entry"]["page_id"] for record in journal.load()] == [
+        "page-1",
+        "page-2",
+    ]
+
+
+def test_interrupted_detail_fetch_resumes_from_journal(monkeypatch, tmp_path):
+    failing = {"page-2"}
+    calls = []
+
+    def fake_get_block_children(block_id, start_cursor=None):
+        calls.append(block_id)
+        if block_id in failing:
+            raise notion_api.NotionApiError("connection reset")
+        return notion_children_response(
+            [
+                block(
+                    "heading_3", "話題", block_id=f"t-{block_id}", last_edited_time=OLD
+                ),
+                block("paragraph", block_id, last_edited_time=OLD),
+            ]
+        )
+
+    monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
+    index_entries = [
+        _index_entry("page-3", "2026-01-03"),
+        _index_entry("page-2", "2026-01-02"),
+        _index_entry("page-1", "2026-01-01"),
+    ]
+    detail_journal = JsonlJournal(str(tmp_path / "diary_detail.journal.jsonl"))
+
+    def build():
+        return contents._build_detail_entries(
+            index_entries=index_entries,
+            old_index_cache=None,
+            old_detail_cache=None,
+            now=NOW,
+            detail_journal=detail_journal,
+        )
+
+    try:
+        build()
+    except notion_api.NotionApiError:
+        pass
+    detail_journal.close()
+    journaled = {record["entry"]["page_id"] for record in detail_journal.load()}
+    assert "page-2" not in journaled
+    assert journaled
+
+    failing.clear()
+    calls.clear()
+    resumed = build()
+    detail_journal.close()
+
+    assert sorted(calls) == sorted({"page-1", "page-2", "page-3"} - journaled)
+    detail_journal.remove()
+    calls.clear()
+    assert build() == resumed
+
+
+def test_rendered_topic_cache_skips_rendering_unchanged_topics(monkeypatch, tmp_path):
+    monkeypatch.setattr(contents.linkcard, "fetch_data", lambda url: None)
+    monkeypatch.setattr(contents.cache, "initialize", lambda: None)
+    monkeypatch.setattr(contents.cache, "save_cache", lambda referenced_urls: None)
+    rendered_blocks = []
+    render_blocks = contents.render_blocks
+    monkeypatch.setattr(
+        contents,
+        "render_blocks",
+        lambda blocks: rendered_blocks.append(blocks) or render_blocks(blocks),
+    )
+
+    def topic(topic_id, text, edited, block_type="paragraph"):
+        return {
+            "topic_id": topic_id,
+            "title": topic_id,
+            "last_edited_time": edited,
+            "tags": [],
+            "blocks": [
+                {
+                    "block_id": f"{topic_id}-b",
+                    "type": block_type,
+                    "plain_text": text,
+                    "image": {"url": "https://example.com/a.png"},
+                }
+            ],
+        }
+
+    index_cache = {"entries": [{"page_id": "p1", "entry_date": "2026-01-01"}]}
+
+    def build(topics):
+        rendered_cache = contents.diary_cache.RenderedTopicCache(
+            str(tmp_path / "rendered_topics.json")
+        )
+        detail_cache = {"entries": [{"page_id": "p1", "topics": topics}]}
+        raw_data = contents._compose_raw_data_from_caches(
+            index_cache, detail_cache, rendered_cache
+        )
+        entries = contents._parse_json_to_diary_entries(raw_data, rendered_cache)
+        rendered_cache.save()
+        return entries
+
+    monkeypatch.setattr(contents, "generate_image_tag", lambda *args: "<img>")
+    topics = [
+        topic("t1", "本文", "2026-01-01T00:00:00.000Z"),
+        topic("t2", "https://example.com/page", "2026-01-01T00:00:00.000Z"),
+        topic("t3", "", "2026-01-01T00:00:00.000Z", block_type="image"),
+    ]
+    first = build(topics)
+    assert len(rendered_blocks) == 3
+
+    # t1 は描画キャッシュから。リンクカードを作れなかった t2 と画像を含む t3 は描画し直す
+    rendered_blocks.clear()
+    second = build(topics)
+    assert [blocks[0]["block_id"] for blocks in rendered_blocks] == ["t2-b", "t3-b"]
+    assert second == first
+
+    # 編集されたトピックは描画し直す
+    rendered_blocks.clear()
+    topics[0] = topic("t1", "編集後", "2026-01-02T00:00:00.000Z")
+    third = build(topics)
+    assert rendered_blocks[0][0]["block_id"] == "t1-b"
+    assert third[0].topics[0].content_html == ["<p>編集後</p>"]
+
+    # 古いブロックを消しただけでは last_edited_time が変わらないが、描画し直す
+    rendered_blocks.clear()
+    topics[0]["blocks"].append(
+        {"block_id": "t1-c", "type": "paragraph", "plain_text": "追記"}
+    )
+    build(topics)
+    rendered_blocks.clear()
+    del topics[0]["blocks"][1]
+    fourth = build(topics)
+    assert rendered_blocks[0][0]["block_id"] == "t1-b"
+    assert fourth[0].topics[0].content_html == ["<p>編集後</p>"]
+
+
+def test_raw_block_archive_rederives_detail_entries_offline(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_get_block_children(block_id, start_cursor=None):
+        calls.append(block_id)
+        return notion_children_response(
+            [
+                block(
+                    "heading_3", "話題", block_id=f"t-{block_id}", last_edited_time=OLD
+                ),
+                block("paragraph", block_id, last_edited_time=OLD),
+            ]
+        )
+
+    monkeypatch.setattr(notion_api, "get_block_children", fake_get_block_children)
+    original_file_names = config.FILE_NAMES
+    original_archive = config.ARCHIVE_RAW_BLOCKS
+    object.__setattr__(
+        config,
+        "FILE_NAMES",
+        replace(original_file_names, CACHE_RAW_BLOCKS_DIR=str(tmp_path / "raw_blocks")),
+    )
+    object.__setattr__(config, "ARCHIVE_RAW_BLOCKS", True)
+    try:
+        index_entries = [
+            _index_entry("page-2", "2026-01-02"),
+            _index_entry("page-1", "2026-01-01"),
+        ]
+        fetched = contents._build_detail_entries(
+            index_entries=index_entries,
+            old_index_cache=None,
+            old_detail_cache=None,
+            now=NOW,
+        )
+        (tmp_path / "raw_blocks" / "page-1.json.gz").unlink()
+
+        detail = contents.rederive_detail_entries({"entries": fetched}, now=NOW)
+        assert detail["entries"][0] == fetched[0]
+        assert detail["entries"][1]["needs_refetch"] is True
+
+        # アーカイブの無かったページだけ Notion から取り直す
+        calls.clear()
+        refetched = contents._build_detail_entries(
+            index_entries=index_entries,
+            old_index_cache={"entries": index_entries},
+            old_detail_cache=detail,
+            now=NOW,
+        )
+    finally:
+        object.__setattr__(config, "FILE_NAMES", original_file_names)
+        object.__setattr__(config, "ARCHIVE_RAW_BLOCKS", original_archive)
+
+    assert calls == ["page-1"]
+    assert refetched == fetched
@@ -0,0 +1,275 @@
+import json
+
+import pytest
+
+from diary_generator.config.configuration import config
+from diary_generator.diary_cache import (
+    CacheStore,
+    DiaryCachePair,
+    migrations,
+)
+from diary_generator.util import codec
+
+
+def make_store(tmp_path, schema_version=4):
+    return CacheStore(
+        index_path=str(tmp_path / "diary_index.json"),
+        detail_path=str(tmp_path / "diary_detail.json"),
+        manifest_path=str(tmp_path / "diary_cache.manifest.json"),
+        schema_version=schema_version,
+        shard_dir=str(tmp_path / "diary_detail"),
+    )
+
+
+def detail_entry(page_id, entry_date, text="本文"):
+    return {
+        "page_id": page_id,
+        "page_name": f"{entry_date} の日記",
+        "entry_date": entry_date,
+        "index_direction": "index",
+        "topics": [{"title": text}],
+    }
+
+
+def sample_pair(entries=None):
+    if entries is None:
+        entries = [
+            detail_entry("p3", "2026-02-01"),
+            detail_entry("p2", "2026-01-31"),
+            detail_entry("p1", "2026-01-01"),
+        ]
+    return DiaryCachePair(
+        index={"schema_version": 4, "generated_at": "now", "entries": []},
+        detail={
+            "schema_version": 4,
+            "generated_at": "now",
+            "entries": entries,
+            "unsupported_nested_block_warnings": [],
+        },
+    )
+
+
+def shard_files(tmp_path):
+    return sorted(path.name for path in (tmp_path / "diary_detail").iterdir())
+
+
+def test_detail_cache_is_sharded_by_month_and_round_trips(tmp_path):
+    store = make_store(tmp_path)
+    store.save(sample_pair())
+
+    manifest = json.loads((tmp_path / "diary_cache.manifest.json").read_text())
+    assert [shard["key"] for shard in manifest["detail"]["shards"]] == [
+        "2026-02",
+        "2026-01",
+    ]
+    assert len(shard_files(tmp_path)) == 2
+    assert store.load() == sample_pair()
+
+
+def test_only_changed_months_are_rewritten(tmp_path):
+    store = make_store(tmp_path)
+    store.save(sample_pair())
+    before = shard_files(tmp_path)
+
+    entries = sample_pair().detail["entries"]
+    entries[0] = detail_entry("p3", "2026-02-01", "編集後")
+    store.save(sample_pair(entries))
+    after = shard_files(tmp_path)
+
+    assert [name for name in after if name.startswith("2026-01")] == [
+        name for name in before if name.startswith("2026-01")
+    ]
+    assert set(after) != set(before)
+    assert len(after) == 2  # 古い 2026-02 のシャードは消える
+    assert store.load().detail["entries"][0]["topics"][0]["title"] == "編集後"
+
+
+def test_tampered_pages_are_dropped_and_reported(tmp_path):
+    store = make_store(tmp_path)
+    store.save(sample_pair())
+    shard = tmp_path / "diary_detail" / shard_files(tmp_path)[0]  # 2026-01
+    shard.write_text(shard.read_text().replace("本文", "改ざん"))
+
+    result = make_store(tmp_path).verify()
+    assert not result.ok
+    assert result.damaged_shards == ["2026-01"]
+    assert sorted(result.corrupt_pages) == ["p1", "p2"]
+    assert [entry["page_id"] for entry in store.load().detail["entries"]] == ["p3"]
+
+
+def test_truncated_shard_keeps_entries_before_the_cut(tmp_path):
+    store = make_store(tmp_path)
+    store.save(sample_pair())
+    shard = tmp_path / "diary_detail" / shard_files(tmp_path)[0]  # p2, p1
+    raw = shard.read_bytes()
+    shard.write_bytes(raw[: raw.index(b'"p1"')])
+
+    pair = make_store(tmp_path).load()
+    assert [entry["page_id"] for entry in pair.detail["entries"]] == ["p3", "p2"]
+    assert make_store(tmp_path).verify().corrupt_pages == ["p1"]
+
+
+def test_mismatched_index_is_rebuilt_from_detail(tmp_path):
+    pair = sample_pair()
+    pair = DiaryCachePair(
+        index={
+            **pair.index,
+            "synced_at": "now",
+            "entries": [{"page_id": "p3", "entry_date": "2026-02-01"}],
+        },
+        detail=pair.detail,
+    )
+    make_store(tmp_path).save(pair)
+    (tmp_path / "diary_index.json").write_text("{")
+
+    loaded = make_store(tmp_path).load()
+    assert "synced_at" not in loaded.index  # 次回は日記一覧を全件取得する
+    assert [entry["page_id"] for entry in loaded.index["entries"]] == ["p3", "p2", "p1"]
+    assert all(entry["index_direction"] == "index" for entry in loaded.index["entries"])
+    assert loaded.index["entries"][0]["page_name"] == "2026-02-01 の日記"
+    assert loaded.detail == pair.detail
+
+
+def test_mismatched_index_without_index_direction_in_detail_is_a_miss(tmp_path):
+    entries = [
+        {key: value for key, value in entry.items() if key != "index_direction"}
+        for entry in sample_pair().detail["entries"]
+    ]
+    make_store(tmp_path).save(sample_pair(entries))
+    (tmp_path / "diary_index.json").write_text("{")
+
+    assert make_store(tmp_path).load() is None
+
+
+def test_schema_mismatch_in_manifest_is_rejected(tmp_path):
+    make_store(tmp_path, schema_version=3).save(sample_pair())
+
+    assert make_store(tmp_path).load() is None
+
+
+def test_single_file_cache_is_read_and_migrated_on_save(tmp_path):
+    pair = sample_pair()
+    (tmp_path / "diary_index.json").write_text(json.dumps(pair.index))
+    (tmp_path / "diary_detail.json").write_text(json.dumps(pair.detail))
+    store = make_store(tmp_path)
+
+    assert store.load() == pair
+    assert make_store(tmp_path, schema_version=5).load() is None
+
+    store.save(store.load())
+    assert not (tmp_path / "diary_detail.json").exists()
+    assert store.load() == pair
+
+
+def tagged_pair():
+    def topic(topic_id, tags):
+        return {
+            "topic_id": topic_id,
+            "title": topic_id,
+            "tags": tags,
+            "blocks": [{"block_id": f"{topic_id}-b0", "type": "paragraph"}],
+        }
+
+    entries = [
+        {**detail_entry("p2", "2026-01-31"), "topics": [topic("t2", ["読書"])]},
+        {
+            **detail_entry("p1", "2026-01-01"),
+            "topics": [topic("t1a", ["日記"]), topic("t1b", ["読書", "日記"])],
+        },
+    ]
+    pair = sample_pair(entries)
+    index_entries = [
+        {"page_id": entry["page_id"], "entry_date": entry["entry_date"]}
+        for entry in entries
+    ]
+    return DiaryCachePair(
+        index={**pair.index, "entries": index_entries}, detail=pair.detail
+    )
+
+
+def test_inspect_reads_once(tmp_path, monkeypatch):
+    make_store(tmp_path).save(tagged_pair())
+
+    decoded = []
+    decode = codec.decode
+    monkeypatch.setattr(
+        codec, "decode", lambda raw, name=None: decoded.append(raw) or decode(raw, name)
+    )
+    pair, result = make_store(tmp_path).inspect()
+    assert pair == tagged_pair()
+    assert result.ok
+    assert len(decoded) == 2  # index と1か月分のシャード
+
+
+def test_zstd_fallback_is_warned_once(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(codec, "_zstd", None)
+    monkeypatch.setattr(codec.log, "warning", warnings.append)
+    codec._warn_zstd_unavailable.cache_clear()
+
+    assert [codec.resolve("zstd") for _ in range(3)] == ["gzip"] * 3
+    assert len(warnings) == 1
+    codec._warn_zstd_unavailable.cache_clear()
+
+
+@pytest.mark.parametrize("codec_name", codec.available_codecs())
+def test_cache_written_with_any_codec_is_read_back(tmp_path, codec_name):
+    original = config.CACHE_CODEC
+    object.__setattr__(config, "CACHE_CODEC", codec_name)
+    try:
+        make_store(tmp_path).save(sample_pair())
+        assert all(
+            name.endswith(codec.suffix(codec_name)) for name in shard_files(tmp_path)
+        )
+        assert (tmp_path / f"diary_index{codec.suffix(codec_name)}").exists()
+        assert make_store(tmp_path).load() == sample_pair()
+    finally:
+        object.__setattr__(config, "CACHE_CODEC", original)
+
+
+def test_switching_codec_reads_old_files_and_removes_them_on_save(tmp_path):
+    make_store(tmp_path).save(sample_pair())
+    original = config.CACHE_CODEC
+    object.__setattr__(config, "CACHE_CODEC", "gzip")
+    try:
+        # 読み込みは設定ではなく中身で形式を判定する
+        assert make_store(tmp_path).load() == sample_pair()
+        make_store(tmp_path).save(sample_pair())
+    finally:
+        object.__setattr__(config, "CACHE_CODEC", original)
+
+    assert (tmp_path / "diary_index.json.gz").exists()
+    assert not (tmp_path / "diary_index.json").exists()
+    assert make_store(tmp_path).load() == sample_pair()
+
+
+def test_pickle_is_read_only_when_configured(tmp_path):
+    raw = codec.encode({"entries": []}, "pickle")
+    with pytest.raises(ValueError):
+        codec.decode(raw)
+    assert codec.decode(raw, "pickle") == {"entries": []}
+
+    # json の設定では、pickle で書かれたキャッシュを探さない
+    codec.dump({"entries": []}, str(tmp_path / "ogp.pickle"), "pickle")
+    assert codec.find_cache(str(tmp_path / "ogp.json")) is None
+
+
+def test_old_schema_is_upgraded_by_registered_migrations(tmp_path, monkeypatch):
+    def add_summary(index, detail):
+        entries = [{**entry, "summary": ""} for entry in detail["entries"]]
+        return index, {**detail, "entries": entries}
+
+    old = sample_pair()
+    old = DiaryCachePair(
+        index={**old.index, "schema_version": 3},
+        detail={**old.detail, "schema_version": 3},
+    )
+    make_store(tmp_path, schema_version=3).save(old)
+    assert make_store(tmp_path).load() is None  # 移行が無ければ捨てる
+
+    monkeypatch.setitem(migrations._MIGRATIONS, 3, add_summary)
+    upgraded = make_store(tmp_path).load()
+    assert upgraded.index["schema_version"] == 4
+    assert upgraded.detail["schema_version"] == 4
+    assert all(entry["summary"] == "" for entry in upgraded.detail["entries"])
+    assert make_store(tmp_path, schema_version=5).load() is None
@@ -0,0 +1,80 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from diary_generator import generator
+
+STEPS = (
+    (generator.filemaintenance, "reflesh_files"),
+    (generator.filemaintenance, "copy_static_files"),
+    (generator.html.index, "generate"),
+    (generator.html.dates.list, "generate"),
+    (generator.html.dates.detail, "generate"),
+    (generator.html.topics.list, "generate"),
+    (generator.html.topics.detail, "generate"),
+    (generator.html.entries.permalink, "generate"),
+    (generator.html.search, "generate"),
+    (generator.json.search, "generate"),
+    (generator.json.calendar, "generate"),
+)
+
+
+def stub_outputs(monkeypatch) -> list[tuple[str, tuple]]:
+    """取得より後の処理（ファイル出力など）を、呼び出しを記録するだけにする。"""
+    calls = []
+    for module, name in STEPS:
+        monkeypatch.setattr(
+            module,
+            name,
+            lambda *args, _name=f"{module.__name__}.{name}": calls.append(
+                (_name, args)
+            ),
+        )
+    monkeypatch.setattr(generator, "_log_notion_stats", lambda: None)
+    monkeypatch.setattr(generator.utilities, "set_topic_url_fn", lambda fn: None)
+    return calls
+
+
+def test_slug_crawl_runs_while_diary_is_fetched(monkeypatch):
+    calls = stub_outputs(monkeypatch)
+    resolver_started = threading.Event()
+    diary_fetched = threading.Event()
+    resolver = SimpleNamespace(url_for_title=lambda title: title)
+    entries = [SimpleNamespace(date="2026-01-01")]
+
+    def fake_resolver():
+        resolver_started.set()
+        # 順に実行されていれば、日記データの取得はまだ始まっていない
+        assert diary_fetched.wait(5)
+        return resolver
+
+    def fake_get():
+        # 順に実行されていれば、スラッグの取得はもう終わっているか、まだ始まっていない
+        assert resolver_started.wait(5)
+        diary_fetched.set()
+        return entries
+
+    monkeypatch.setattr(generator, "TopicSlugResolver", fake_resolver)
+    monkeypatch.setattr(generator.contents, "get", fake_get)
+
+    generator.generate_all()
+
+    assert (
+        f"{generator.html.topics.detail.__name__}.generate",
+        (entries, resolver),
+    ) in calls
+
+
+def test_slug_crawl_failure_propagates_out_of_generate_all(monkeypatch):
+    calls = stub_outputs(monkeypatch)
+
+    def fake_resolver():
+        raise RuntimeError("slug database is unavailable")
+
+    monkeypatch.setattr(generator, "TopicSlugResolver", fake_resolver)
+    monkeypatch.setattr(generator.contents, "get", list)
+
+    with pytest.raises(RuntimeError, match="slug database is unavailable"):
+        generator.generate_all()
+    assert calls == []
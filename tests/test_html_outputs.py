@@ -17,7 +17,7 @@ from diary_generator.models import DiaryEntry, IndexDirection, Topic
 from diary_generator.topic_slugs.normalize import normalize_topic_key
 from diary_generator.topic_slugs.resolve import TopicSlugResolver
 from diary_generator.util import utilities
-from tests.helpers import block, notion_children_response
+from tests.helpers import block, fetch_page_topics, notion_children_response
 
 JST = timezone(timedelta(hours=9))
 
@@ -235,7 +235,7 @@ def public_topics_from_notion_blocks(monkeypatch) -> tuple[list[Topic], bool]:
         lambda _page_id, start_cursor=None: notion_children_response(blocks),
     )
 
-    raw_topics, has_pending = contents._fetch_diary_page("page-2026-01-15", now)
+    raw_topics, has_pending = fetch_page_topics("page-2026-01-15", now)
     topics = [
         Topic(
             title=raw["title"],
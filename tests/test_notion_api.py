@@ -0,0 +1,310 @@
+import json
+import threading
+from dataclasses import replace
+from datetime import UTC, datetime
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from diary_generator import contents, notion_api
+from diary_generator.config.configuration import config
+from diary_generator.notion_api.client import NotionClient
+from diary_generator.notion_api.fake import (
+    DATABASE_ID,
+    FakeNotionAdapter,
+    FakeNotionWorkspace,
+    FakeWorkspaceShape,
+)
+from diary_generator.notion_api.ratelimit import CircuitBreaker, TokenBucket
+
+OK_BODY = {"results": [], "has_more": False, "next_cursor": None}
+
+
+class RecordingAdapter(BaseAdapter):
+    """送られたリクエストを記録し、statuses の順にレスポンスを返す。"""
+
+    def __init__(self, statuses=None, headers=None):
+        super().__init__()
+        self.requests: list[requests.PreparedRequest] = []
+        self.statuses = list(statuses or [])
+        self.headers = headers or {}
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if isinstance(status, Exception):
+            raise status
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(
+            OK_BODY if status == 200 else {"message": "error"}
+        ).encode("utf-8")
+        if status != 200:
+            response.headers.update(self.headers)
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def client_with_adapter(adapter: BaseAdapter, clock=None) -> NotionClient:
+    clock = clock or FakeClock()
+    client = NotionClient(api_key="secret", sleep=clock.sleep, clock=clock)
+    client.session.mount("https://", adapter)
+    return client
+
+
+def test_client_reuses_one_session_with_preset_headers():
+    adapter = RecordingAdapter()
+    client = client_with_adapter(adapter)
+
+    client.request("GET", "blocks/block-1/children", params={"page_size": 100})
+    client.request("POST", "databases/db-1/query", json={"page_size": 100})
+
+    assert [r.method for r in adapter.requests] == ["GET", "POST"]
+    for prepared in adapter.requests:
+        assert prepared.headers["Authorization"] == "Bearer secret"
+        assert prepared.headers["Notion-Version"] == "2022-06-28"
+    assert adapter.requests[0].url == (
+        "https://api.notion.com/v1/blocks/block-1/children?page_size=100"
+    )
+    assert client.stats.requests == 2
+
+
+def test_stats_report_connection_reuse():
+    stats = notion_api.NotionClientStats(requests=5, new_connections=2)
+
+    assert stats.reused_connections == 3
+
+
+def test_endpoint_helpers_use_shared_client(monkeypatch):
+    adapter = RecordingAdapter()
+    client = client_with_adapter(adapter)
+    monkeypatch.setattr(notion_api.client, "_client", client)
+
+    notion_api.get_block_children("block-1", start_cursor="cursor-1")
+    notion_api.query_database("db-1")
+
+    assert notion_api.get_client() is client
+    assert adapter.requests[0].url.endswith("start_cursor=cursor-1&page_size=100")
+    assert json.loads(adapter.requests[1].body) == {"page_size": 100}
+    assert client.stats.requests == 2
+
+
+def test_query_database_sends_filter_properties_as_repeated_params(monkeypatch):
+    adapter = RecordingAdapter()
+    client = client_with_adapter(adapter)
+    monkeypatch.setattr(notion_api.client, "_client", client)
+
+    notion_api.query_database(
+        "db-1",
+        filter=notion_api.filters.checkbox_equals("公開", True),
+        filter_properties=["title", "d?"],
+    )
+
+    assert adapter.requests[0].url.endswith(
+        "databases/db-1/query?filter_properties=title&filter_properties=d%3F"
+    )
+    assert json.loads(adapter.requests[0].body) == {
+        "filter": {"property": "公開", "checkbox": {"equals": True}},
+        "page_size": 100,
+    }
+
+
+def test_429_honors_retry_after_and_retries():
+    clock = FakeClock()
+    adapter = RecordingAdapter(statuses=[429, 200], headers={"Retry-After": "7"})
+    client = client_with_adapter(adapter, clock)
+
+    assert client.request("GET", "blocks/b/children") == OK_BODY
+    assert len(adapter.requests) == 2
+    assert 7 in clock.sleeps
+    assert client.stats.rate_limited == 1
+    assert client.stats.retried == 1
+
+
+def test_transient_5xx_and_connection_errors_are_retried():
+    clock = FakeClock()
+    adapter = RecordingAdapter(statuses=[502, requests.ConnectionError("reset"), 200])
+    client = client_with_adapter(adapter, clock)
+
+    assert client.request("POST", "databases/db/query") == OK_BODY
+    assert client.stats.retried == 2
+    assert client.stats.requests == 3
+
+
+def test_non_retryable_error_raises_immediately():
+    adapter = RecordingAdapter(statuses=[404])
+    client = client_with_adapter(adapter)
+
+    with pytest.raises(notion_api.NotionApiError) as excinfo:
+        client.request("GET", "blocks/missing/children")
+
+    assert excinfo.value.status_code == 404
+    assert len(adapter.requests) == 1
+
+
+def use_notion_api_config(**overrides):
+    original = config.NOTION_API
+    object.__setattr__(config, "NOTION_API", replace(original, **overrides))
+    return original
+
+
+def test_retries_are_bounded():
+    original = use_notion_api_config(MAX_RETRIES=2, CIRCUIT_BREAKER_THRESHOLD=100)
+    try:
+        adapter = RecordingAdapter(statuses=[503] * 10)
+        client = client_with_adapter(adapter)
+    finally:
+        object.__setattr__(config, "NOTION_API", original)
+
+    with pytest.raises(notion_api.NotionApiError) as excinfo:
+        client.request("GET", "blocks/b/children")
+
+    assert excinfo.value.status_code == 503
+    assert len(adapter.requests) == 3
+
+
+def test_open_circuit_waits_until_half_open_without_using_a_retry():
+    original = use_notion_api_config(
+        MAX_RETRIES=2, CIRCUIT_BREAKER_THRESHOLD=2, CIRCUIT_BREAKER_RESET=60.0
+    )
+    try:
+        adapter = RecordingAdapter(statuses=[500, 500, 200])
+        clock = FakeClock()
+        client = client_with_adapter(adapter, clock)
+    finally:
+        object.__setattr__(config, "NOTION_API", original)
+
+    assert client.request("GET", "blocks/b/children") == OK_BODY
+    assert len(adapter.requests) == 3
+    assert client.stats.retried == 2
+    assert clock.now >= 60.0  # 開いてから half-open になるまで待った
+
+
+def test_one_request_retries_do_not_open_the_circuit_by_default():
+    assert config.NOTION_API.CIRCUIT_BREAKER_THRESHOLD > config.NOTION_API.MAX_RETRIES
+    adapter = RecordingAdapter(statuses=[503] * 10)
+    client = client_with_adapter(adapter)
+
+    with pytest.raises(notion_api.NotionApiError) as excinfo:
+        client.request("GET", "blocks/b/children")
+
+    assert excinfo.value.status_code == 503
+    assert len(adapter.requests) == config.NOTION_API.MAX_RETRIES + 1
+    assert client._breaker.is_open is False
+
+
+def test_connection_pool_covers_every_concurrent_request():
+    original = use_notion_api_config(
+        PAGE_FETCH_CONCURRENCY=3, BLOCK_FETCH_CONCURRENCY=5
+    )
+    try:
+        client = NotionClient(api_key="secret")
+    finally:
+        object.__setattr__(config, "NOTION_API", original)
+
+    # ページ 3 × ブロック 5 と、並行するトピックスラッグ取得の1本
+    assert client._adapter._pool_maxsize == 16
+
+
+def test_token_bucket_waits_when_burst_is_used_up():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 0.5]
+
+
+def test_circuit_breaker_opens_after_consecutive_failures_and_half_opens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=10, clock=clock, sleep=clock.sleep
+    )
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.is_open is True
+
+    assert breaker.wait() == 10
+    breaker.record_success()
+    assert breaker.is_open is False
+
+
+def test_half_open_circuit_admits_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.wait()  # このスレッドが試しのリクエストになる
+
+    admitted = threading.Event()
+    waiter = threading.Thread(target=lambda: (breaker.wait(), admitted.set()))
+    waiter.start()
+    assert not admitted.wait(0.2)  # 試しの結果が出るまで通さない
+
+    breaker.record_success()
+    assert admitted.wait(5)
+    waiter.join()
+
+
+def test_rate_limit_without_retry_after_sleeps_once(monkeypatch):
+    monkeypatch.setattr(
+        "diary_generator.notion_api.client.backoff_delay", lambda *args: 1.5
+    )
+    adapter = RecordingAdapter(statuses=[429, 200])
+    clock = FakeClock()
+    client = client_with_adapter(adapter, clock)
+
+    assert client.request("GET", "blocks/b/children") == OK_BODY
+    assert clock.now == 1.5
+
+
+def test_fake_workspace_serves_a_full_crawl_through_the_real_client(monkeypatch):
+    workspace = FakeNotionWorkspace(
+        FakeWorkspaceShape(pages=6, topics_per_page=2, nesting_depth=2, draft_ratio=0.5)
+    )
+    adapter = FakeNotionAdapter(workspace, error_rate=0.2, retry_after=0, seed=1)
+    clock = FakeClock()
+    original = use_notion_api_config(CIRCUIT_BREAKER_THRESHOLD=100)
+    try:
+        client = client_with_adapter(adapter, clock)
+    finally:
+        object.__setattr__(config, "NOTION_API", original)
+    monkeypatch.setattr(notion_api.client, "_client", client)
+    original_database_id = config.ENV.NOTION_DATABASE_ID
+    object.__setattr__(config.ENV, "NOTION_DATABASE_ID", DATABASE_ID)
+    try:
+        now = datetime(2026, 1, 2, tzinfo=UTC)
+        index = contents._sync_diary_index(None, now)
+        detail_entries = contents._build_detail_entries(
+            index["entries"], None, None, now
+        )
+    finally:
+        object.__setattr__(config.ENV, "NOTION_DATABASE_ID", original_database_id)
+
+    public_rows = [
+        row for row in workspace.rows if row["properties"]["公開"]["checkbox"]
+    ]
+    assert len(index["entries"]) == len(public_rows)
+    assert adapter.errors > 0
+    assert client.stats.retried == adapter.errors
+    # 各トピックの先頭リストは 2 段ネストし、孫まで取得できている
+    first_list = detail_entries[0]["topics"][0]["blocks"][0]
+    assert len(first_list["children"]) == 2
+    assert len(first_list["children"][0]["children"]) == 2
@@ -0,0 +1,83 @@
+from datetime import UTC, datetime, timedelta
+
+from diary_generator.topic_slugs import load
+
+
+def slug_page(page_id, name, slug, *, in_trash=False):
+    return {
+        "id": page_id,
+        "last_edited_time": "2026-01-01T00:00:00.000Z",
+        "in_trash": in_trash,
+        "properties": {
+            "名前": {"type": "title", "title": [{"plain_text": name}]},
+            "スラッグ": {"type": "rich_text", "rich_text": [{"plain_text": slug}]},
+            "エイリアス": {"type": "rich_text", "rich_text": []},
+        },
+    }
+
+
+def test_slug_sync_merges_rows_edited_since_last_sync(monkeypatch):
+    now = datetime.now(UTC)
+    old_cache = {
+        "synced_at": (now - timedelta(hours=1)).isoformat(),
+        "full_synced_at": (now - timedelta(hours=2)).isoformat(),
+        "rules": [
+            {"page_id": "p1", "name": "料理", "slug": "cooking", "aliases": []},
+            {"page_id": "p2", "name": "旅行", "slug": "travel", "aliases": []},
+            {"page_id": "p4", "name": "映画", "slug": "movies", "aliases": []},
+        ],
+    }
+    # p2 はゴミ箱に移動された。Notion の問い合わせはゴミ箱の行を返さない
+    rows = [
+        slug_page("p1", "料理", "cook"),
+        slug_page("p3", "読書", "books"),
+        slug_page("p4", "映画", "movies"),
+    ]
+    filters = []
+
+    def fake_fetch(database_id, filter=None):
+        filters.append(filter)
+        return rows[:2] if filter is not None else rows
+
+    monkeypatch.setattr(load, "fetch_all_slug_database_pages", fake_fetch)
+
+    cache = load._sync_topic_slug_cache("db", old_cache)
+
+    assert len(filters) == 1  # 差分同期は1回の問い合わせだけ
+    assert filters[0]["timestamp"] == "last_edited_time"
+    assert [(rule["page_id"], rule["slug"]) for rule in cache["rules"]] == [
+        ("p1", "cook"),
+        ("p2", "travel"),  # 削除は次の全件取得まで残る
+        ("p4", "movies"),
+        ("p3", "books"),
+    ]
+    assert cache["full_synced_at"] == old_cache["full_synced_at"]
+
+    # TOPIC_SLUG_FULL_SYNC_INTERVAL を過ぎたら全件取得し、削除された行を落とす
+    filters.clear()
+    expired = {
+        **cache,
+        "full_synced_at": (now - timedelta(days=2)).isoformat(),
+    }
+    cache = load._sync_topic_slug_cache("db", expired)
+
+    assert filters == [None]
+    assert [rule["page_id"] for rule in cache["rules"]] == ["p1", "p3", "p4"]
+
+
+def test_legacy_list_cache_triggers_full_sync(monkeypatch, tmp_path):
+    path = tmp_path / "topic_slugs.json"
+    path.write_text('[{"name": "料理", "slug": "cooking", "aliases": []}]')
+    filters = []
+
+    def fake_fetch(database_id, filter=None):
+        filters.append(filter)
+        return [slug_page("p1", "料理", "cooking")]
+
+    monkeypatch.setattr(load, "fetch_all_slug_database_pages", fake_fetch)
+
+    cache = load._sync_topic_slug_cache("db", load._read_cache(str(path)))
+
+    assert filters == [None]
+    assert cache["rules"][0]["page_id"] == "p1"
+    assert cache["synced_at"] == cache["full_synced_at"]